@@ -15,7 +15,7 @@ from sqlalchemy.engine import Connection
 
 from app.core.config import settings
 from app.core.db import Base
-from app.models import User, Folder, Video, Tag, VideoTag  # noqa: F401 - modelleri kaydet
+from app.models import User, Folder, Video, Tag, VideoTag, StageResult  # noqa: F401 - modelleri kaydet
 
 config = context.config
 if config.config_file_name is not None:
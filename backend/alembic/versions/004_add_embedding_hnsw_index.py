@@ -0,0 +1,30 @@
+"""add HNSW index on videos.embedding
+
+Revision ID: 004_embedding_hnsw
+Revises: 003_search_v2
+Create Date: V2 - ANN vektör index'i
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.config import settings
+
+revision: str = "004_embedding_hnsw"
+down_revision: Union[str, None] = "003_search_v2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # HNSW: cosine distance (<=>) için; m / ef_construction config'den ayarlanır
+    op.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_videos_embedding_hnsw
+        ON videos USING hnsw (embedding vector_cosine_ops)
+        WITH (m = {int(settings.HNSW_M)}, ef_construction = {int(settings.HNSW_EF_CONSTRUCTION)})
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_videos_embedding_hnsw")
@@ -0,0 +1,32 @@
+"""add source identity (extractor + video id) to videos
+
+Revision ID: 005_source_identity
+Revises: 004_embedding_hnsw
+Create Date: Ingest - indirme öncesi duplicate kontrolü
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005_source_identity"
+down_revision: Union[str, None] = "004_embedding_hnsw"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("videos", sa.Column("source_extractor", sa.String(64), nullable=True))
+    op.add_column("videos", sa.Column("source_video_id", sa.String(255), nullable=True))
+    op.create_index(
+        "ix_videos_source_identity",
+        "videos",
+        ["source_extractor", "source_video_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_videos_source_identity", table_name="videos")
+    op.drop_column("videos", "source_video_id")
+    op.drop_column("videos", "source_extractor")
@@ -0,0 +1,39 @@
+"""add stage_results (content-addressed caption/transcript/embedding cache)
+
+Revision ID: 006_stage_results
+Revises: 005_source_identity
+Create Date: Ingest - file_hash bazlı sonuç cache'i
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+revision: str = "006_stage_results"
+down_revision: Union[str, None] = "005_source_identity"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VECTOR_SIZE = 1536
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stage_results",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("file_hash", sa.String(64), nullable=False),
+        sa.Column("stage", sa.String(32), nullable=False),
+        sa.Column("model", sa.String(128), nullable=False),
+        sa.Column("version", sa.String(64), nullable=False),
+        sa.Column("text_result", sa.Text(), nullable=True),
+        sa.Column("embedding", Vector(VECTOR_SIZE), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("file_hash", "stage", "model", "version", name="uq_stage_result_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stage_results")
@@ -0,0 +1,26 @@
+"""add keyset listing indexes on videos (created_at, id)
+
+Revision ID: 007_listing_indexes
+Revises: 006_stage_results
+Create Date: Video listesi - cursor sayfalama
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "007_listing_indexes"
+down_revision: Union[str, None] = "006_stage_results"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ORDER BY created_at DESC, id DESC + (created_at, id) < cursor için
+    op.create_index("ix_videos_created_at_id", "videos", ["created_at", "id"])
+    op.create_index("ix_videos_folder_created_at_id", "videos", ["folder_id", "created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_videos_folder_created_at_id", table_name="videos")
+    op.drop_index("ix_videos_created_at_id", table_name="videos")
@@ -0,0 +1,52 @@
+"""add denormalized owner_id to videos
+
+Revision ID: 008_video_owner
+Revises: 007_listing_indexes
+Create Date: Kiracı filtresi - klasör IN listesi yerine owner_id
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008_video_owner"
+down_revision: Union[str, None] = "007_listing_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("videos", sa.Column("owner_id", sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        "fk_videos_owner_id_users",
+        "videos",
+        "users",
+        ["owner_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+    # Backfill: videonun klasörünün sahibi
+    op.execute("""
+        UPDATE videos v
+        SET owner_id = f.user_id
+        FROM folders f
+        WHERE v.folder_id = f.id
+        AND v.owner_id IS DISTINCT FROM f.user_id
+    """)
+
+    # Liste (owner_id, created_at, id) keyset; arama owner_id (+ folder_id) filtresi.
+    # HNSW index owner_id içeremez: filtreli ANN için sorguda hnsw.iterative_scan kullanılır.
+    op.create_index("ix_videos_owner_created_at_id", "videos", ["owner_id", "created_at", "id"])
+    op.create_index("ix_videos_owner_folder", "videos", ["owner_id", "folder_id"])
+    # Owner-prefixli index ile gereksizleşti
+    op.drop_index("ix_videos_created_at_id", table_name="videos")
+
+
+def downgrade() -> None:
+    op.create_index("ix_videos_created_at_id", "videos", ["created_at", "id"])
+    op.drop_index("ix_videos_owner_folder", table_name="videos")
+    op.drop_index("ix_videos_owner_created_at_id", table_name="videos")
+    op.drop_constraint("fk_videos_owner_id_users", "videos", type_="foreignkey")
+    op.drop_column("videos", "owner_id")
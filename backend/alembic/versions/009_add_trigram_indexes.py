@@ -0,0 +1,33 @@
+"""add pg_trgm GIN indexes on normalized title / description_ai
+
+Revision ID: 009_trigram_indexes
+Revises: 008_video_owner
+Create Date: keyword_boost - LIKE / regex / word_similarity için trigram index
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "009_trigram_indexes"
+down_revision: Union[str, None] = "008_video_owner"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # İfadeler search.py'deki sorgu ifadeleriyle birebir aynı olmalı (index kullanımı için)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_videos_title_trgm
+        ON videos USING gin (lower(coalesce(title, '')) gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_videos_description_ai_trgm
+        ON videos USING gin (lower(coalesce(description_ai, '')) gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_videos_description_ai_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_videos_title_trgm")
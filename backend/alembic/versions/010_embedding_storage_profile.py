@@ -0,0 +1,44 @@
+"""apply embedding storage profile (dimensions / halfvec / binary index)
+
+Revision ID: 010_embedding_storage
+Revises: 009_trigram_indexes
+Create Date: Kompakt vektör depolama - profil bu dosyada sabittir (config'ten okunmaz)
+
+Uygulanan profil aşağıdaki PROFILE sabitidir; ortam değişkenleri upgrade / downgrade'i etkilemez.
+Downgrade gerçek kolon tipini ve index'leri inceleyip 004 şemasına (vector(1536) + HNSW) döner.
+Profil değiştirmek için yeni bir migration ekleyin (conversion_statements ile, hedef profil ve
+HNSW parametreleri o dosyada sabit) ve config EMBEDDING_* ayarlarını eşleyin; uygulama açılışta
+config ile şemayı karşılaştırır (app/core/embedding_profile.verify_embedding_profile).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.embedding_profile import EmbeddingProfile, conversion_statements, inspect_schema
+
+revision: str = "010_embedding_storage"
+down_revision: Union[str, None] = "009_trigram_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Bu migration'ın profili: varsayılan (tam boyut float32, HNSW cosine)
+PROFILE = EmbeddingProfile(dimensions=1536, half_precision=False, binary_index=False)
+# 004 şeması (downgrade hedefi)
+BASE_PROFILE = EmbeddingProfile()
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+
+
+def _convert(target: EmbeddingProfile) -> None:
+    column_type, indexes = inspect_schema(op.get_bind())
+    for statement in conversion_statements(column_type, indexes, target, HNSW_M, HNSW_EF_CONSTRUCTION):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    _convert(PROFILE)
+
+
+def downgrade() -> None:
+    # Kısaltılmış vektörden tam boyut geri üretilemez: NULL'lanır, /videos/reembed-all gerekir
+    _convert(BASE_PROFILE)
@@ -0,0 +1,24 @@
+"""add (tag_id, video_id) index on video_tags
+
+Revision ID: 011_video_tags_tag_index
+Revises: 010_embedding_storage
+Create Date: etiket filtreli arama - tag_id ile video_id'lere index-only erişim
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "011_video_tags_tag_index"
+down_revision: Union[str, None] = "010_embedding_storage"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # video_id -> tag_id yönü uq_video_tag (video_id, tag_id) unique index'i ile zaten karşılanıyor
+    op.create_index("ix_video_tags_tag_video", "video_tags", ["tag_id", "video_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_video_tags_tag_video", table_name="video_tags")
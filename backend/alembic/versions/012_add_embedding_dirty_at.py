@@ -0,0 +1,32 @@
+"""add videos.embedding_dirty_at for incremental re-embedding
+
+Revision ID: 012_embedding_dirty
+Revises: 011_video_tags_tag_index
+Create Date: Etiket / manuel açıklama değişikliklerinde debounce'lu yeniden embedding
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "012_embedding_dirty"
+down_revision: Union[str, None] = "011_video_tags_tag_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("videos", sa.Column("embedding_dirty_at", sa.DateTime(timezone=True), nullable=True))
+    # Flush sadece kirli videoları (embedding_dirty_at, id) sırasıyla okur; index küçük kalır
+    op.create_index(
+        "ix_videos_embedding_dirty",
+        "videos",
+        ["embedding_dirty_at", "id"],
+        postgresql_where=sa.text("embedding_dirty_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_videos_embedding_dirty", table_name="videos")
+    op.drop_column("videos", "embedding_dirty_at")
@@ -0,0 +1,51 @@
+"""recompute search_vector only when its text columns change
+
+Revision ID: 013_search_vector_triggers
+Revises: 012_embedding_dirty
+Create Date: Durum / klasör / embedding yazımlarında to_tsvector tekrar hesaplanmaz
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "013_search_vector_triggers"
+down_revision: Union[str, None] = "012_embedding_dirty"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Fonksiyon gövdesi 003_search_v2 ile aynı; sadece ne zaman çağrıldığı değişir
+_TEXT_COLUMNS = "title, description_ai, transcript, description_manual"
+
+
+def upgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS videos_search_vector_trigger ON videos")
+    op.execute("""
+        CREATE TRIGGER videos_search_vector_insert
+        BEFORE INSERT ON videos
+        FOR EACH ROW EXECUTE FUNCTION videos_search_vector_update();
+    """)
+    # UPDATE OF: SET listesinde metin kolonu yoksa trigger hiç çağrılmaz (status, folder_id, embedding...).
+    # WHEN: kolon SET'te olsa da değeri aynıysa (ORM / ingest tekrar yazımı) yeniden hesaplanmaz.
+    op.execute(f"""
+        CREATE TRIGGER videos_search_vector_update
+        BEFORE UPDATE OF {_TEXT_COLUMNS} ON videos
+        FOR EACH ROW
+        WHEN (
+            OLD.title IS DISTINCT FROM NEW.title
+            OR OLD.description_ai IS DISTINCT FROM NEW.description_ai
+            OR OLD.transcript IS DISTINCT FROM NEW.transcript
+            OR OLD.description_manual IS DISTINCT FROM NEW.description_manual
+        )
+        EXECUTE FUNCTION videos_search_vector_update();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS videos_search_vector_update ON videos")
+    op.execute("DROP TRIGGER IF EXISTS videos_search_vector_insert ON videos")
+    op.execute("""
+        CREATE TRIGGER videos_search_vector_trigger
+        BEFORE INSERT OR UPDATE ON videos
+        FOR EACH ROW EXECUTE FUNCTION videos_search_vector_update();
+    """)
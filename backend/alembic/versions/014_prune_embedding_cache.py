@@ -0,0 +1,35 @@
+"""prune superseded embedding rows from stage_results
+
+Revision ID: 014_prune_embedding_cache
+Revises: 013_search_vector_triggers
+Create Date: file_hash başına sadece en son embedding satırı tutulur (bkz. result_cache.put_cached)
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "014_prune_embedding_cache"
+down_revision: Union[str, None] = "013_search_vector_triggers"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Her etiket / açıklama değişikliği yeni bir (file_hash, version) satırı bırakmıştı
+    op.execute("""
+        DELETE FROM stage_results s
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY file_hash ORDER BY created_at DESC NULLS LAST, id
+            ) AS rn
+            FROM stage_results
+            WHERE stage = 'embedding'
+        ) ranked
+        WHERE s.id = ranked.id AND ranked.rn > 1
+    """)
+
+
+def downgrade() -> None:
+    # Silinen cache satırları geri getirilemez; gerektiğinde yeniden üretilir
+    pass
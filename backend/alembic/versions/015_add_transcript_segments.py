@@ -0,0 +1,28 @@
+"""add timestamped transcript segments to videos and stage_results
+
+Revision ID: 015_transcript_segments
+Revises: 014_prune_embedding_cache
+Create Date: Parçalı Whisper transkriptinin segment zaman damgaları saklanır
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "015_transcript_segments"
+down_revision: Union[str, None] = "014_prune_embedding_cache"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("videos", sa.Column("transcript_segments", postgresql.JSONB(), nullable=True))
+    # Cache'teki transkript de segmentleriyle döner (TRANSCRIPTION_VERSION v3)
+    op.add_column("stage_results", sa.Column("segments", postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("stage_results", "segments")
+    op.drop_column("videos", "transcript_segments")
@@ -5,14 +5,23 @@ Semantik benzerlik + Full-text search birleşimi ile gelişmiş arama doğruluğ
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_user
-from app.core.db import get_db
-from app.models import Folder, User
-from app.services.intelligence.search import hybrid_search, keyword_boost_search
+from app.core.db import AsyncSessionLocal
+from app.models import User, Video, VideoStatus
+from app.services.intelligence.embedding_cache import embedding_cache
+from app.services.intelligence.search import (
+    fts_search,
+    hybrid_search,
+    keyword_boost_search,
+    query_embedding_within_budget,
+)
+from app.services.intelligence.search_cache import search_cache
+from app.services.intelligence.singleflight import embedding_flight, search_flight
+from app.services.storage import get_presigned_urls
 
 router = APIRouter()
 
@@ -20,9 +29,13 @@ router = APIRouter()
 class SearchQuery(BaseModel):
     q: str
     folder_id: UUID | None = None
-    tag_ids: list[UUID] | None = None
+    tag_ids: list[UUID] | None = None  # Etiketlerden en az birine sahip videolar (OR)
     limit: int = 10
     search_mode: str = "hybrid"  # "hybrid", "keyword_boost", "vector"
+    # Recall <-> latency ayarı: None ise config varsayılanları (ef_search sadece hybrid;
+    # verilirse aday havuzundan küçük olsa bile olduğu gibi uygulanır)
+    ef_search: int | None = Field(default=None, ge=1, le=1000)
+    candidate_pool: int | None = Field(default=None, ge=1, le=1000)
 
 
 class SearchResultItem(BaseModel):
@@ -33,42 +46,91 @@ class SearchResultItem(BaseModel):
     score: float
     vector_score: float | None = None
     fts_score: float | None = None
+    playback_url: str | None = None  # Presigned URL
+    # Kart alanları: sonuç sayfası video başına ayrı detay isteği atmaz (bkz. _attach_card_fields)
+    source_url: str | None = None
+    description_manual: str | None = None
+    duration: int | None = None
+    status: VideoStatus | None = None
+    created_at: str | None = None
+    has_transcript: bool = False
 
 
 class SearchResponse(BaseModel):
     results: list[SearchResultItem]
     query: str
     search_mode: str
+    # True: embedding süre bütçesinde alınamadı, sonuçlar sadece full-text (vector_score null)
+    degraded: bool = False
 
 
-async def _user_folder_ids(db: AsyncSession, user_id: UUID) -> list[UUID]:
-    result = await db.execute(select(Folder.id).where(Folder.user_id == user_id))
-    return [r[0] for r in result.all()]
+def _attach_playback_urls(results: list[SearchResultItem]) -> list[SearchResultItem]:
+    """Tüm sonuçlar için imzalı URL'ler tek seferde (cache'li) üretilir."""
+    urls = get_presigned_urls([r.s3_key for r in results if r.s3_key], expires_in=3600)
+    for r in results:
+        if r.s3_key:
+            r.playback_url = urls.get(r.s3_key)
+    return results
 
 
-@router.post("/search", response_model=SearchResponse)
-async def smart_search(
-    payload: SearchQuery,
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
-):
-    """
-    Akıllı Arama V2: Hybrid search (vektör + full-text) ile en alakalı videoları döner.
-    
-    search_mode:
-    - "hybrid": Vektör + Full-text search birleşimi (varsayılan, önerilen)
-    - "keyword_boost": Vektör search + keyword boost
-    """
-    folder_ids = await _user_folder_ids(db, user.id)
-    
-    if payload.search_mode == "keyword_boost":
+async def _attach_card_fields(db: AsyncSession, results: list[SearchResultItem]) -> None:
+    """Sonuç kartlarının ihtiyaç duyduğu alanlar tüm sonuçlar için tek sorguda."""
+    if not results:
+        return
+    rows = await db.execute(
+        select(
+            Video.id,
+            Video.source_url,
+            Video.description_manual,
+            Video.duration,
+            Video.status,
+            Video.created_at,
+            Video.transcript.isnot(None) & (Video.transcript != ""),
+        ).where(Video.id.in_([r.video_id for r in results]))
+    )
+    by_id = {row[0]: row for row in rows.all()}
+    for r in results:
+        row = by_id.get(r.video_id)
+        if row is None:
+            continue
+        _, r.source_url, r.description_manual, r.duration, r.status, created_at, r.has_transcript = row
+        r.created_at = created_at.isoformat() if created_at else None
+
+
+async def _execute_search(
+    db: AsyncSession,
+    owner_id: UUID,
+    q: str,
+    folder_id: UUID | None,
+    tag_ids: list[UUID] | None,
+    limit: int,
+    search_mode: str,
+    ef_search: int | None,
+    candidate_pool: int | None,
+) -> SearchResponse:
+    # Embedding süre bütçesi: OpenAI yavaş/erişilemezse sadece FTS (degraded)
+    query_vec = await query_embedding_within_budget(q)
+    if query_vec is None:
+        rows = await fts_search(
+            db,
+            query_text=q,
+            owner_id=owner_id,
+            folder_id=folder_id,
+            limit=limit,
+            min_score=0.0,
+            tag_ids=tag_ids,
+        )
+    elif search_mode == "keyword_boost":
         rows = await keyword_boost_search(
             db,
-            query_text=payload.q,
-            folder_ids=folder_ids,
-            folder_id=payload.folder_id,
-            limit=payload.limit,
+            query_text=q,
+            owner_id=owner_id,
+            folder_id=folder_id,
+            limit=limit,
             min_score=0.0,
+            candidate_pool=candidate_pool,
+            query_vec=query_vec,
+            tag_ids=tag_ids,
         )
         results = [
             SearchResultItem(
@@ -80,39 +142,129 @@ async def smart_search(
             )
             for vid, s3_key, title, description_ai, score in rows
         ]
+        await _attach_card_fields(db, results)
+        return SearchResponse(results=results, query=q, search_mode=search_mode)
     else:
         # Default: hybrid search
         rows = await hybrid_search(
             db,
-            query_text=payload.q,
-            folder_ids=folder_ids,
-            folder_id=payload.folder_id,
-            limit=payload.limit,
+            query_text=q,
+            owner_id=owner_id,
+            folder_id=folder_id,
+            limit=limit,
             min_score=0.0,
+            ef_search=ef_search,
+            candidate_pool=candidate_pool,
+            query_vec=query_vec,
+            tag_ids=tag_ids,
         )
-        results = [
-            SearchResultItem(
-                video_id=vid,
-                s3_key=s3_key,
-                title=title,
-                description_ai=description_ai,
-                score=round(hybrid_score, 4),
-                vector_score=round(vector_score, 4),
-                fts_score=round(fts_score, 4),
-            )
-            for vid, s3_key, title, description_ai, hybrid_score, vector_score, fts_score in rows
-        ]
+    results = [
+        SearchResultItem(
+            video_id=vid,
+            s3_key=s3_key,
+            title=title,
+            description_ai=description_ai,
+            score=round(hybrid_score, 4),
+            vector_score=round(vector_score, 4) if vector_score is not None else None,
+            fts_score=round(fts_score, 4),
+        )
+        for vid, s3_key, title, description_ai, hybrid_score, vector_score, fts_score in rows
+    ]
+    await _attach_card_fields(db, results)
+    return SearchResponse(
+        results=results,
+        query=q,
+        search_mode=search_mode,
+        degraded=query_vec is None,
+    )
+
+
+async def _run_search(
+    user: User,
+    q: str,
+    folder_id: UUID | None,
+    tag_ids: list[UUID] | None,
+    limit: int,
+    search_mode: str,
+    ef_search: int | None,
+    candidate_pool: int | None,
+) -> SearchResponse:
+    """
+    POST ve GET arama ortak yolu.
+    Aynı istek (normalize sorgu + parametreler) kütüphane değişmediyse Redis'ten döner;
+    playback URL'leri cache'e yazılmaz, her yanıtta (presigned cache'ten) eklenir.
+    Cache'te olmayan aynı istek eşzamanlı gelirse tek arama çalışır (single-flight);
+    birleştirilmiş arama kendi DB session'ını kullanır (bekleyen isteklerden bağımsız).
+    Embedding SEARCH_EMBEDDING_BUDGET_MS içinde gelmezse sadece FTS sonuçları (degraded=True).
+    """
+    request = {
+        "q": q,
+        "folder_id": folder_id,
+        "tag_ids": sorted(str(t) for t in tag_ids) if tag_ids else None,
+        "limit": limit,
+        "search_mode": search_mode,
+        "ef_search": ef_search,
+        "candidate_pool": candidate_pool,
+    }
+    cached, cache_key = await search_cache.aget(user.id, request)
+    if cached is None:
+        async def compute() -> dict:
+            async with AsyncSessionLocal() as session:
+                response = await _execute_search(
+                    session, user.id, q, folder_id, tag_ids, limit, search_mode, ef_search, candidate_pool
+                )
+            # playback_url'ler henüz eklenmedi: cache'e imzasız yazılır.
+            # Degraded (sadece FTS) yanıt cache'lenmez: embedding gelince hybrid'e geçilir.
+            payload = response.model_dump(mode="json")
+            if not response.degraded:
+                await search_cache.aset(cache_key, payload)
+            return payload
+
+        cached = await search_flight.do(
+            cache_key or search_cache.local_key(user.id, request),
+            compute,
+            probe=(lambda: search_cache.apeek(cache_key)) if cache_key else None,
+        )
+
+    # Her istek kendi kopyasını alır (birleştirilen isteklerle paylaşılmaz)
+    response = SearchResponse.model_validate(cached)
+    _attach_playback_urls(response.results)
+    return response
+
+
+@router.post("/search", response_model=SearchResponse)
+async def smart_search(
+    payload: SearchQuery,
+    user: User = Depends(get_current_user),
+):
+    """
+    Akıllı Arama V2: Hybrid search (vektör + full-text) ile en alakalı videoları döner.
     
-    return SearchResponse(results=results, query=payload.q, search_mode=payload.search_mode)
+    search_mode:
+    - "hybrid": Vektör + Full-text search birleşimi (varsayılan, önerilen)
+    - "keyword_boost": Vektör search + keyword boost
+    """
+    return await _run_search(
+        user,
+        q=payload.q,
+        folder_id=payload.folder_id,
+        tag_ids=payload.tag_ids,
+        limit=payload.limit,
+        search_mode=payload.search_mode,
+        ef_search=payload.ef_search,
+        candidate_pool=payload.candidate_pool,
+    )
 
 
 @router.get("/search", response_model=SearchResponse)
 async def smart_search_get(
     q: str = Query(..., min_length=1),
     folder_id: UUID | None = None,
+    tag_ids: list[UUID] | None = Query(None),
     limit: int = Query(10, ge=1, le=50),
     search_mode: str = Query("hybrid", pattern="^(hybrid|keyword_boost)$"),
-    db: AsyncSession = Depends(get_db),
+    ef_search: int | None = Query(None, ge=1, le=1000),
+    candidate_pool: int | None = Query(None, ge=1, le=1000),
     user: User = Depends(get_current_user),
 ):
     """
@@ -121,49 +273,31 @@ async def smart_search_get(
     search_mode:
     - "hybrid": Vektör + Full-text search birleşimi (varsayılan)
     - "keyword_boost": Vektör search + keyword boost
-    """
-    folder_ids = await _user_folder_ids(db, user.id)
     
-    if search_mode == "keyword_boost":
-        rows = await keyword_boost_search(
-            db,
-            query_text=q,
-            folder_ids=folder_ids,
-            folder_id=folder_id,
-            limit=limit,
-            min_score=0.0,
-        )
-        results = [
-            SearchResultItem(
-                video_id=vid,
-                s3_key=s3_key,
-                title=title,
-                description_ai=description_ai,
-                score=round(score, 4),
-            )
-            for vid, s3_key, title, description_ai, score in rows
-        ]
-    else:
-        # Default: hybrid search
-        rows = await hybrid_search(
-            db,
-            query_text=q,
-            folder_ids=folder_ids,
-            folder_id=folder_id,
-            limit=limit,
-            min_score=0.0,
-        )
-        results = [
-            SearchResultItem(
-                video_id=vid,
-                s3_key=s3_key,
-                title=title,
-                description_ai=description_ai,
-                score=round(hybrid_score, 4),
-                vector_score=round(vector_score, 4),
-                fts_score=round(fts_score, 4),
-            )
-            for vid, s3_key, title, description_ai, hybrid_score, vector_score, fts_score in rows
-        ]
-    
-    return SearchResponse(results=results, query=q, search_mode=search_mode)
+    ef_search / candidate_pool: recall <-> latency ayarı (candidate_pool keyword_boost'ta da geçerli).
+    ef_search olduğu gibi uygulanır; candidate_pool'dan küçükse ANN daha az aday döndürebilir.
+    tag_ids: ?tag_ids=...&tag_ids=... - etiketlerden en az birine sahip videolar.
+    """
+    return await _run_search(
+        user,
+        q=q,
+        folder_id=folder_id,
+        tag_ids=tag_ids,
+        limit=limit,
+        search_mode=search_mode,
+        ef_search=ef_search,
+        candidate_pool=candidate_pool,
+    )
+
+
+@router.get("/stats")
+async def search_stats(user: User = Depends(get_current_user)):
+    """Arama cache istatistikleri (hit/miss sayaçları) ve birleştirilen (coalesced) istek sayıları."""
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        "search_cache": search_cache.stats(),
+        "singleflight": {
+            "embedding": embedding_flight.stats(),
+            "search": search_flight.stats(),
+        },
+    }
@@ -7,12 +7,13 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
-from sqlalchemy import select, delete as sql_delete
+from sqlalchemy import func, select, delete as sql_delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_user
 from app.core.db import get_db
 from app.models import Folder, User, Video
+from app.services.intelligence.search_cache import library_changed
 
 router = APIRouter()
 
@@ -38,6 +39,19 @@ class FolderResponse(BaseModel):
         from_attributes = True
 
 
+class FolderTreeNode(BaseModel):
+    id: UUID
+    parent_id: UUID | None
+    name: str
+    created_at: str
+    video_count: int = 0  # Sadece bu klasördeki videolar
+    total_video_count: int = 0  # Alt klasörler dahil
+    children: list["FolderTreeNode"] = []
+
+
+FolderTreeNode.model_rebuild()
+
+
 def _serialize_folder(f: Folder) -> FolderResponse:
     return FolderResponse(
         id=f.id,
@@ -57,23 +71,18 @@ async def _get_user_folder(db: AsyncSession, folder_id: UUID, user_id: UUID) ->
 
 
 async def _get_descendant_folder_ids(db: AsyncSession, folder_id: UUID, user_id: UUID) -> list[UUID]:
-    """Bir klasörün tüm alt klasör ID'lerini recursive olarak getir."""
-    descendants = []
-    
-    async def collect_children(parent_id: UUID):
-        result = await db.execute(
-            select(Folder.id).where(
-                Folder.parent_id == parent_id,
-                Folder.user_id == user_id
-            )
-        )
-        children = [row[0] for row in result.all()]
-        for child_id in children:
-            descendants.append(child_id)
-            await collect_children(child_id)
-    
-    await collect_children(folder_id)
-    return descendants
+    """Bir klasörün tüm alt klasör ID'lerini tek sorguda (recursive CTE) getir."""
+    subtree = (
+        select(Folder.id)
+        .where(Folder.parent_id == folder_id, Folder.user_id == user_id)
+        .cte(name="subtree", recursive=True)
+    )
+    # UNION (ALL değil): bozuk veride döngü olsa bile sorgu sonlanır
+    subtree = subtree.union(
+        select(Folder.id).where(Folder.parent_id == subtree.c.id, Folder.user_id == user_id)
+    )
+    result = await db.execute(select(subtree.c.id))
+    return [row[0] for row in result.all()]
 
 
 @router.post("/", response_model=FolderResponse)
@@ -103,9 +112,65 @@ async def create_folder(
     db.add(folder)
     await db.flush()
     await db.refresh(folder)
+    await library_changed(db, user.id)
     return _serialize_folder(folder)
 
 
+@router.get("/tree", response_model=list[FolderTreeNode])
+async def get_folder_tree(
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Kullanıcının tüm klasör ağacı (iç içe) ve klasör başına video sayıları - tek sorgu."""
+    counts = (
+        select(Video.folder_id, func.count().label("video_count"))
+        .where(Video.owner_id == user.id)
+        .group_by(Video.folder_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            Folder.id,
+            Folder.parent_id,
+            Folder.name,
+            Folder.created_at,
+            func.coalesce(counts.c.video_count, 0),
+        )
+        .outerjoin(counts, counts.c.folder_id == Folder.id)
+        .where(Folder.user_id == user.id)
+        .order_by(Folder.name)
+    )
+    nodes = {
+        fid: FolderTreeNode(
+            id=fid,
+            parent_id=parent_id,
+            name=name,
+            created_at=created_at.isoformat() if created_at else "",
+            video_count=count,
+        )
+        for fid, parent_id, name, created_at, count in result.all()
+    }
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node.parent_id) if node.parent_id else None
+        if parent is not None:
+            parent.children.append(node)
+        else:
+            roots.append(node)
+
+    def _fill_totals(node: FolderTreeNode, seen: set[UUID]) -> int:
+        seen.add(node.id)
+        node.total_video_count = node.video_count + sum(
+            _fill_totals(child, seen) for child in node.children if child.id not in seen
+        )
+        return node.total_video_count
+
+    seen: set[UUID] = set()
+    for root in roots:
+        _fill_totals(root, seen)
+    return roots
+
+
 @router.get("/{folder_id}", response_model=FolderResponse)
 async def get_folder(
     folder_id: UUID,
@@ -193,6 +258,7 @@ async def update_folder(
     
     await db.flush()
     await db.refresh(folder)
+    await library_changed(db, user.id)
     return _serialize_folder(folder)
 
 
@@ -220,11 +286,13 @@ async def delete_folder(
         await db.execute(
             sql_delete(Video).where(Video.folder_id.in_(all_folder_ids))
         )
-        # Sonra alt klasörleri sil (en derinden başlayarak)
-        for fid in reversed(descendant_ids):
-            await db.execute(sql_delete(Folder).where(Folder.id == fid))
-        # Son olarak ana klasörü sil
-        await db.delete(folder)
+        # Sonra klasörün kendisi ve tüm alt klasörleri tek DELETE ile
+        await db.execute(
+            sql_delete(Folder)
+            .where(Folder.id.in_(all_folder_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.expunge(folder)
     else:
         # Alt klasör veya video var mı kontrol et
         if descendant_ids:
@@ -244,5 +312,5 @@ async def delete_folder(
         
         await db.delete(folder)
     
-    await db.flush()
+    await library_changed(db, user.id)
     return None
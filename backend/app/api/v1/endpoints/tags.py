@@ -11,6 +11,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.deps import get_current_user
 from app.core.db import get_db
 from app.models import Folder, Tag, TagType, User, Video, VideoTag
+from app.services.intelligence.embedding_refresh import mark_dirty, schedule_refresh
+from app.services.intelligence.search_cache import library_changed
 
 router = APIRouter()
 
@@ -103,7 +105,10 @@ async def attach_tag_to_video(
         return
     vt = VideoTag(video_id=payload.video_id, tag_id=payload.tag_id)
     db.add(vt)
-    await db.flush()
+    # Etiketler embedding metninde: vektör debounce'lu flush'ta yenilenir
+    mark_dirty(video)
+    await library_changed(db, user.id)
+    await schedule_refresh()
 
 
 @router.delete("/detach", status_code=status.HTTP_204_NO_CONTENT)
@@ -137,7 +142,9 @@ async def detach_tag_from_video(
     vt = vt_result.scalar_one_or_none()
     if vt:
         await db.delete(vt)
-        await db.flush()
+        mark_dirty(video)
+        await library_changed(db, user.id)
+        await schedule_refresh()
 
 
 @router.get("/video/{video_id}", response_model=list[TagResponse])
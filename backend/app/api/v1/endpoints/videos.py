@@ -2,20 +2,28 @@
 Video CRUD ve Upload - BLUEPRINT endpoints/videos.
 MVP: Link yapıştır -> Celery ile indir -> S3'e kaydet; thumbnail; klasör/etiket.
 """
+import base64
+from datetime import datetime
 from uuid import UUID
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from celery import chord
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_user
 from app.core.db import get_db
 from app.models import Folder, User, Video, VideoStatus
 from app.services.ingestion.downloader import extract_playlist_urls
-from app.services.storage import get_presigned_url, delete_file
-from app.workers.tasks import ingest_video_task
+from app.services.intelligence import reembed_jobs
+from app.services.intelligence.embedding_refresh import mark_dirty, schedule_refresh
+from app.services.intelligence.result_cache import ALL_STAGES, CachedStage
+from app.services.intelligence.search_cache import library_changed
+from app.services.storage import get_presigned_url, get_presigned_urls, delete_file
+from app.workers.celery_app import celery_app
+from app.workers.tasks import embed_videos_task, ingest_pipeline, reembed_library_task
 
 router = APIRouter()
 
@@ -50,6 +58,7 @@ class VideoResponse(BaseModel):
     description_manual: str | None
     description_ai: str | None
     transcript: str | None = None  # V2: Ses transkripti
+    transcript_segments: list[dict] | None = None  # Zaman damgalı segmentler (sadece detay yanıtı)
     duration: int | None
     folder_id: UUID | None
     status: VideoStatus
@@ -60,13 +69,17 @@ class VideoResponse(BaseModel):
         from_attributes = True
 
 
-def _serialize_video(v: Video) -> VideoResponse:
+def _serialize_video(v: Video, playback_urls: dict[str, str] | None = None) -> VideoResponse:
+    """playback_urls: get_presigned_urls çıktısı (liste yanıtlarında toplu imzalama için)."""
     playback_url = None
     if v.s3_key:
-        try:
-            playback_url = get_presigned_url(v.s3_key, expires_in=3600)
-        except Exception:
-            pass
+        if playback_urls is not None:
+            playback_url = playback_urls.get(v.s3_key)
+        else:
+            try:
+                playback_url = get_presigned_url(v.s3_key, expires_in=3600)
+            except Exception:
+                pass
     return VideoResponse(
         id=v.id,
         source_url=v.source_url,
@@ -76,6 +89,7 @@ def _serialize_video(v: Video) -> VideoResponse:
         description_manual=v.description_manual,
         description_ai=v.description_ai,
         transcript=getattr(v, 'transcript', None),  # V2 field
+        transcript_segments=v.transcript_segments,
         duration=v.duration,
         folder_id=v.folder_id,
         status=v.status,
@@ -84,29 +98,12 @@ def _serialize_video(v: Video) -> VideoResponse:
     )
 
 
-async def _user_folder_ids(db: AsyncSession, user_id: UUID) -> list[UUID]:
-    """Kullanıcının tüm klasör id'leri."""
-    result = await db.execute(select(Folder.id).where(Folder.user_id == user_id))
-    return [r[0] for r in result.all()]
-
-
 async def _get_user_video(db: AsyncSession, video_id: UUID, user_id: UUID) -> Video | None:
-    """Kullanıcıya ait videoyu getir (klasör üzerinden kontrol)."""
-    result = await db.execute(select(Video).where(Video.id == video_id))
-    video = result.scalar_one_or_none()
-    if not video or not video.folder_id:
-        return None
-    
-    folder_result = await db.execute(
-        select(Folder).where(
-            Folder.id == video.folder_id,
-            Folder.user_id == user_id,
-        )
+    """Kullanıcıya ait videoyu getir (owner_id ile tek sorgu)."""
+    result = await db.execute(
+        select(Video).where(Video.id == video_id, Video.owner_id == user_id)
     )
-    if not folder_result.scalar_one_or_none():
-        return None
-    
-    return video
+    return result.scalar_one_or_none()
 
 
 @router.post("/", response_model=VideoResponse)
@@ -130,12 +127,13 @@ async def create_video(
     video = Video(
         source_url=payload.source_url,
         folder_id=payload.folder_id,
+        owner_id=user.id,
         status=VideoStatus.PENDING,
     )
     db.add(video)
     await db.flush()
     await db.refresh(video)
-    ingest_video_task.delay(str(video.id))
+    ingest_pipeline(str(video.id)).delay()
     return _serialize_video(video)
 
 
@@ -191,6 +189,7 @@ async def create_videos_bulk(
         video = Video(
             source_url=url,
             folder_id=payload.folder_id,
+            owner_id=user.id,
             status=VideoStatus.PENDING,
         )
         db.add(video)
@@ -206,7 +205,7 @@ async def create_videos_bulk(
     task_results = []
     for video_id in video_ids:
         try:
-            result = ingest_video_task.delay(video_id)
+            result = ingest_pipeline(video_id).delay()
             task_results.append({
                 "video_id": video_id,
                 "task_id": result.id if result else None,
@@ -264,6 +263,7 @@ async def create_videos_from_playlist(
         video = Video(
             source_url=url,
             folder_id=payload.folder_id,
+            owner_id=user.id,
             status=VideoStatus.PENDING,
         )
         db.add(video)
@@ -279,7 +279,7 @@ async def create_videos_from_playlist(
     task_results = []
     for video_id in video_ids:
         try:
-            result = ingest_video_task.delay(video_id)
+            result = ingest_pipeline(video_id).delay()
             task_results.append({
                 "video_id": video_id,
                 "task_id": result.id if result else None,
@@ -321,24 +321,98 @@ async def get_video(
     return _serialize_video(video)
 
 
+# Liste projeksiyonu: embedding / search_vector asla yüklenmez; büyük metinler sadece istenirse
+_LIST_COLUMNS = (
+    Video.id,
+    Video.source_url,
+    Video.s3_key,
+    Video.file_hash,
+    Video.title,
+    Video.description_manual,
+    Video.duration,
+    Video.folder_id,
+    Video.status,
+    Video.created_at,
+)
+_LIST_TEXT_COLUMNS = (Video.description_ai, Video.transcript)
+
+
+def _encode_cursor(created_at: datetime, video_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{video_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, video_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(video_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz cursor",
+        )
+
+
+def _serialize_list_row(row, playback_urls: dict[str, str], include_text: bool) -> VideoResponse:
+    return VideoResponse(
+        id=row.id,
+        source_url=row.source_url,
+        s3_key=row.s3_key,
+        file_hash=row.file_hash,
+        title=row.title,
+        description_manual=row.description_manual,
+        description_ai=row.description_ai if include_text else None,
+        transcript=row.transcript if include_text else None,
+        duration=row.duration,
+        folder_id=row.folder_id,
+        status=row.status,
+        created_at=row.created_at.isoformat() if row.created_at else "",
+        playback_url=playback_urls.get(row.s3_key) if row.s3_key else None,
+    )
+
+
 @router.get("/", response_model=list[VideoResponse])
 async def list_videos(
+    response: Response,
     folder_id: UUID | None = None,
+    cursor: str | None = Query(None, description="Önceki yanıtın X-Next-Cursor header'ı"),
+    limit: int = Query(50, ge=1, le=200),
+    include_text: bool = Query(False, description="description_ai ve transcript alanlarını da döndür"),
+    status_filter: VideoStatus | None = Query(None, alias="status"),
+    min_duration: int | None = Query(None, ge=0),
+    max_duration: int | None = Query(None, ge=0),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    """Video listesi; opsiyonel folder_id filtresi (sadece kendi klasörleriniz)."""
-    folder_ids = await _user_folder_ids(db, user.id)
-    if not folder_ids:
-        return []
-    q = select(Video).where(Video.folder_id.in_(folder_ids))
+    """
+    Video listesi; opsiyonel folder_id / status / süre filtreleri (sadece kendi klasörleriniz).
+    (created_at, id) üzerinden keyset sayfalama: sonraki sayfa varsa X-Next-Cursor header'ı döner.
+    """
+    columns = _LIST_COLUMNS + (_LIST_TEXT_COLUMNS if include_text else ())
+    q = select(*columns).where(Video.owner_id == user.id)
     if folder_id is not None:
-        if folder_id not in folder_ids:
-            return []
         q = q.where(Video.folder_id == folder_id)
-    result = await db.execute(q.order_by(Video.created_at.desc()))
-    videos = result.scalars().all()
-    return [_serialize_video(v) for v in videos]
+    if status_filter is not None:
+        q = q.where(Video.status == status_filter)
+    if min_duration is not None:
+        q = q.where(Video.duration >= min_duration)
+    if max_duration is not None:
+        q = q.where(Video.duration <= max_duration)
+    if cursor:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        q = q.where(tuple_(Video.created_at, Video.id) < tuple_(cursor_created_at, cursor_id))
+
+    q = q.order_by(Video.created_at.desc(), Video.id.desc()).limit(limit + 1)
+    rows = (await db.execute(q)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if last.created_at is not None:
+            response.headers["X-Next-Cursor"] = _encode_cursor(last.created_at, last.id)
+
+    playback_urls = get_presigned_urls([r.s3_key for r in rows], expires_in=3600)
+    return [_serialize_list_row(r, playback_urls, include_text) for r in rows]
 
 
 @router.put("/{video_id}", response_model=VideoResponse)
@@ -372,12 +446,20 @@ async def update_video(
             )
         video.folder_id = payload.folder_id
     
-    # Manuel açıklama güncelleme
-    if payload.description_manual is not None:
+    # Manuel açıklama güncelleme (embedding metninde: vektör debounce'lu flush'ta yenilenir)
+    embedding_changed = (
+        payload.description_manual is not None
+        and payload.description_manual != video.description_manual
+    )
+    if embedding_changed:
         video.description_manual = payload.description_manual
+        mark_dirty(video)
     
     await db.flush()
     await db.refresh(video)
+    await library_changed(db, user.id)
+    if embedding_changed:
+        await schedule_refresh()
     return _serialize_video(video)
 
 
@@ -405,7 +487,7 @@ async def delete_video(
     
     # Veritabanından sil
     await db.delete(video)
-    await db.flush()
+    await library_changed(db, user.id)
     return None
 
 
@@ -435,7 +517,7 @@ async def retry_video(
     await db.flush()
     await db.refresh(video)
     
-    ingest_video_task.delay(str(video.id))
+    ingest_pipeline(str(video.id)).delay()
     return _serialize_video(video)
 
 
@@ -445,13 +527,9 @@ async def retry_all_pending(
     user: User = Depends(get_current_user),
 ):
     """Tüm bekleyen videoları yeniden işle."""
-    folder_ids = await _user_folder_ids(db, user.id)
-    if not folder_ids:
-        return {"retried": 0, "video_ids": []}
-    
     result = await db.execute(
         select(Video).where(
-            Video.folder_id.in_(folder_ids),
+            Video.owner_id == user.id,
             Video.status.in_([VideoStatus.PENDING, VideoStatus.FAILED]),
         )
     )
@@ -460,15 +538,28 @@ async def retry_all_pending(
     retried_ids = []
     for video in videos:
         video.status = VideoStatus.PENDING
-        ingest_video_task.delay(str(video.id))
+        ingest_pipeline(str(video.id)).delay()
         retried_ids.append(str(video.id))
     
     await db.flush()
     return {"retried": len(retried_ids), "video_ids": retried_ids}
 
 
+def _reuse_stage_values(reuse_stages: list[CachedStage], force: bool) -> list[str]:
+    """Query'de boş liste gönderilemez: "hiçbirini kullanma" force=True ile istenir."""
+    return [] if force else [s.value for s in reuse_stages]
+
+
 @router.post("/reprocess-all")
 async def reprocess_all_videos(
+    reuse_stages: list[CachedStage] = Query(
+        default=ALL_STAGES,
+        description="file_hash cache'inden yeniden kullanılacak aşamalar (verilmezse hepsi)",
+    ),
+    force: bool = Query(
+        False,
+        description="True: cache kullanılmaz, tüm aşamalar yeniden üretilir (reuse_stages yok sayılır)",
+    ),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
@@ -479,39 +570,46 @@ async def reprocess_all_videos(
     - Multi-frame keyframe extraction
     - Gelişmiş AI caption (multi-image GPT-4o)
     - Audio transcription (Whisper)
-    - Hybrid search için yeni embedding
+    - Hybrid search için yeni embedding (tüm videolar için toplu, embed_videos_task)
+    
+    reuse_stages: Cache'te sonucu olan aşamalar (caption/transcript/embedding) tekrar ücretlendirilmez.
+    force=True: Cache kullanılmaz, caption / transkript / embedding yeniden üretilir.
     
     NOT: Bu işlem API maliyetine neden olur ve uzun sürebilir.
     """
-    folder_ids = await _user_folder_ids(db, user.id)
-    if not folder_ids:
-        return {"queued": 0, "video_ids": [], "message": "Hiç video bulunamadı"}
-    
     # Sadece COMPLETED videoları al (yeniden işlenecek)
     result = await db.execute(
         select(Video).where(
-            Video.folder_id.in_(folder_ids),
+            Video.owner_id == user.id,
             Video.status == VideoStatus.COMPLETED,
             Video.source_url.isnot(None),  # source_url olmalı (yeniden indirilecek)
         )
     )
     videos = result.scalars().all()
+    if not videos:
+        return {"queued": 0, "video_ids": [], "message": "Hiç video bulunamadı"}
     
     queued_ids = []
     for video in videos:
         # Durumu PENDING'e çevir
         video.status = VideoStatus.PENDING
-        # Eski verileri temizle (yeniden oluşturulacak)
+        # Eski verileri temizle (yeniden oluşturulacak; search_vector trigger ile güncellenir)
         video.description_ai = None
         video.transcript = None
+        video.transcript_segments = None
         video.title = None
         video.embedding = None
-        video.search_vector = None
-        # Görevi tetikle
-        ingest_video_task.delay(str(video.id))
         queued_ids.append(str(video.id))
     
-    await db.flush()
+    await library_changed(db, user.id)
+    
+    # Görevleri tetikle: her video embedding'siz işlenir, sonra tek toplu embedding görevi
+    stages = _reuse_stage_values(reuse_stages, force)
+    if queued_ids:
+        chord(
+            ingest_pipeline(vid, defer_embedding=True, reuse_stages=stages)
+            for vid in queued_ids
+        )(embed_videos_task.si(queued_ids, use_cache=CachedStage.EMBEDDING.value in stages))
     
     return {
         "queued": len(queued_ids),
@@ -523,12 +621,22 @@ async def reprocess_all_videos(
 @router.post("/{video_id}/reprocess", response_model=VideoResponse)
 async def reprocess_single_video(
     video_id: UUID,
+    reuse_stages: list[CachedStage] = Query(
+        default=ALL_STAGES,
+        description="file_hash cache'inden yeniden kullanılacak aşamalar (verilmezse hepsi)",
+    ),
+    force: bool = Query(
+        False,
+        description="True: cache kullanılmaz, tüm aşamalar yeniden üretilir (reuse_stages yok sayılır)",
+    ),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """
     Tek bir videoyu V2 pipeline ile yeniden işle.
     Video tamamlanmış olsa bile yeniden işlenir.
+    reuse_stages: Cache'ten kullanılacak aşamalar (örn. sadece caption'ı yenilemek için transcript+embedding).
+    force=True: Cache kullanılmaz, tüm aşamalar yeniden üretilir.
     """
     video = await _get_user_video(db, video_id, user.id)
     if not video:
@@ -543,18 +651,72 @@ async def reprocess_single_video(
             detail="Video source_url'i yok, yeniden işlenemez",
         )
     
-    # Durumu PENDING'e çevir ve eski verileri temizle
+    # Durumu PENDING'e çevir ve eski verileri temizle (search_vector trigger ile güncellenir)
     video.status = VideoStatus.PENDING
     video.description_ai = None
     video.transcript = None
+    video.transcript_segments = None
     video.title = None
     video.embedding = None
-    video.search_vector = None
     
     await db.flush()
     await db.refresh(video)
+    await library_changed(db, user.id)
     
     # Görevi tetikle
-    ingest_video_task.delay(str(video.id))
+    ingest_pipeline(str(video.id), reuse_stages=_reuse_stage_values(reuse_stages, force)).delay()
     
     return _serialize_video(video)
+
+
+@router.post("/reembed-all")
+async def reembed_all_videos(
+    user: User = Depends(get_current_user),
+):
+    """
+    Tüm tamamlanmış videoların sadece embedding'ini yeniden üretir.
+    Medya yeniden indirilmez; caption/transkript/başlık DB'deki haliyle kullanılır.
+    EMBEDDING_MODEL veya embedding metin formatı değiştiğinde kullanılır.
+    """
+    task = reembed_library_task.delay(str(user.id))
+    await reembed_jobs.remember_job(user.id, task.id)
+    return {"task_id": task.id, "message": "Yeniden embedding başlatıldı"}
+
+
+@router.get("/reembed-status/{task_id}")
+async def reembed_status(
+    task_id: str,
+    user: User = Depends(get_current_user),
+):
+    """Yeniden embedding görevinin ilerlemesi (done/total); sadece kullanıcının son reembed-all görevi."""
+    if not await reembed_jobs.owns_job(user.id, task_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Görev bulunamadı",
+        )
+    result = celery_app.AsyncResult(task_id)
+    info = result.info if isinstance(result.info, dict) else {}
+    return {
+        "task_id": task_id,
+        "state": result.state,
+        "done": info.get("done", 0),
+        "updated": info.get("updated", 0),
+        "total": info.get("total"),
+    }
+
+
+@router.post("/{video_id}/reembed", status_code=status.HTTP_202_ACCEPTED)
+async def reembed_single_video(
+    video_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Tek videonun embedding'ini DB'deki metinden yeniden üret (medya işlenmez)."""
+    video = await _get_user_video(db, video_id, user.id)
+    if not video:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video bulunamadı",
+        )
+    task = embed_videos_task.delay([str(video.id)])
+    return {"task_id": task.id, "video_id": str(video.id)}
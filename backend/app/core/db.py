@@ -1,6 +1,8 @@
 """
 Veritabanı bağlantısı - BLUEPRINT core/db.
 """
+from pgvector import HalfVector, Vector
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
@@ -12,6 +14,45 @@ engine = create_async_engine(
     future=True,
 )
 
+
+def _binary_encoder(cls):
+    """
+    vector / halfvec parametresini binary formata çevirir (metin parse'ı yok).
+    ORM kolonları (PgVector / HALFVEC bind_processor) '[...]' metni gönderir, ham sorgular list.
+    """
+    def encode(value) -> bytes:
+        if isinstance(value, str):
+            value = cls.from_text(value)
+        elif not isinstance(value, cls):
+            value = cls(value)
+        return value.to_binary()
+    return encode
+
+
+async def _register_vector_codec(conn) -> None:
+    # Decoder Vector / HalfVector döner; ORM kolonları (PgVector / HALFVEC) bunu list[float]'a
+    # çevirir (pgvector python >= 0.5, bkz. requirements.txt). Ham text() sorguları nesneyi alır.
+    # halfvec pgvector (extension) >= 0.7 ile gelir; yoksa sadece vector kaydedilir
+    for type_name, cls in (("vector", Vector), ("halfvec", HalfVector)):
+        try:
+            await conn.set_type_codec(
+                type_name,
+                schema="public",
+                encoder=_binary_encoder(cls),
+                decoder=cls.from_binary,
+                format="binary",
+            )
+        except ValueError as e:
+            # vector extension henüz kurulmamış (ilk migration öncesi) veya eski sürüm
+            print(f"[DB] pgvector {type_name} codec kaydedilemedi: {e}")
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    """Her yeni asyncpg bağlantısında pgvector binary codec'i kaydedilir."""
+    dbapi_connection.run_async(_register_vector_codec)
+
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
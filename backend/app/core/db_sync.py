@@ -1,19 +1,32 @@
 """
 Senkron DB oturumu - Celery worker ve batch işlemler için.
+Oturumlar kısa tutulur (bkz. workers/tasks.py ingest birimleri); havuz process başına küçüktür.
 """
 from contextlib import contextmanager
 from typing import Generator
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 from app.core.db import Base
 
+if settings.SYNC_DB_NULL_POOL:
+    _pool_kwargs: dict = {"poolclass": NullPool}
+else:
+    _pool_kwargs = {
+        "pool_size": settings.SYNC_DB_POOL_SIZE,
+        "max_overflow": settings.SYNC_DB_MAX_OVERFLOW,
+        "pool_timeout": settings.SYNC_DB_POOL_TIMEOUT,
+        "pool_recycle": settings.SYNC_DB_POOL_RECYCLE,
+    }
+
 sync_engine = create_engine(
     settings.DATABASE_URL_SYNC,
     echo=False,
     pool_pre_ping=True,
+    **_pool_kwargs,
 )
 SyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
 
@@ -0,0 +1,151 @@
+"""
+Embedding depolama profili - videos.embedding / stage_results.embedding kolon tipi ve vektör index'i.
+Profil migration'larda sabit olarak kaydedilir (bkz. alembic 010); ORM ve arama config'ten
+(EMBEDDING_DIMENSIONS / HALF_PRECISION / BINARY_INDEX) okur. İkisi ayrışırsa sorgular tip /
+operatör hatası verir: API ve worker açılışında verify_embedding_profile şemayı kontrol eder.
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+FULL_DIMENSIONS = 1536  # text-embedding-3-small varsayılan boyutu (004 şeması)
+EMBEDDING_TABLES = ("videos", "stage_results")
+HNSW_INDEX = "idx_videos_embedding_hnsw"
+BINARY_HNSW_INDEX = "idx_videos_embedding_bq_hnsw"
+VECTOR_INDEXES = (HNSW_INDEX, BINARY_HNSW_INDEX)
+
+
+@dataclass(frozen=True)
+class EmbeddingProfile:
+    dimensions: int = FULL_DIMENSIONS
+    half_precision: bool = False
+    binary_index: bool = False
+
+    @property
+    def vec_type(self) -> str:
+        return "halfvec" if self.half_precision else "vector"
+
+    @property
+    def column_type(self) -> str:
+        """format_type() çıktısıyla aynı biçim: vector(1536), halfvec(512)."""
+        return f"{self.vec_type}({self.dimensions})"
+
+    @property
+    def index_name(self) -> str:
+        return BINARY_HNSW_INDEX if self.binary_index else HNSW_INDEX
+
+
+def configured_profile() -> EmbeddingProfile:
+    return EmbeddingProfile(
+        dimensions=int(settings.EMBEDDING_DIMENSIONS),
+        half_precision=bool(settings.EMBEDDING_HALF_PRECISION),
+        binary_index=bool(settings.EMBEDDING_BINARY_INDEX),
+    )
+
+
+def parse_column_type(column_type: str) -> tuple[str, int]:
+    """'halfvec(512)' -> ('halfvec', 512)."""
+    name, _, rest = column_type.partition("(")
+    if not rest.endswith(")"):
+        raise ValueError(f"Beklenmeyen embedding kolon tipi: {column_type}")
+    return name, int(rest[:-1])
+
+
+def inspect_schema(conn) -> tuple[str | None, set[str]]:
+    """
+    Sync bağlantıdan gerçek şema: (videos.embedding tipi, mevcut vektör index'leri).
+    Tablo / kolon yoksa tip None döner.
+    """
+    column_type = conn.execute(text("""
+        SELECT format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        WHERE a.attrelid = to_regclass('videos')
+        AND a.attname = 'embedding'
+        AND NOT a.attisdropped
+    """)).scalar()
+    indexes = set(conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = 'videos' AND indexname = ANY(:names)"),
+        {"names": list(VECTOR_INDEXES)},
+    ).scalars())
+    return column_type, indexes
+
+
+def profile_mismatches(expected: EmbeddingProfile, column_type: str | None, indexes: set[str]) -> list[str]:
+    """Config profili ile şema arasındaki farklar (boş liste = uyumlu)."""
+    problems = []
+    if column_type != expected.column_type:
+        problems.append(f"videos.embedding {column_type}, config {expected.column_type} bekliyor")
+    if expected.index_name not in indexes:
+        problems.append(f"{expected.index_name} index'i yok")
+    stale = indexes - {expected.index_name}
+    if stale:
+        problems.append(f"profile ait olmayan index: {', '.join(sorted(stale))}")
+    return problems
+
+
+def conversion_statements(
+    column_type: str,
+    indexes: set[str],
+    target: EmbeddingProfile,
+    hnsw_m: int,
+    hnsw_ef_construction: int,
+) -> list[str]:
+    """
+    Mevcut şemayı (column_type, indexes) hedef profile çeviren SQL. Migration'lar kullanır.
+    text-embedding-3 kısaltılmış embedding'i, tam vektörün ilk N boyutunun L2 normalize
+    edilmiş haline eşittir (subvector + l2_normalize): küçültmede yeniden embedding gerekmez.
+    Büyütmede veri geri üretilemez, vektörler NULL'lanır (/videos/reembed-all gerekir).
+    pgvector >= 0.7 gerekir (halfvec, binary_quantize, subvector, l2_normalize).
+    """
+    if not profile_mismatches(target, column_type, indexes):
+        return []
+    statements = [f"DROP INDEX IF EXISTS {name}" for name in sorted(indexes)]
+
+    if column_type != target.column_type:
+        _, current_dims = parse_column_type(column_type)
+        dims = target.dimensions
+        if dims < current_dims:
+            using = f"l2_normalize(subvector(embedding, 1, {dims}))::{target.column_type}"
+        elif dims == current_dims:
+            using = f"embedding::{target.column_type}"
+        else:
+            using = "NULL"
+        for table in EMBEDDING_TABLES:
+            statements.append(
+                f"ALTER TABLE {table} ALTER COLUMN embedding TYPE {target.column_type} USING {using}"
+            )
+
+    with_clause = f"WITH (m = {int(hnsw_m)}, ef_construction = {int(hnsw_ef_construction)})"
+    if target.binary_index:
+        # Sadece bit index (dims/8 bayt/satır); tam hassasiyet rerank'te heap'ten okunur.
+        # İfade search.py _vector_candidates_sql ile birebir aynı olmalı.
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS {BINARY_HNSW_INDEX} ON videos USING hnsw "
+            f"((binary_quantize(embedding)::bit({target.dimensions})) bit_hamming_ops) {with_clause}"
+        )
+    else:
+        ops = f"{target.vec_type}_cosine_ops"
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS {HNSW_INDEX} ON videos USING hnsw "
+            f"(embedding {ops}) {with_clause}"
+        )
+    return statements
+
+
+def verify_embedding_profile(conn) -> None:
+    """
+    Açılış kontrolü (sync bağlantı; async'te conn.run_sync ile): config profili şemayla
+    uyuşmuyorsa RuntimeError. Migration'lar henüz çalışmadıysa (kolon yok) kontrol atlanır.
+    """
+    column_type, indexes = inspect_schema(conn)
+    if column_type is None:
+        print("[EmbeddingProfile] videos.embedding yok (migration bekleniyor), kontrol atlandı")
+        return
+    problems = profile_mismatches(configured_profile(), column_type, indexes)
+    if problems:
+        raise RuntimeError(
+            "Embedding depolama profili şemayla uyuşmuyor: " + "; ".join(problems)
+            + ". EMBEDDING_* ayarlarını şemaya göre düzeltin veya profili değiştiren bir migration ekleyin."
+        )
@@ -21,6 +21,16 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"[MemeVault] Örnek hesap oluşturulamadı (Docker/DB çalışıyor mu?): {e}")
     
+    # Embedding depolama profili: config şemayla uyuşmuyorsa uygulama başlamaz
+    from sqlalchemy.exc import DBAPIError
+    from app.core.db import engine
+    from app.core.embedding_profile import verify_embedding_profile
+    try:
+        async with engine.connect() as conn:
+            await conn.run_sync(verify_embedding_profile)
+    except (OSError, DBAPIError) as e:
+        print(f"[MemeVault] Embedding profili kontrol edilemedi (DB çalışıyor mu?): {e}")
+    
     # S3 bucket yoksa oluştur (MinIO ilk çalıştırmada bucket yoktur)
     try:
         from app.services.storage import ensure_bucket_exists
@@ -31,6 +41,14 @@ async def lifespan(app: FastAPI):
     
     yield
     # shutdown: cleanup
+    from app.services.intelligence import embedding_refresh, reembed_jobs, singleflight
+    from app.services.intelligence.search_cache import search_cache
+    from app.services.intelligence.vectorizer import close_async_client
+    await close_async_client()
+    await search_cache.aclose()
+    await singleflight.aclose()
+    await embedding_refresh.aclose()
+    await reembed_jobs.aclose()
 
 
 app = FastAPI(
@@ -52,6 +70,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # GET /videos/ keyset sayfalama
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -6,5 +6,6 @@ from app.models.folder import Folder
 from app.models.video import Video, VideoStatus
 from app.models.tag import Tag, TagType
 from app.models.video_tag import VideoTag
+from app.models.stage_result import StageResult
 
-__all__ = ["User", "Folder", "Video", "VideoStatus", "Tag", "TagType", "VideoTag"]
+__all__ = ["User", "Folder", "Video", "VideoStatus", "Tag", "TagType", "VideoTag", "StageResult"]
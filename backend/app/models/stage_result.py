@@ -0,0 +1,30 @@
+"""
+StageResult modeli - İçerik adresli pipeline sonuç cache'i.
+Anahtar: (file_hash, stage, model, version); aynı medya tekrar geldiğinde caption/transkript/embedding yeniden üretilmez.
+"""
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, String, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.core.db import Base
+
+from app.models.video import VECTOR_SIZE, EmbeddingVector
+
+
+class StageResult(Base):
+    __tablename__ = "stage_results"
+    __table_args__ = (
+        UniqueConstraint("file_hash", "stage", "model", "version", name="uq_stage_result_key"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    file_hash = Column(String(64), nullable=False)
+    stage = Column(String(32), nullable=False)  # caption | transcript | embedding
+    model = Column(String(128), nullable=False)
+    version = Column(String(64), nullable=False)  # prompt versiyonu / girdi özeti
+    text_result = Column(Text, nullable=True)
+    segments = Column(JSONB, nullable=True)  # transcript: zaman damgalı segmentler
+    embedding = Column(EmbeddingVector(VECTOR_SIZE), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
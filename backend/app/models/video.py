@@ -3,21 +3,29 @@ Video modeli - BLUEPRINT: id, source_url, s3_key, file_hash, description_manual,
 ADR: folder_id eklendi (Video–Folder ilişkisi).
 MVP: status eklendi (PENDING/PROCESSING/COMPLETED/FAILED).
 V2: title, transcript eklendi (arama doğruluğu iyileştirmesi).
+source_extractor + source_video_id: indirme öncesi duplicate kontrolü (yt-dlp kimliği).
+owner_id: folders.user_id'nin denormalize kopyası (kiracı filtresi, klasör fan-out'u olmadan).
+embedding_dirty_at: embedding metni (etiket / manuel açıklama) değişti, vektör yenilenmeyi bekliyor.
+transcript_segments: Whisper segmentleri (zaman damgalı), transcript bunların birleşimi.
 """
 import enum
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID, TSVECTOR
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
 
-# pgvector tipi; PostgreSQL'de CREATE EXTENSION vector gerekli
-from pgvector.sqlalchemy import Vector as PgVector
+from app.core.config import settings
 
-VECTOR_SIZE = 1536  # text-embedding-3-small
+# pgvector tipi; PostgreSQL'de CREATE EXTENSION vector gerekli (halfvec: pgvector >= 0.7)
+from pgvector.sqlalchemy import HALFVEC, Vector as PgVector
+
+# Depolama profili (bkz. config EMBEDDING_* ve 010 migration)
+VECTOR_SIZE = settings.EMBEDDING_DIMENSIONS  # text-embedding-3-small: 1536 (varsayılan)
+EmbeddingVector = HALFVEC if settings.EMBEDDING_HALF_PRECISION else PgVector
 
 
 class VideoStatus(str, enum.Enum):
@@ -29,12 +37,28 @@ class VideoStatus(str, enum.Enum):
 
 class Video(Base):
     __tablename__ = "videos"
+    __table_args__ = (
+        Index("ix_videos_source_identity", "source_extractor", "source_video_id"),
+        Index("ix_videos_owner_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_videos_owner_folder", "owner_id", "folder_id"),
+        Index("ix_videos_folder_created_at_id", "folder_id", "created_at", "id"),
+        Index(
+            "ix_videos_embedding_dirty",
+            "embedding_dirty_at",
+            "id",
+            postgresql_where=text("embedding_dirty_at IS NOT NULL"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     source_url = Column(String(2048), nullable=True)
     s3_key = Column(String(512), nullable=True)
     file_hash = Column(String(64), nullable=True, index=True)  # SHA-256 duplicate check
     
+    # Kaynak kimliği (yt-dlp extractor_key + video id) - indirmeden duplicate tespiti
+    source_extractor = Column(String(64), nullable=True)
+    source_video_id = Column(String(255), nullable=True)
+    
     # V2: Video başlığı (yt-dlp'den)
     title = Column(Text, nullable=True)
     
@@ -43,14 +67,17 @@ class Video(Base):
     
     # V2: Ses transkripti (Whisper'dan)
     transcript = Column(Text, nullable=True)
+    transcript_segments = Column(JSONB, nullable=True)  # [{"start", "end", "text"}] (saniye)
     
-    embedding = Column(PgVector(VECTOR_SIZE), nullable=True)
+    embedding = Column(EmbeddingVector(VECTOR_SIZE), nullable=True)
+    embedding_dirty_at = Column(DateTime(timezone=True), nullable=True)
     
     # V2: Full-text search için tsvector
     search_vector = Column(TSVECTOR, nullable=True)
     
     duration = Column(Integer, nullable=True)  # saniye
     folder_id = Column(UUID(as_uuid=True), ForeignKey("folders.id"), nullable=True)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     status = Column(Enum(VideoStatus), nullable=False, default=VideoStatus.PENDING)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
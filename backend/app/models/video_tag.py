@@ -3,7 +3,7 @@ VideoTags pivot tablosu - BLUEPRINT: Many-to-Many video_id <-> tag_id.
 """
 import uuid
 
-from sqlalchemy import Column, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -12,7 +12,11 @@ from app.core.db import Base
 
 class VideoTag(Base):
     __tablename__ = "video_tags"
-    __table_args__ = (UniqueConstraint("video_id", "tag_id", name="uq_video_tag"),)
+    __table_args__ = (
+        UniqueConstraint("video_id", "tag_id", name="uq_video_tag"),
+        # Etiket filtreli arama: tag_id -> video_id (index-only); video_id yönü uq_video_tag'de
+        Index("ix_video_tags_tag_video", "tag_id", "video_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id", ondelete="CASCADE"), nullable=False)
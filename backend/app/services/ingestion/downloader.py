@@ -37,26 +37,16 @@ def _get_ffmpeg_location() -> str | None:
     return None
 
 
-def download_video(
-    url: str,
-    output_dir: Path,
-    output_template: str | None = None,
-) -> dict[str, Any]:
-    """
-    Verilen URL'den videoyu indirir.
-    Returns: info dict (id, title, duration, file path, vb.).
-    """
-    template = output_template or settings.YT_DLP_OUTPUT_TEMPLATE
-    # yt-dlp outtmpl: dizin + şablon örn. "%(id)s.%(ext)s"
-    out_tmpl = str(Path(output_dir) / template)
-
+def _build_ydl_opts(out_tmpl: str | None = None) -> dict[str, Any]:
+    """Probe ve indirme için ortak yt-dlp ayarları (aynı format seçimi)."""
     # FFmpeg konumunu tespit et
     ffmpeg_loc = _get_ffmpeg_location()
     
-    ydl_opts = {
-        "outtmpl": out_tmpl,
+    ydl_opts: dict[str, Any] = {
         "quiet": False,
     }
+    if out_tmpl:
+        ydl_opts["outtmpl"] = out_tmpl
     
     # FFmpeg varsa en iyi kalite (birleştirmeli), yoksa tek format
     if ffmpeg_loc:
@@ -67,14 +57,63 @@ def download_video(
         # FFmpeg yoksa birleştirme gerektirmeyen en iyi format
         ydl_opts["format"] = "best[ext=mp4]/best"
         print("[yt-dlp] FFmpeg bulunamadı, birleştirme gerektirmeyen format kullanılıyor")
+    return ydl_opts
 
+
+def probe_source(url: str) -> dict[str, Any]:
+    """
+    Sadece metadata çeker (indirme yapmaz). Dönen info download_video(info=...) ile
+    tekrar kullanılabilir; böylece sayfa ikinci kez çözülmez.
+    """
+    ydl_opts = _build_ydl_opts()
+    ydl_opts["quiet"] = True
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=True)
+        info = ydl.extract_info(url, download=False)
         if info is None:
-            raise ValueError(f"Indirme basarisiz: {url}")
+            raise ValueError(f"Metadata alınamadı: {url}")
         return info
 
 
+def source_identity(info: dict[str, Any]) -> tuple[str, str] | None:
+    """
+    Kanonik kaynak kimliği: (extractor_key, video id).
+    Aynı videonun farklı URL biçimleri (youtu.be, shorts, ?si=...) aynı kimliği verir.
+    """
+    if info.get("_type", "video") != "video":
+        return None
+    extractor = info.get("extractor_key") or info.get("extractor")
+    vid = info.get("id")
+    if not extractor or not vid:
+        return None
+    return str(extractor)[:64], str(vid)[:255]
+
+
+def download_video(
+    url: str,
+    output_dir: Path,
+    output_template: str | None = None,
+    info: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    Verilen URL'den videoyu indirir.
+    info: probe_source çıktısı verilirse metadata tekrar çekilmeden indirilir.
+    Returns: info dict (id, title, duration, file path, vb.).
+    """
+    template = output_template or settings.YT_DLP_OUTPUT_TEMPLATE
+    # yt-dlp outtmpl: dizin + şablon örn. "%(id)s.%(ext)s"
+    out_tmpl = str(Path(output_dir) / template)
+    ydl_opts = _build_ydl_opts(out_tmpl)
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        if info is not None:
+            result = ydl.process_ie_result(info, download=True)
+        else:
+            result = ydl.extract_info(url, download=True)
+        if result is None:
+            raise ValueError(f"Indirme basarisiz: {url}")
+        return result
+
+
 def validate_url(url: str) -> bool:
     """Linkin desteklenen bir platforma ait olup olmadığını sadece kontrol eder (indirme yapmaz)."""
     try:
@@ -0,0 +1,76 @@
+"""
+Küçük DAG çalıştırıcı - Ingest pipeline aşamalarını thread pool'da paralel çalıştırır.
+Her aşama sadece bağımlılıkları bitince başlar; aşama süreleri ölçülür.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+@dataclass
+class Stage:
+    """
+    Pipeline aşaması.
+    fn: Bağımlılıkların sonuçlarını {isim: sonuç} dict'i olarak alır.
+    """
+    name: str
+    fn: Callable[[dict[str, Any]], Any]
+    deps: tuple[str, ...] = ()
+
+
+@dataclass
+class StageRun:
+    """run_stages çıktısı: sonuçlar, hatalar ve aşama süreleri (saniye)."""
+    results: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def run_stages(stages: list[Stage], max_workers: int = 4) -> StageRun:
+    """
+    Aşamaları bağımlılık sırasına uyarak paralel çalıştırır.
+    Hata veren aşamaya bağımlı aşamalar çalıştırılmaz (errors'a eklenir).
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Bilinmeyen bağımlılık: {s.name} -> {missing}")
+
+    run = StageRun()
+    pending = dict(by_name)
+    running: dict[Future, str] = {}
+
+    def _timed(stage: Stage, inputs: dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return stage.fn(inputs)
+        finally:
+            run.timings[stage.name] = round(time.perf_counter() - started, 3)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest") as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                failed_dep = next((d for d in stage.deps if d in run.errors), None)
+                if failed_dep:
+                    run.errors[name] = RuntimeError(f"Bağımlı aşama başarısız: {failed_dep}")
+                    del pending[name]
+                elif all(d in run.results for d in stage.deps):
+                    inputs = {d: run.results[d] for d in stage.deps}
+                    running[pool.submit(_timed, stage, inputs)] = name
+                    del pending[name]
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Döngüsel bağımlılık: {sorted(pending)}")
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    run.results[name] = fut.result()
+                except Exception as e:
+                    run.errors[name] = e
+    return run
@@ -3,6 +3,7 @@ FFMPEG işlemleri: Normalizer (standart MP4, thumbnail) ve Duplicate Check (file
 BLUEPRINT: Normalizer, Duplicate Checker.
 """
 import hashlib
+import json
 import shutil
 import subprocess
 from pathlib import Path
@@ -120,15 +121,33 @@ def _get_keyframe_percentages() -> list[float]:
         return [0.0, 0.25, 0.5, 0.75, 0.95]
 
 
+def _keyframe_times(duration_seconds: float) -> list[float]:
+    """KEYFRAME_COUNT yüzdelerine karşılık gelen zaman noktaları (saniye)."""
+    times = []
+    for percentage in _get_keyframe_percentages():
+        time_sec = duration_seconds * percentage
+        # Son kare için biraz geriye gel (video sonunda sorun olmaması için)
+        if percentage >= 0.95:
+            time_sec = max(0, duration_seconds - 0.5)
+        times.append(time_sec)
+    return times
+
+
 def extract_keyframes(
     video_path: Path, 
     output_dir: Path, 
-    duration_seconds: int | None = None
+    duration_seconds: float | None = None,
+    mode: str | None = None,
 ) -> list[Path]:
     """
     Videonun farklı anlarından keyframe'ler çıkarır.
     Config'deki KEYFRAME_COUNT ayarına göre kare sayısı belirlenir.
     
+    mode (varsayılan KEYFRAME_EXTRACTION_MODE):
+    - "select": Tüm kareler tek ffmpeg çağrısında (select filtresi ile zaman noktaları)
+    - "scene": Tek ffmpeg çağrısında sahne değişimlerinden kareler
+    - "seek": Her kare için ayrı ffmpeg (-ss ile atlama; uzun videolarda daha hızlı)
+    
     Returns: Çıkarılan keyframe dosyalarının yolları listesi
     """
     # Video süresini al (verilmediyse hesapla)
@@ -141,16 +160,72 @@ def extract_keyframes(
         extract_thumbnail(video_path, single_frame, time_sec=0.5)
         return [single_frame] if single_frame.exists() else []
     
+    mode = mode or settings.KEYFRAME_EXTRACTION_MODE
+    # Tek geçiş tüm videoyu decode eder; uzun videolarda seek daha ucuz
+    if mode in ("select", "scene") and duration_seconds <= settings.KEYFRAME_SINGLE_PASS_MAX_DURATION:
+        try:
+            keyframes = _extract_keyframes_single_pass(video_path, output_dir, duration_seconds, mode)
+            if keyframes:
+                return keyframes
+            print("[Keyframe] Tek geçişte kare çıkmadı, seek moduna geçiliyor")
+        except Exception as e:
+            print(f"[Keyframe] Tek geçiş hatası, seek moduna geçiliyor: {e}")
+    
+    return _extract_keyframes_seek(video_path, output_dir, duration_seconds)
+
+
+def _extract_keyframes_single_pass(
+    video_path: Path,
+    output_dir: Path,
+    duration_seconds: float,
+    mode: str,
+) -> list[Path]:
+    """
+    Tüm keyframe'leri tek ffmpeg sürecinde çıkarır (dosya bir kez açılır/demux edilir).
+    "select": Her hedef zaman için o zamandan sonraki ilk kare seçilir.
+    "scene": İlk kare + sahne değişim skoru eşiği geçen kareler.
+    """
+    times = _keyframe_times(duration_seconds)
+    if mode == "scene":
+        expr = f"eq(n,0)+gt(scene,{settings.KEYFRAME_SCENE_THRESHOLD})"
+    else:
+        # prev_selected_t: son seçilen karenin zamanı (başta NAN)
+        expr = "+".join(
+            f"gte(t,{t:.3f})*(isnan(prev_selected_t)+lt(prev_selected_t,{t:.3f}))"
+            for t in times
+        )
+    
+    ffmpeg = _get_ffmpeg_path()
+    cmd = [
+        ffmpeg,
+        "-y",
+        "-i", str(video_path),
+        "-an",
+        "-vf", f"select='{expr}'",
+        "-fps_mode", "vfr",
+        "-frames:v", str(len(times)),
+        "-q:v", "2",
+        "-start_number", "0",
+        str(output_dir / "keyframe_%d.jpg"),
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+    
+    return sorted(
+        output_dir.glob("keyframe_*.jpg"),
+        key=lambda p: int(p.stem.rsplit("_", 1)[-1]),
+    )
+
+
+def _extract_keyframes_seek(
+    video_path: Path,
+    output_dir: Path,
+    duration_seconds: float,
+) -> list[Path]:
+    """Her zaman noktası için ayrı ffmpeg çağrısı (-ss ile hızlı atlama)."""
     keyframes = []
     ffmpeg = _get_ffmpeg_path()
-    keyframe_percentages = _get_keyframe_percentages()
     
-    for i, percentage in enumerate(keyframe_percentages):
-        time_sec = duration_seconds * percentage
-        # Son kare için biraz geriye gel (video sonunda sorun olmaması için)
-        if percentage >= 0.95:
-            time_sec = max(0, duration_seconds - 0.5)
-        
+    for i, time_sec in enumerate(_keyframe_times(duration_seconds)):
         output_path = output_dir / f"keyframe_{i}.jpg"
         
         try:
@@ -168,7 +243,7 @@ def extract_keyframes(
             if output_path.exists():
                 keyframes.append(output_path)
         except Exception as e:
-            print(f"[Keyframe] {percentage*100:.0f}% karesinde hata: {e}")
+            print(f"[Keyframe] {time_sec:.1f}. saniyedeki karede hata: {e}")
             continue
     
     return keyframes
@@ -199,18 +274,117 @@ def extract_audio(video_path: Path, output_path: Path) -> Path | None:
         return None
 
 
-def get_duration_seconds(video_path: Path) -> int | None:
-    """ffprobe ile süre (saniye) döner."""
+def detect_silences(
+    audio_path: Path,
+    noise_db: int = -30,
+    min_silence: float = 0.5,
+) -> list[tuple[float, float]]:
+    """
+    ffmpeg silencedetect ile sessiz aralıkları bulur (parçalama sınırları için).
+    Returns: [(başlangıç, bitiş), ...] saniye cinsinden.
+    """
+    ffmpeg = _get_ffmpeg_path()
+    cmd = [
+        ffmpeg,
+        "-i", str(audio_path),
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+        "-f", "null",
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except Exception as e:
+        print(f"[Audio] Sessizlik tespiti hatası: {e}")
+        return []
+    
+    silences = []
+    start = None
+    for line in out.stderr.splitlines():
+        if "silence_start:" in line:
+            try:
+                start = float(line.split("silence_start:")[1].split()[0])
+            except (IndexError, ValueError):
+                start = None
+        elif "silence_end:" in line and start is not None:
+            try:
+                end = float(line.split("silence_end:")[1].split()[0])
+                silences.append((start, end))
+            except (IndexError, ValueError):
+                pass
+            start = None
+    return silences
+
+
+def cut_audio(audio_path: Path, output_path: Path, start: float, duration: float) -> Path | None:
+    """Ses dosyasından [start, start+duration] aralığını yeniden encode etmeden keser."""
+    ffmpeg = _get_ffmpeg_path()
+    cmd = [
+        ffmpeg,
+        "-y",
+        "-ss", f"{start:.3f}",
+        "-t", f"{duration:.3f}",
+        "-i", str(audio_path),
+        "-c", "copy",
+        str(output_path),
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        return output_path if output_path.exists() else None
+    except Exception as e:
+        print(f"[Audio] Ses kesme hatası ({start:.1f}s): {e}")
+        return None
+
+
+def probe_media(video_path: Path) -> dict[str, Any] | None:
+    """
+    Tek ffprobe çağrısı ile süre ve stream metadata'sı döner.
+    Returns: {"duration", "duration_float", "width", "height", "fps", "video_codec", "has_audio"} veya None.
+    """
     ffprobe = _get_ffprobe_path()
     cmd = [
         ffprobe,
         "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
+        "-show_entries", "format=duration:stream=codec_type,codec_name,width,height,avg_frame_rate",
+        "-of", "json",
         str(video_path),
     ]
     try:
         out = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return int(float(out.stdout.strip()))
-    except Exception:
+        data = json.loads(out.stdout or "{}")
+    except Exception as e:
+        print(f"[Probe] ffprobe hatası: {e}")
         return None
+    
+    streams = data.get("streams") or []
+    video_stream = next((st for st in streams if st.get("codec_type") == "video"), {})
+    
+    duration_float = None
+    try:
+        duration_float = float((data.get("format") or {}).get("duration"))
+    except (TypeError, ValueError):
+        pass
+    
+    fps = None
+    rate = video_stream.get("avg_frame_rate") or ""
+    if "/" in rate:
+        num, den = rate.split("/", 1)
+        try:
+            fps = float(num) / float(den) if float(den) else None
+        except ValueError:
+            fps = None
+    
+    return {
+        "duration": int(duration_float) if duration_float is not None else None,
+        "duration_float": duration_float,
+        "width": video_stream.get("width"),
+        "height": video_stream.get("height"),
+        "fps": fps,
+        "video_codec": video_stream.get("codec_name"),
+        "has_audio": any(st.get("codec_type") == "audio" for st in streams),
+    }
+
+
+def get_duration_seconds(video_path: Path) -> int | None:
+    """ffprobe ile süre (saniye) döner."""
+    info = probe_media(video_path)
+    return info["duration"] if info else None
@@ -9,6 +9,9 @@ from openai import OpenAI
 
 from app.core.config import settings
 
+# Prompt'lar değiştiğinde artırın (sonuç cache'i bu versiyonla anahtarlanır)
+CAPTION_PROMPT_VERSION = "v2"
+
 # Gelişmiş caption prompt - daha kapsamlı ve aranabilir açıklamalar için
 SINGLE_FRAME_PROMPT = """Bu video karesini analiz et ve şunları detaylıca açıkla:
 
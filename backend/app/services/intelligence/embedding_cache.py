@@ -0,0 +1,183 @@
+"""
+Sorgu embedding cache'i - iki katmanlı: process içi LRU + Redis (TTL).
+Anahtar: (normalize edilmiş sorgu, EMBEDDING_MODEL + EMBEDDING_DIMENSIONS); değer orijinal sorgunun embedding'i.
+Aynı sorgu tekrar geldiğinde OpenAI çağrısı yapılmaz.
+"""
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+KEY_PREFIX = "emb:q:"
+
+
+def normalize_query(text: str) -> str:
+    """
+    Boşlukları sadeleştirip küçük harfe çevirir - sadece cache anahtarı; embedding girdisi değildir
+    (büyük / küçük harf farkı embedding'i değiştirir, orijinal metin embed edilir).
+    """
+    return " ".join(text.split()).lower()
+
+
+def _cache_key(normalized: str, model: str) -> str:
+    digest = hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}{model}:{digest}"
+
+
+def _pack(vec: List[float]) -> bytes:
+    return array("f", vec).tobytes()
+
+
+def _unpack(raw: bytes) -> List[float]:
+    arr = array("f")
+    arr.frombytes(raw)
+    return arr.tolist()
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU; Redis ikinci katman. Redis erişilemezse sadece LRU ile çalışır.
+    get/set: senkron (Celery, script); aget/aset: async (FastAPI event loop'unu bloklamaz).
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int, redis_url: str):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._redis_url = redis_url
+        self._redis: redis.Redis | None = None
+        self._async_redis: aioredis.Redis | None = None
+        self._lru: OrderedDict[str, List[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _get_redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(self._redis_url, socket_timeout=0.5)
+        return self._redis
+
+    def _get_async_redis(self) -> aioredis.Redis:
+        if self._async_redis is None:
+            self._async_redis = aioredis.Redis.from_url(self._redis_url, socket_timeout=0.5)
+        return self._async_redis
+
+    def _memory_get(self, key: str) -> List[float] | None:
+        with self._lock:
+            vec = self._lru.get(key)
+            if vec is not None:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+            return vec
+
+    def _redis_hit(self, key: str, raw: bytes) -> List[float]:
+        vec = _unpack(raw)
+        self._remember(key, vec)
+        with self._lock:
+            self.redis_hits += 1
+        return vec
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def _remember(self, key: str, vec: List[float]) -> None:
+        with self._lock:
+            self._lru[key] = vec
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def get(self, normalized: str, model: str) -> List[float] | None:
+        key = _cache_key(normalized, model)
+        vec = self._memory_get(key)
+        if vec is not None:
+            return vec
+        try:
+            raw = self._get_redis().get(key)
+        except Exception as e:
+            print(f"[EmbeddingCache] Redis okuma hatası: {e}")
+            raw = None
+        if raw:
+            return self._redis_hit(key, raw)
+        self._miss()
+        return None
+
+    async def aget(self, normalized: str, model: str) -> List[float] | None:
+        key = _cache_key(normalized, model)
+        vec = self._memory_get(key)
+        if vec is not None:
+            return vec
+        try:
+            raw = await self._get_async_redis().get(key)
+        except Exception as e:
+            print(f"[EmbeddingCache] Redis okuma hatası: {e}")
+            raw = None
+        if raw:
+            return self._redis_hit(key, raw)
+        self._miss()
+        return None
+
+    async def apeek(self, normalized: str, model: str) -> List[float] | None:
+        """aget gibi ama sayaçları değiştirmez (single-flight bekleyenlerinin yoklaması için)."""
+        key = _cache_key(normalized, model)
+        with self._lock:
+            vec = self._lru.get(key)
+        if vec is not None:
+            return vec
+        try:
+            raw = await self._get_async_redis().get(key)
+        except Exception:
+            return None
+        if not raw:
+            return None
+        vec = _unpack(raw)
+        self._remember(key, vec)
+        return vec
+
+    def set(self, normalized: str, model: str, vec: List[float]) -> None:
+        key = _cache_key(normalized, model)
+        self._remember(key, vec)
+        try:
+            self._get_redis().set(key, _pack(vec), ex=self.ttl_seconds)
+        except Exception as e:
+            print(f"[EmbeddingCache] Redis yazma hatası: {e}")
+
+    async def aset(self, normalized: str, model: str, vec: List[float]) -> None:
+        key = _cache_key(normalized, model)
+        self._remember(key, vec)
+        try:
+            await self._get_async_redis().set(key, _pack(vec), ex=self.ttl_seconds)
+        except Exception as e:
+            print(f"[EmbeddingCache] Redis yazma hatası: {e}")
+
+    async def aclose(self) -> None:
+        if self._async_redis is not None:
+            await self._async_redis.aclose()
+            self._async_redis = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.redis_hits
+            total = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "size": len(self._lru),
+                "max_size": self.max_size,
+            }
+
+
+embedding_cache = EmbeddingCache(
+    max_size=settings.EMBEDDING_CACHE_SIZE,
+    ttl_seconds=settings.EMBEDDING_CACHE_TTL,
+    redis_url=settings.REDIS_URL,
+)
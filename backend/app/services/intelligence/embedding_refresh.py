@@ -0,0 +1,85 @@
+"""
+Artımlı embedding yenileme - etiket / manuel açıklama değişince videonun vektörü güncellenir.
+Endpoint videoyu kirli işaretler (videos.embedding_dirty_at), commit sonrası schedule_refresh çağırır.
+Debounce: Redis SET NX; pencere içindeki tüm değişiklikler tek flush task'ında toplanır.
+Aynı videonun art arda düzenlemeleri tek satırda (tek embedding) kalır; farklı videolar
+EMBEDDING_BATCH_MAX_ITEMS'lık toplu embedding istekleriyle işlenir (bkz. reembedding.py).
+"""
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.models import Video
+from app.workers.celery_app import celery_app
+
+SCHEDULE_KEY = "emb:refresh:scheduled"
+FLUSH_TASK = "app.workers.tasks.flush_embedding_refresh_task"
+
+_redis: redis.Redis | None = None
+_async_redis: aioredis.Redis | None = None
+
+
+def _get_redis() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5)
+    return _redis
+
+
+def _get_async_redis() -> aioredis.Redis:
+    global _async_redis
+    if _async_redis is None:
+        _async_redis = aioredis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5)
+    return _async_redis
+
+
+async def aclose() -> None:
+    global _async_redis
+    if _async_redis is not None:
+        await _async_redis.aclose()
+        _async_redis = None
+
+
+def mark_dirty(video: Video) -> None:
+    """Videonun embedding metni değişti; flush'ta yeniden üretilecek (flush / commit çağırana ait)."""
+    video.embedding_dirty_at = func.now()
+
+
+async def schedule_refresh() -> None:
+    """
+    Commit sonrası çağrılır. Pencerede zaten planlanmış bir flush varsa bir şey yapmaz;
+    yoksa EMBEDDING_REFRESH_DEBOUNCE_SECONDS sonra çalışacak flush task'ını kuyruğa koyar.
+    Redis erişilemezse debounce'suz planlanır (flush kirli video bulamazsa hemen biter).
+    """
+    delay = max(int(settings.EMBEDDING_REFRESH_DEBOUNCE_SECONDS), 0)
+    try:
+        scheduled = await _get_async_redis().set(SCHEDULE_KEY, "1", nx=True, ex=max(delay, 1))
+    except Exception as e:
+        print(f"[EmbeddingRefresh] Redis debounce hatası: {e}")
+        scheduled = True
+    if scheduled:
+        celery_app.send_task(FLUSH_TASK, countdown=delay)
+
+
+def schedule_refresh_sync() -> None:
+    """schedule_refresh'in worker (sync) karşılığı: ingest, kirli kalan bir videoyu tamamlayınca çağırır."""
+    delay = max(int(settings.EMBEDDING_REFRESH_DEBOUNCE_SECONDS), 0)
+    try:
+        scheduled = _get_redis().set(SCHEDULE_KEY, "1", nx=True, ex=max(delay, 1))
+    except Exception as e:
+        print(f"[EmbeddingRefresh] Redis debounce hatası: {e}")
+        scheduled = True
+    if scheduled:
+        celery_app.send_task(FLUSH_TASK, countdown=delay)
+
+
+def release_schedule() -> None:
+    """
+    Flush başında çağrılır: bundan sonra commit edilen değişiklikler yeni bir flush planlar.
+    Öncekiler bu flush'ın okumasında zaten görünür (işaretleme commit'ten önce yapılır).
+    """
+    try:
+        _get_redis().delete(SCHEDULE_KEY)
+    except Exception as e:
+        print(f"[EmbeddingRefresh] Redis debounce anahtarı silinemedi: {e}")
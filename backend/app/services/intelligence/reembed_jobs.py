@@ -0,0 +1,48 @@
+"""
+Yeniden embedding görevlerinin sahipliği - reembed-status sadece görevi başlatan kullanıcıya açık.
+POST /videos/reembed-all task id'yi Redis'te reembed:{user_id} anahtarına yazar (kullanıcı başına
+son görev); durum sorgusunda id eşleşmezse 404 döner. Redis erişilemezse sorgu reddedilir.
+"""
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+KEY_PREFIX = "reembed:"
+JOB_TTL_SECONDS = 60 * 60 * 24  # Kütüphane ne kadar büyük olursa olsun görev bu sürede biter
+
+_redis: aioredis.Redis | None = None
+
+
+def _get_redis() -> aioredis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = aioredis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5)
+    return _redis
+
+
+async def aclose() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def _key(user_id) -> str:
+    return f"{KEY_PREFIX}{user_id}"
+
+
+async def remember_job(user_id, task_id: str) -> None:
+    """Görev kuyruğa konunca çağrılır; kullanıcının önceki görev kaydının üzerine yazar."""
+    try:
+        await _get_redis().set(_key(user_id), task_id, ex=JOB_TTL_SECONDS)
+    except Exception as e:
+        print(f"[ReembedJobs] Redis yazma hatası: {e}")
+
+
+async def owns_job(user_id, task_id: str) -> bool:
+    try:
+        stored = await _get_redis().get(_key(user_id))
+    except Exception as e:
+        print(f"[ReembedJobs] Redis okuma hatası: {e}")
+        return False
+    return stored is not None and stored.decode() == task_id
@@ -0,0 +1,242 @@
+"""
+Toplu embedding üretimi - DB'deki metinlerden (title, caption, transcript, tags) vektör.
+Birçok videonun metni tek embeddings isteğinde gruplanır, sonuçlar tek bulk UPDATE ile yazılır.
+API çağrısı DB transaction'ı dışında yapılır: oku (kısa birim) -> embed -> yaz (kısa birim).
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import delete, select, text, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db_sync import get_sync_session
+from app.models import StageResult, Tag, Video, VideoStatus, VideoTag
+from app.services.intelligence.result_cache import CachedStage, put_cached, stage_key
+from app.services.intelligence.vectorizer import get_embeddings, text_for_embedding
+
+
+def build_embedding_texts(session: Session, video_ids: list[UUID]) -> dict[UUID, str]:
+    """
+    Videoların embedding metnini DB'deki alanlardan oluşturur (2 sorgu: videolar + etiketler).
+    Metni boş olan videolar sonuçta yer almaz.
+    """
+    if not video_ids:
+        return {}
+    rows = session.execute(
+        select(
+            Video.id, Video.title, Video.description_manual, Video.description_ai, Video.transcript
+        ).where(Video.id.in_(video_ids))
+    ).all()
+    tag_rows = session.execute(
+        select(VideoTag.video_id, Tag.name)
+        .join(Tag, Tag.id == VideoTag.tag_id)
+        .where(VideoTag.video_id.in_(video_ids))
+    ).all()
+    tags_by_video: dict[UUID, list[str]] = defaultdict(list)
+    for vid, name in tag_rows:
+        tags_by_video[vid].append(name)
+
+    texts = {}
+    for vid, title, description_manual, description_ai, transcript in rows:
+        text = text_for_embedding(
+            description_ai=description_ai or "",
+            tags=tags_by_video.get(vid, []),
+            title=title or "",
+            transcript=transcript or "",
+            description_manual=description_manual or "",
+        )
+        if text.strip():
+            texts[vid] = text
+    return texts
+
+
+def bulk_update_embeddings(session: Session, embeddings: dict[UUID, List[float]]) -> None:
+    """Vektörleri primary key üzerinden tek bulk UPDATE ile yazar (commit çağırana ait)."""
+    if not embeddings:
+        return
+    session.execute(
+        update(Video),
+        [{"id": vid, "embedding": vec} for vid, vec in embeddings.items()],
+    )
+
+
+def _cached_embeddings(
+    session: Session,
+    texts: dict[UUID, str],
+    file_hashes: dict[UUID, str],
+) -> dict[UUID, List[float]]:
+    """file_hash cache'inden (tek sorgu) metni birebir aynı olan embedding'leri bulur."""
+    wanted: dict[UUID, tuple[str, str]] = {}
+    for vid, text in texts.items():
+        h = file_hashes.get(vid)
+        if h:
+            _, version = stage_key(CachedStage.EMBEDDING, embedding_text=text)
+            wanted[vid] = (h, version)
+    if not wanted:
+        return {}
+    # Sadece hesaplanan (file_hash, version) çiftleri okunur; hash'in diğer sürümleri gelmez
+    rows = session.execute(
+        select(StageResult.file_hash, StageResult.version, StageResult.embedding).where(
+            StageResult.stage == CachedStage.EMBEDDING.value,
+            StageResult.model == settings.EMBEDDING_MODEL,
+            tuple_(StageResult.file_hash, StageResult.version).in_(set(wanted.values())),
+        )
+    ).all()
+    by_key = {(h, version): emb for h, version, emb in rows if emb is not None}
+    return {vid: by_key[key] for vid, key in wanted.items() if key in by_key}
+
+
+def prune_embedding_cache(session: Session, file_hashes: set[str]) -> None:
+    """
+    Verilen file_hash'lerin embedding cache satırlarından, o hash'i paylaşan hiçbir videonun
+    güncel metnine (veya güncel modele) karşılık gelmeyenleri siler (commit çağırana ait).
+    version metin özetini içerir: her etiket / açıklama değişikliği yeni satır bırakır; aynı
+    medyayı farklı etiketlerle tutan videoların (hash-duplicate) satırları korunur.
+    """
+    if not file_hashes:
+        return
+    owners = session.execute(
+        select(Video.id, Video.file_hash).where(Video.file_hash.in_(file_hashes))
+    ).all()
+    texts = build_embedding_texts(session, [vid for vid, _ in owners])
+    keep = {
+        (h, stage_key(CachedStage.EMBEDDING, embedding_text=texts[vid])[1])
+        for vid, h in owners
+        if vid in texts
+    }
+    rows = session.execute(
+        select(StageResult.id, StageResult.file_hash, StageResult.model, StageResult.version).where(
+            StageResult.stage == CachedStage.EMBEDDING.value,
+            StageResult.file_hash.in_(file_hashes),
+        )
+    ).all()
+    stale = [
+        row_id for row_id, h, model, version in rows
+        if model != settings.EMBEDDING_MODEL or (h, version) not in keep
+    ]
+    if stale:
+        session.execute(delete(StageResult).where(StageResult.id.in_(stale)))
+
+
+@dataclass
+class EmbeddingBatch:
+    """Bir sayfanın embedding işi: okuma biriminde doldurulur, API çağrısı session dışında yapılır."""
+    texts: dict[UUID, str]
+    file_hashes: dict[UUID, str]
+    vectors: dict[UUID, List[float]]  # cache'ten gelenler + API'den üretilenler
+    fresh: set[UUID] = field(default_factory=set)  # API'den üretilen (cache'e yazılacak)
+
+
+def load_embedding_batch(session: Session, video_ids: list[UUID], use_cache: bool = True) -> EmbeddingBatch:
+    """Okuma birimi: metinler, file_hash'ler ve (use_cache ise) cache'teki vektörler."""
+    texts = build_embedding_texts(session, video_ids)
+    if not texts:
+        return EmbeddingBatch({}, {}, {})
+    file_hashes = dict(
+        session.execute(
+            select(Video.id, Video.file_hash).where(
+                Video.id.in_(list(texts.keys())),
+                Video.file_hash.isnot(None),
+            )
+        ).all()
+    )
+    vectors = _cached_embeddings(session, texts, file_hashes) if use_cache else {}
+    return EmbeddingBatch(texts, file_hashes, vectors)
+
+
+def generate_missing(batch: EmbeddingBatch) -> None:
+    """Cache'te olmayan metinleri toplu embed eder. DB bağlantısı tutulmadan çağrılmalı."""
+    missing = [vid for vid in batch.texts if vid not in batch.vectors]
+    if not missing:
+        return
+    # Reddedilen (None) metinler yazılmaz; video mevcut embedding'ini korur
+    for vid, vec in zip(missing, get_embeddings([batch.texts[vid] for vid in missing])):
+        if vec is not None:
+            batch.vectors[vid] = vec
+            batch.fresh.add(vid)
+
+
+def write_embedding_batch(session: Session, batch: EmbeddingBatch) -> int:
+    """Yazma birimi: yeni vektörler cache'e, tüm vektörler videolara (commit çağırana ait)."""
+    cached_hashes = set()
+    for vid in batch.fresh:
+        if batch.file_hashes.get(vid):
+            put_cached(
+                session, batch.file_hashes[vid], CachedStage.EMBEDDING,
+                embedding=batch.vectors[vid], embedding_text=batch.texts[vid],
+            )
+            cached_hashes.add(batch.file_hashes[vid])
+    bulk_update_embeddings(session, batch.vectors)
+    prune_embedding_cache(session, cached_hashes)
+    return len(batch.vectors)
+
+
+def embed_videos(video_ids: list[UUID], use_cache: bool = True) -> int:
+    """
+    Verilen videoların embedding'lerini toplu olarak yeniden üretir ve yazar.
+    Metinler kısa bir transaction'da okunur, API çağrısı sırasında bağlantı havuza döner,
+    sonuçlar ikinci kısa transaction'da yazılır.
+    use_cache: file_hash + metin özeti cache'te olanlar için API çağrılmaz; yeni sonuçlar cache'e yazılır.
+    Returns: Güncellenen video sayısı.
+    """
+    with get_sync_session() as session:
+        batch = load_embedding_batch(session, video_ids, use_cache=use_cache)
+    if not batch.texts:
+        return 0
+    generate_missing(batch)
+    with get_sync_session() as session:
+        return write_embedding_batch(session, batch)
+
+
+def refresh_dirty_embeddings(
+    limit: int,
+    after: tuple[datetime, UUID] | None = None,
+) -> tuple[list[tuple[UUID, UUID | None, datetime]], int]:
+    """
+    Kirli işaretli (embedding_dirty_at) en eski `limit` tamamlanmış videoyu toplu olarak yeniden embed eder.
+    İşlenmekte / başarısız videolar atlanır: metinleri yarım olabilir; ingest tamamlanınca
+    hâlâ kirliyse yeni bir flush planlar (bkz. tasks._write_results).
+    after: (embedding_dirty_at, id) keyset imleci; flush döngüsü her sayfada ilerler.
+    Okuma ve yazma ayrı kısa transaction'lardır, API çağrısı arada yapılır. İşaret, sadece
+    okunan zaman damgası hâlâ aynıysa temizlenir: okumadan sonra gelen düzenleme videoyu
+    kirli bırakır ve sonraki flush'ta işlenir.
+    Returns: (işlenen satırlar [(id, owner_id, embedding_dirty_at)], güncellenen video sayısı).
+    """
+    with get_sync_session() as session:
+        q = select(Video.id, Video.owner_id, Video.embedding_dirty_at).where(
+            Video.embedding_dirty_at.isnot(None),
+            Video.status == VideoStatus.COMPLETED,
+        )
+        if after is not None:
+            q = q.where(tuple_(Video.embedding_dirty_at, Video.id) > tuple_(*after))
+        rows = [
+            tuple(r) for r in session.execute(
+                q.order_by(Video.embedding_dirty_at, Video.id).limit(limit)
+            ).all()
+        ]
+        if not rows:
+            return [], 0
+        batch = load_embedding_batch(session, [vid for vid, _, _ in rows])
+
+    generate_missing(batch)
+
+    with get_sync_session() as session:
+        updated = write_embedding_batch(session, batch)
+        session.execute(
+            text("""
+                UPDATE videos v
+                SET embedding_dirty_at = NULL
+                FROM unnest(CAST(:ids AS uuid[]), CAST(:stamps AS timestamptz[])) AS s(id, stamp)
+                WHERE v.id = s.id
+                AND v.embedding_dirty_at = s.stamp
+            """),
+            {
+                "ids": [str(vid) for vid, _, _ in rows],
+                "stamps": [stamp for _, _, stamp in rows],
+            },
+        )
+    return rows, updated
@@ -0,0 +1,92 @@
+"""
+İçerik adresli sonuç cache'i - (file_hash, stage, model, version) -> caption / transkript / embedding.
+Aynı medya farklı URL'den geldiğinde veya yeniden işlendiğinde ücretli API çağrıları tekrarlanmaz.
+Prompt veya model değişince anahtar değişir, eski sonuçlar kendiliğinden kullanılmaz.
+"""
+import enum
+import hashlib
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import StageResult
+from app.services.intelligence.captioning import CAPTION_PROMPT_VERSION
+from app.services.intelligence.transcription import TRANSCRIPTION_MODEL, TRANSCRIPTION_VERSION
+
+# Embedding metin formatı (text_for_embedding) değişirse artırın
+EMBEDDING_TEXT_VERSION = "v1"
+
+
+class CachedStage(str, enum.Enum):
+    CAPTION = "caption"
+    TRANSCRIPT = "transcript"
+    EMBEDDING = "embedding"
+
+
+ALL_STAGES = [s.value for s in CachedStage]
+
+
+def stage_key(stage: CachedStage, embedding_text: str = "", language: str = "tr") -> tuple[str, str]:
+    """Aşamanın (model, version) anahtarı; sonucu etkileyen ayarlar version'a dahildir."""
+    if stage == CachedStage.CAPTION:
+        return settings.CAPTION_MODEL, f"{CAPTION_PROMPT_VERSION}:k{settings.KEYFRAME_COUNT}:{settings.KEYFRAME_EXTRACTION_MODE}"
+    if stage == CachedStage.TRANSCRIPT:
+        return TRANSCRIPTION_MODEL, f"{TRANSCRIPTION_VERSION}:{language}"
+    digest = hashlib.sha256(embedding_text.encode("utf-8")).hexdigest()[:32]
+    return settings.EMBEDDING_MODEL, f"{EMBEDDING_TEXT_VERSION}:{digest}"
+
+
+def get_cached(
+    session: Session,
+    file_hash: str,
+    stage: CachedStage,
+    embedding_text: str = "",
+) -> StageResult | None:
+    model, version = stage_key(stage, embedding_text)
+    return session.execute(
+        select(StageResult).where(
+            StageResult.file_hash == file_hash,
+            StageResult.stage == stage.value,
+            StageResult.model == model,
+            StageResult.version == version,
+        )
+    ).scalar_one_or_none()
+
+
+def put_cached(
+    session: Session,
+    file_hash: str,
+    stage: CachedStage,
+    text_result: str | None = None,
+    embedding: List[float] | None = None,
+    embedding_text: str = "",
+    segments: list[dict] | None = None,
+) -> None:
+    """
+    Sonucu yazar (aynı anahtar varsa günceller). Commit çağırana aittir.
+    Embedding'in eski metin satırları burada silinmez: aynı file_hash'i paylaşan videolar farklı
+    metinlerle (etiketlerle) aynı anda geçerli olabilir, bkz. reembedding.prune_embedding_cache.
+    """
+    model, version = stage_key(stage, embedding_text)
+    stmt = insert(StageResult).values(
+        file_hash=file_hash,
+        stage=stage.value,
+        model=model,
+        version=version,
+        text_result=text_result,
+        embedding=embedding,
+        segments=segments,
+    )
+    session.execute(
+        stmt.on_conflict_do_update(
+            constraint="uq_stage_result_key",
+            set_={
+                "text_result": stmt.excluded.text_result,
+                "embedding": stmt.excluded.embedding,
+                "segments": stmt.excluded.segments,
+            },
+        )
+    )
@@ -1,52 +1,249 @@
 """
 Hybrid Search - Vektör + Full-text arama birleşimi.
 V2: Semantik benzerlik + keyword eşleşme ile daha doğru sonuçlar.
+Tüm değerler bound parametre: SQL metni sabit kalır, asyncpg prepared statement'ları
+yeniden kullanır; sorgu vektörü binary codec ile gider (bkz. core/db.py).
 """
+import asyncio
+import re
+from typing import List
 from uuid import UUID
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.intelligence.vectorizer import get_embedding
+from app.core.config import settings
+from app.services.intelligence.vectorizer import get_query_embedding_async
 
 
 # Hybrid search ağırlıkları
 VECTOR_WEIGHT = 0.7  # Semantik benzerlik ağırlığı
 FTS_WEIGHT = 0.3     # Full-text search ağırlığı
+TRGM_WEIGHT = 0.1    # keyword_boost: trigram (yazım hatası toleranslı) benzerlik ağırlığı
+
+
+def _scope_filter(
+    owner_id: UUID,
+    folder_id: UUID | None,
+    tag_ids: list[UUID] | None = None,
+) -> tuple[str, dict]:
+    """
+    Kiracı filtresi: videos.owner_id (denormalize) ile; klasör listesi IN (...) olarak gömülmez.
+    tag_ids: etiketlerden en az birine sahip videolar (video_tags üzerinden semi-join,
+    ix_video_tags_tag_video index'i); etiket listesi tek uuid[] parametresi.
+    SQL parçası sadece folder_id / tag_ids var/yok'a göre değişir (sabit sorgu metinleri).
+    Returns: (SQL parçası, bound parametreler).
+    """
+    params: dict = {"owner_id": owner_id}
+    sql = "owner_id = :owner_id"
+    if folder_id is not None:
+        sql += " AND folder_id = :folder_id"
+        params["folder_id"] = folder_id
+    if tag_ids:
+        sql += (
+            " AND id IN (SELECT video_id FROM video_tags"
+            " WHERE tag_id = ANY(CAST(:tag_ids AS uuid[])))"
+        )
+        params["tag_ids"] = list(tag_ids)
+    return sql, params
+
+
+async def _tag_prefilter_is_selective(
+    db: AsyncSession,
+    owner_id: UUID,
+    folder_id: UUID | None,
+    tag_ids: list[UUID] | None,
+) -> bool:
+    """
+    Etiket filtresi için plan seçimi: arama kapsamındaki (sahip + klasör + etiket) video sayısı
+    TAG_PREFILTER_MAX_VIDEOS'u aşmıyorsa True (ön filtre + tam mesafe sıralaması).
+    Sayım aramayla aynı _scope_filter üzerinden videoları sayar (çok etiketli video bir kez);
+    LIMIT ile eşikte durur, yaygın etiketlerde de maliyeti sınırlıdır.
+    """
+    if not tag_ids or settings.TAG_PREFILTER_MAX_VIDEOS <= 0:
+        return False
+    scope_filter, params = _scope_filter(owner_id, folder_id, tag_ids)
+    params["cap"] = settings.TAG_PREFILTER_MAX_VIDEOS + 1
+    result = await db.execute(
+        text(f"""
+            SELECT count(*) FROM (
+                SELECT 1 FROM videos
+                WHERE {scope_filter}
+                LIMIT :cap
+            ) AS tagged
+        """),
+        params,
+    )
+    return int(result.scalar() or 0) <= settings.TAG_PREFILTER_MAX_VIDEOS
+
+
+def _like_escape(word: str) -> str:
+    """LIKE desenindeki özel karakterleri (%, _, \\) kaçışlar; kelime birebir aranır."""
+    return word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+HNSW_EF_SEARCH_MAX = 1000  # pgvector hnsw.ef_search üst sınırı
+
+
+def _qvec_sql() -> str:
+    """Sorgu vektörü parametresi; kolon tipiyle (vector / halfvec) aynı olmalı ki HNSW index kullanılsın."""
+    return f"CAST(:qvec AS {'halfvec' if settings.EMBEDDING_HALF_PRECISION else 'vector'})"
+
+
+def _vector_params(pool: int, exact: bool = False) -> dict:
+    """_vector_candidates_sql parametreleri: binary profilde ilk geçiş pool * SEARCH_RERANK_FACTOR aday."""
+    params = {"pool": pool}
+    if settings.EMBEDDING_BINARY_INDEX and not exact:
+        params["first_pass"] = min(pool * settings.SEARCH_RERANK_FACTOR, HNSW_EF_SEARCH_MAX)
+    return params
+
+
+def _vector_candidates_sql(scope_filter: str, exact: bool = False) -> str:
+    """
+    ANN aday alt sorgusu (en yakın :pool video id'si).
+    Binary profilde iki aşamalı: binary_quantize (Hamming) HNSW index'inden :first_pass aday,
+    sonra bunlar tam hassasiyetli cosine mesafesiyle yeniden sıralanır (rerank).
+    İfade 010 migration'ındaki index ifadesiyle birebir aynı olmalı.
+    
+    exact=True (seçici etiket filtresi): HNSW kullanılmaz; filtreye uyan az sayıdaki video
+    video_tags index'inden bulunup tam mesafeyle sıralanır. OFFSET 0 alt sorguyu
+    planlayıcıdan ayırır; ORDER BY hesaplanmış kolonda olduğundan index taraması seçilemez.
+    exact=False + etiket filtresi: HNSW taraması + post-filter; iterative scan yeterli
+    aday bulunana kadar taramayı sürdürür (bkz. _apply_ef_search).
+    """
+    qvec = _qvec_sql()
+    if exact:
+        return f"""
+            SELECT id
+            FROM (
+                SELECT id, embedding <=> {qvec} AS distance
+                FROM videos
+                WHERE embedding IS NOT NULL
+                AND {scope_filter}
+                OFFSET 0
+            ) AS tagged
+            ORDER BY distance
+            LIMIT :pool"""
+    if not settings.EMBEDDING_BINARY_INDEX:
+        return f"""
+            SELECT id
+            FROM videos
+            WHERE embedding IS NOT NULL
+            AND {scope_filter}
+            ORDER BY embedding <=> {qvec}
+            LIMIT :pool"""
+    bits = f"bit({int(settings.EMBEDDING_DIMENSIONS)})"
+    return f"""
+            SELECT id
+            FROM (
+                SELECT id, embedding
+                FROM videos
+                WHERE embedding IS NOT NULL
+                AND {scope_filter}
+                ORDER BY binary_quantize(embedding)::{bits} <~> binary_quantize({qvec})
+                LIMIT :first_pass
+            ) AS first_pass
+            ORDER BY embedding <=> {qvec}
+            LIMIT :pool"""
+
+
+def _consume_result(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[Search] Arka plan embedding hatası: {task.exception()}")
+
+
+async def query_embedding_within_budget(query_text: str, budget_ms: int | None = None) -> List[float] | None:
+    """
+    Sorgu embedding'ini en fazla budget_ms bekler; süre aşılırsa veya API hata verirse None.
+    Süre aşımında istek iptal edilmez: arka planda tamamlanıp cache'e yazılır,
+    sonraki aynı sorgu hybrid sonuç alır.
+    """
+    budget = settings.SEARCH_EMBEDDING_BUDGET_MS if budget_ms is None else budget_ms
+    task = asyncio.ensure_future(get_query_embedding_async(query_text))
+    try:
+        if budget <= 0:
+            return await task
+        return await asyncio.wait_for(asyncio.shield(task), budget / 1000)
+    except asyncio.TimeoutError:
+        task.add_done_callback(_consume_result)
+        print(f"[Search] Embedding {budget} ms içinde gelmedi, FTS'e düşülüyor")
+    except Exception as e:
+        print(f"[Search] Embedding hatası, FTS'e düşülüyor: {e}")
+    return None
+
+
+async def fts_search(
+    db: AsyncSession,
+    query_text: str,
+    owner_id: UUID,
+    folder_id: UUID | None = None,
+    limit: int = 10,
+    min_score: float | None = 0.0,
+    fts_weight: float = FTS_WEIGHT,
+    tag_ids: list[UUID] | None = None,
+) -> list[tuple[UUID, str | None, str | None, str | None, float, None, float]]:
+    """
+    Sadece full-text (search_vector GIN index) arama - embedding alınamadığında yedek yol.
+    hybrid_search ile aynı satır şekli; vector_score None, hybrid skor = fts_weight * fts_score.
+    
+    Returns: list of (video_id, s3_key, title, description_ai, hybrid_score, None, fts_score).
+    """
+    scope_filter, params = _scope_filter(owner_id, folder_id, tag_ids)
+    params.update(q=query_text, limit=limit)
+    sql = text(f"""
+        SELECT id, s3_key, title, description_ai,
+               ts_rank_cd(search_vector, plainto_tsquery('pg_catalog.simple', :q)) AS fts_score
+        FROM videos
+        WHERE search_vector @@ plainto_tsquery('pg_catalog.simple', :q)
+        AND {scope_filter}
+        ORDER BY fts_score DESC
+        LIMIT :limit
+    """)
+    result = await db.execute(sql, params)
+    out = []
+    for vid, s3_key, title, desc_ai, fts_score in result.fetchall():
+        fts_score = float(fts_score) if fts_score is not None else 0.0
+        score = fts_weight * fts_score
+        if min_score is not None and score < min_score:
+            continue
+        out.append((vid, s3_key, title, desc_ai, score, None, fts_score))
+    return out
 
 
 async def vector_search(
     db: AsyncSession,
     query_text: str,
-    folder_ids: list[UUID],
+    owner_id: UUID,
     folder_id: UUID | None = None,
     limit: int = 10,
     min_score: float | None = 0.0,
+    query_vec: List[float] | None = None,
+    tag_ids: list[UUID] | None = None,
 ) -> list[tuple[UUID, str | None, str | None, float]]:
     """
     Metin sorgusunu vektöre çevirip pgvector ile en yakın videoları döner.
+    tag_ids: etiketlerden en az birine sahip videolar (plan: _tag_prefilter_is_selective).
     Returns: list of (video_id, s3_key, description_ai, score).
     """
-    if not folder_ids:
-        return []
-    vec = get_embedding(query_text)
-    vec_str = "[" + ",".join(str(x) for x in vec) + "]"
-    folder_list = ",".join(f"'{f}'" for f in folder_ids)
-    folder_filter = f"AND folder_id IN ({folder_list})"
-    if folder_id is not None:
-        folder_filter += f" AND folder_id = '{folder_id}'"
+    vec = query_vec if query_vec is not None else await get_query_embedding_async(query_text)
+    exact = await _tag_prefilter_is_selective(db, owner_id, folder_id, tag_ids)
+    scope_filter, params = _scope_filter(owner_id, folder_id, tag_ids)
+    params.update(qvec=vec, **_vector_params(limit, exact))
+    
+    if not exact:
+        await _apply_ef_search(db, max(settings.HNSW_EF_SEARCH, params.get("first_pass", limit)))
     
     # pgvector: <=> cosine distance operator
     sql = text(f"""
-        SELECT id, s3_key, description_ai,
-               1 - (embedding <=> '{vec_str}'::vector) AS score
-        FROM videos
-        WHERE embedding IS NOT NULL
-        {folder_filter}
-        ORDER BY embedding <=> '{vec_str}'::vector
-        LIMIT {limit}
+        WITH vector_candidates AS ({_vector_candidates_sql(scope_filter, exact)}
+        )
+        SELECT v.id, v.s3_key, v.description_ai,
+               1 - (v.embedding <=> {_qvec_sql()}) AS score
+        FROM vector_candidates c
+        JOIN videos v ON v.id = c.id
+        ORDER BY score DESC
     """)
-    result = await db.execute(sql)
+    result = await db.execute(sql, params)
     rows = result.fetchall()
     out = []
     for row in rows:
@@ -57,81 +254,135 @@ async def vector_search(
     return out
 
 
+async def _apply_ef_search(db: AsyncSession, ef_search: int) -> None:
+    """
+    HNSW sorgu aday listesi boyutunu (hnsw.ef_search) sadece bu transaction için ayarlar.
+    Yüksek değer = daha iyi recall, daha yüksek latency.
+    """
+    await db.execute(
+        text("SELECT set_config('hnsw.ef_search', :ef, true)"),
+        {"ef": str(min(max(int(ef_search), 1), HNSW_EF_SEARCH_MAX))},
+    )
+    # pgvector >= 0.8: owner_id filtresi sonrası yeterli aday kalmazsa index taramaya devam eder
+    if settings.HNSW_ITERATIVE_SCAN != "off":
+        await db.execute(
+            text("SELECT set_config('hnsw.iterative_scan', :mode, true)"),
+            {"mode": settings.HNSW_ITERATIVE_SCAN},
+        )
+
+
 async def hybrid_search(
     db: AsyncSession,
     query_text: str,
-    folder_ids: list[UUID],
+    owner_id: UUID,
     folder_id: UUID | None = None,
     limit: int = 10,
     min_score: float | None = 0.0,
     vector_weight: float = VECTOR_WEIGHT,
     fts_weight: float = FTS_WEIGHT,
+    ef_search: int | None = None,
+    candidate_pool: int | None = None,
+    query_vec: List[float] | None = None,
+    tag_ids: list[UUID] | None = None,
 ) -> list[tuple[UUID, str | None, str | None, str | None, float, float, float]]:
     """
     Hybrid search: Vektör araması + Full-text search birleşimi.
     
+    Tüm tabloyu skorlamak yerine:
+    1. HNSW index'inden en yakın `candidate_pool` video (ANN; binary profilde Hamming + rerank)
+    2. GIN search_vector index'inden en iyi `candidate_pool` video (FTS)
+    3. Sadece bu iki kümenin birleşimi skorlanır ve sıralanır.
+    
+    ef_search / candidate_pool: recall <-> latency dengesi (istek başına). Verilen ef_search
+    olduğu gibi kullanılır; verilmezse HNSW_EF_SEARCH, aday havuzundan (binary profilde ilk
+    geçişten) küçükse havuz boyutuna çıkarılır.
+    query_vec: Önceden alınmış sorgu embedding'i (None ise burada alınır).
+    tag_ids: etiketlerden en az birine sahip videolar. Az videolu (seçici) etiketlerde
+    ANN yerine ön filtre + tam mesafe; yaygın etiketlerde HNSW + iterative scan + post-filter.
+    
     Returns: list of (video_id, s3_key, title, description_ai, hybrid_score, vector_score, fts_score).
     
     Hybrid skor = (vector_weight * vector_score) + (fts_weight * fts_score)
     """
-    if not folder_ids:
-        return []
+    pool = max(int(candidate_pool or settings.SEARCH_CANDIDATE_POOL), limit)
+    exact = await _tag_prefilter_is_selective(db, owner_id, folder_id, tag_ids)
+    vector_params = _vector_params(pool, exact)
+    if ef_search:
+        # Açık istek değeri olduğu gibi uygulanır (havuzdan küçükse daha az ANN adayı, daha hızlı)
+        ef = int(ef_search)
+    else:
+        # Varsayılan: HNSW en fazla ef_search kadar aday döner; (ilk geçiş) havuzdan küçük olmamalı
+        ef = max(settings.HNSW_EF_SEARCH, vector_params.get("first_pass", pool))
     
-    # Embedding oluştur
-    vec = get_embedding(query_text)
-    vec_str = "[" + ",".join(str(x) for x in vec) + "]"
-    
-    # Folder filter
-    folder_list = ",".join(f"'{f}'" for f in folder_ids)
-    folder_filter = f"folder_id IN ({folder_list})"
-    if folder_id is not None:
-        folder_filter += f" AND folder_id = '{folder_id}'"
+    # Embedding oluştur (çağıran önceden almadıysa)
+    vec = query_vec if query_vec is not None else await get_query_embedding_async(query_text)
     
+    # Kullanıcı / klasör / etiket filtresi (bound parametre)
+    scope_filter, params = _scope_filter(owner_id, folder_id, tag_ids)
     # Full-text search query'si - Türkçe için simple config kullan
     # plainto_tsquery daha toleranslı, websearch_to_tsquery daha gelişmiş
-    fts_query = query_text.replace("'", "''")  # SQL injection koruması
+    params.update(
+        vector_params,
+        qvec=vec,
+        q=query_text,
+        limit=limit,
+        vector_weight=float(vector_weight),
+        fts_weight=float(fts_weight),
+    )
+    
+    if not exact:
+        await _apply_ef_search(db, ef)
     
     # Hybrid SQL sorgusu
     # Vector score: 1 - cosine_distance (0-1 arası, 1 = tam eşleşme)
     # FTS score: ts_rank_cd (0-1 arası normalize edilmiş)
     sql = text(f"""
-        WITH vector_results AS (
-            SELECT 
-                id,
-                s3_key,
-                title,
-                description_ai,
-                1 - (embedding <=> '{vec_str}'::vector) AS vector_score
+        WITH vector_candidates AS ({_vector_candidates_sql(scope_filter, exact)}
+        ),
+        fts_candidates AS (
+            SELECT id
             FROM videos
-            WHERE embedding IS NOT NULL
-            AND {folder_filter}
+            WHERE search_vector @@ plainto_tsquery('pg_catalog.simple', :q)
+            AND {scope_filter}
+            ORDER BY ts_rank_cd(search_vector, plainto_tsquery('pg_catalog.simple', :q)) DESC
+            LIMIT :pool
+        ),
+        candidates AS (
+            SELECT id FROM vector_candidates
+            UNION
+            SELECT id FROM fts_candidates
         ),
-        fts_results AS (
+        scored AS (
             SELECT 
-                id,
+                v.id,
+                v.s3_key,
+                v.title,
+                v.description_ai,
+                1 - (v.embedding <=> {_qvec_sql()}) AS vector_score,
                 CASE 
-                    WHEN search_vector IS NOT NULL 
-                    THEN ts_rank_cd(search_vector, plainto_tsquery('pg_catalog.simple', '{fts_query}'))
+                    WHEN v.search_vector IS NOT NULL 
+                    THEN ts_rank_cd(v.search_vector, plainto_tsquery('pg_catalog.simple', :q))
                     ELSE 0.0
                 END AS fts_score
-            FROM videos
-            WHERE {folder_filter}
+            FROM candidates c
+            JOIN videos v ON v.id = c.id
+            WHERE v.embedding IS NOT NULL
         )
         SELECT 
-            v.id,
-            v.s3_key,
-            v.title,
-            v.description_ai,
-            ({vector_weight} * v.vector_score + {fts_weight} * COALESCE(f.fts_score, 0)) AS hybrid_score,
-            v.vector_score,
-            COALESCE(f.fts_score, 0) AS fts_score
-        FROM vector_results v
-        LEFT JOIN fts_results f ON v.id = f.id
+            id,
+            s3_key,
+            title,
+            description_ai,
+            (CAST(:vector_weight AS float8) * vector_score
+             + CAST(:fts_weight AS float8) * fts_score) AS hybrid_score,
+            vector_score,
+            fts_score
+        FROM scored
         ORDER BY hybrid_score DESC
-        LIMIT {limit}
+        LIMIT :limit
     """)
     
-    result = await db.execute(sql)
+    result = await db.execute(sql, params)
     rows = result.fetchall()
     
     out = []
@@ -152,62 +403,128 @@ async def hybrid_search(
     return out
 
 
+async def _apply_trgm_threshold(db: AsyncSession) -> None:
+    """pg_trgm <% eşiğini (word_similarity_threshold) sadece bu transaction için ayarlar."""
+    await db.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :t, true)"),
+        {"t": str(float(settings.TRGM_WORD_SIMILARITY_THRESHOLD))},
+    )
+
+
 async def keyword_boost_search(
     db: AsyncSession,
     query_text: str,
-    folder_ids: list[UUID],
+    owner_id: UUID,
     folder_id: UUID | None = None,
     limit: int = 10,
     min_score: float | None = 0.0,
+    candidate_pool: int | None = None,
+    query_vec: List[float] | None = None,
+    tag_ids: list[UUID] | None = None,
 ) -> list[tuple[UUID, str | None, str | None, str | None, float]]:
     """
     Vektör araması + keyword boost.
     Başlıkta veya açıklamada sorgu kelimeleri geçiyorsa skoru artır.
     
-    Returns: list of (video_id, s3_key, title, description_ai, boosted_score).
-    """
-    if not folder_ids:
-        return []
+    Tüm tabloyu taramak yerine:
+    1. HNSW index'inden en yakın `candidate_pool` video (ANN)
+    2. Trigram GIN index'lerinden kelime eşleşen / yazımı benzeyen `candidate_pool` video
+    3. Sadece bu iki kümenin birleşimi skorlanır.
     
-    vec = get_embedding(query_text)
-    vec_str = "[" + ",".join(str(x) for x in vec) + "]"
+    Skor = vektör skoru + kelime boost'u (başlık +0.1, açıklama +0.05 / kelime)
+           + TRGM_WEIGHT * word_similarity (yazım hatası toleranslı).
+    tag_ids: hybrid_search ile aynı filtre ve plan seçimi.
     
-    folder_list = ",".join(f"'{f}'" for f in folder_ids)
-    folder_filter = f"folder_id IN ({folder_list})"
-    if folder_id is not None:
-        folder_filter += f" AND folder_id = '{folder_id}'"
+    Returns: list of (video_id, s3_key, title, description_ai, boosted_score).
+    """
+    pool = max(int(candidate_pool or settings.SEARCH_CANDIDATE_POOL), limit)
+    vec = query_vec if query_vec is not None else await get_query_embedding_async(query_text)
+    exact = await _tag_prefilter_is_selective(db, owner_id, folder_id, tag_ids)
     
-    # Sorgu kelimelerini ayır (boost için)
-    query_words = [w.strip().lower() for w in query_text.split() if len(w.strip()) > 2]
+    scope_filter, params = _scope_filter(owner_id, folder_id, tag_ids)
     
-    # ILIKE ile keyword boost
-    keyword_boost_cases = []
-    for word in query_words[:5]:  # Max 5 kelime
-        safe_word = word.replace("'", "''")
-        keyword_boost_cases.append(
-            f"CASE WHEN LOWER(COALESCE(title, '')) LIKE '%{safe_word}%' THEN 0.1 ELSE 0 END"
-        )
-        keyword_boost_cases.append(
-            f"CASE WHEN LOWER(COALESCE(description_ai, '')) LIKE '%{safe_word}%' THEN 0.05 ELSE 0 END"
-        )
+    # Sorgu kelimelerini ayır (boost için) - max 5 kelime, tek text[] parametresi
+    query_norm = " ".join(query_text.lower().split())
+    # 3 karakterden kısa kelimeler (ve tümü kısa sorgu) neredeyse her satırla eşleşir:
+    # o durumda keyword adayları alınmaz, sonuçlar sadece vektör adaylarından gelir
+    query_words = [w for w in query_norm.split() if len(w) > 2][:5]
+    vector_params = _vector_params(pool, exact)
+    params.update(
+        vector_params,
+        qvec=vec,
+        qnorm=query_norm,
+        words=[_like_escape(w) for w in query_words],
+        limit=limit,
+        trgm_weight=TRGM_WEIGHT,
+    )
+    keyword_sql = keyword_union = ""
+    if query_words:
+        # Kelimelerden herhangi biri (alt dize); trigram index regex'i de kullanabilir
+        params["pattern"] = "|".join(re.escape(w) for w in query_words)
+        keyword_sql = f""",
+        keyword_candidates AS (
+            SELECT id
+            FROM videos
+            WHERE {scope_filter}
+            AND (
+                lower(coalesce(title, '')) ~ :pattern
+                OR lower(coalesce(description_ai, '')) ~ :pattern
+                OR :qnorm <% lower(coalesce(title, ''))
+                OR :qnorm <% lower(coalesce(description_ai, ''))
+            )
+            ORDER BY GREATEST(
+                word_similarity(:qnorm, lower(coalesce(title, ''))),
+                word_similarity(:qnorm, lower(coalesce(description_ai, '')))
+            ) DESC
+            LIMIT :pool
+        )"""
+        keyword_union = "UNION SELECT id FROM keyword_candidates"
     
-    boost_expr = " + ".join(keyword_boost_cases) if keyword_boost_cases else "0"
+    if not exact:
+        await _apply_ef_search(db, max(settings.HNSW_EF_SEARCH, vector_params.get("first_pass", pool)))
+    await _apply_trgm_threshold(db)
     
     sql = text(f"""
+        WITH vector_candidates AS ({_vector_candidates_sql(scope_filter, exact)}
+        ){keyword_sql},
+        candidates AS (
+            SELECT id FROM vector_candidates
+            {keyword_union}
+        ),
+        scored AS (
+            SELECT 
+                v.id,
+                v.s3_key,
+                v.title,
+                v.description_ai,
+                1 - (v.embedding <=> {_qvec_sql()}) AS vector_score,
+                (
+                    SELECT COALESCE(SUM(
+                        CASE WHEN lower(coalesce(v.title, '')) LIKE '%' || w || '%' THEN 0.1 ELSE 0 END
+                        + CASE WHEN lower(coalesce(v.description_ai, '')) LIKE '%' || w || '%' THEN 0.05 ELSE 0 END
+                    ), 0)
+                    FROM unnest(CAST(:words AS text[])) AS w
+                ) AS keyword_boost,
+                GREATEST(
+                    word_similarity(:qnorm, lower(coalesce(v.title, ''))),
+                    word_similarity(:qnorm, lower(coalesce(v.description_ai, '')))
+                ) AS trgm_score
+            FROM candidates c
+            JOIN videos v ON v.id = c.id
+            WHERE v.embedding IS NOT NULL
+        )
         SELECT 
             id,
             s3_key,
             title,
             description_ai,
-            (1 - (embedding <=> '{vec_str}'::vector)) + ({boost_expr}) AS boosted_score
-        FROM videos
-        WHERE embedding IS NOT NULL
-        AND {folder_filter}
+            vector_score + keyword_boost + CAST(:trgm_weight AS float8) * trgm_score AS boosted_score
+        FROM scored
         ORDER BY boosted_score DESC
-        LIMIT {limit}
+        LIMIT :limit
     """)
     
-    result = await db.execute(sql)
+    result = await db.execute(sql, params)
     rows = result.fetchall()
     
     out = []
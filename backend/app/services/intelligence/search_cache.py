@@ -0,0 +1,154 @@
+"""
+Arama sonucu cache'i - Redis; anahtar: (kullanıcının kütüphane versiyonu, normalize edilmiş istek).
+Arama sonucunu değiştirebilecek her işlem (ingest, etiket, video taşıma/silme, klasör) kullanıcının
+versiyon sayacını artırır: eski anahtarlar bir daha okunmaz, TTL ile kendiliğinden silinir.
+"""
+import hashlib
+import json
+import threading
+from uuid import UUID
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.intelligence.embedding_cache import normalize_query
+
+VERSION_PREFIX = "lib:ver:"
+KEY_PREFIX = "search:r2:"  # SearchResponse formatı değişince artırın (eski yanıtlar okunmaz)
+
+
+def _version_key(owner_id: UUID | str) -> str:
+    return f"{VERSION_PREFIX}{owner_id}"
+
+
+def _result_key(owner_id: UUID | str, version: int, request: dict) -> str:
+    body = dict(request, q=normalize_query(request.get("q", "")))
+    digest = hashlib.sha256(
+        json.dumps(body, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f"{KEY_PREFIX}{owner_id}:{version}:{digest}"
+
+
+class SearchResultCache:
+    """
+    SearchResponse cache'i (JSON). Redis erişilemezse cache atlanır, arama normal çalışır.
+    bump: senkron (Celery); abump / aget / aset: async (FastAPI).
+    """
+
+    def __init__(self, ttl_seconds: int, redis_url: str):
+        self.ttl_seconds = ttl_seconds
+        self._redis_url = redis_url
+        self._redis: redis.Redis | None = None
+        self._async_redis: aioredis.Redis | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _get_redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(self._redis_url, socket_timeout=0.5)
+        return self._redis
+
+    def _get_async_redis(self) -> aioredis.Redis:
+        if self._async_redis is None:
+            self._async_redis = aioredis.Redis.from_url(self._redis_url, socket_timeout=0.5)
+        return self._async_redis
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    async def aget(self, owner_id: UUID, request: dict) -> tuple[dict | None, str | None]:
+        """
+        Returns: (cache'teki yanıt veya None, yazılacak anahtar).
+        Anahtar None ise (cache kapalı / Redis hatası) sonuç cache'e yazılmaz.
+        """
+        if not self.enabled:
+            return None, None
+        try:
+            client = self._get_async_redis()
+            version = int(await client.get(_version_key(owner_id)) or 0)
+            key = _result_key(owner_id, version, request)
+            raw = await client.get(key)
+        except Exception as e:
+            print(f"[SearchCache] Redis okuma hatası: {e}")
+            return None, None
+        self._count(raw is not None)
+        return (json.loads(raw) if raw else None), key
+
+    async def apeek(self, key: str) -> dict | None:
+        """Anahtarı sayaçları değiştirmeden okur (single-flight bekleyenlerinin yoklaması için)."""
+        try:
+            raw = await self._get_async_redis().get(key)
+        except Exception:
+            return None
+        return json.loads(raw) if raw else None
+
+    @staticmethod
+    def local_key(owner_id: UUID, request: dict) -> str:
+        """Cache kapalıyken / Redis yokken process içi birleştirme anahtarı."""
+        return _result_key(owner_id, -1, request)
+
+    async def aset(self, key: str | None, payload: dict) -> None:
+        if key is None:
+            return
+        try:
+            await self._get_async_redis().set(key, json.dumps(payload), ex=self.ttl_seconds)
+        except Exception as e:
+            print(f"[SearchCache] Redis yazma hatası: {e}")
+
+    def bump(self, owner_id: UUID | str | None) -> None:
+        """Kullanıcının tüm cache'lenmiş arama sonuçlarını geçersiz kılar."""
+        if owner_id is None:
+            return
+        try:
+            self._get_redis().incr(_version_key(owner_id))
+        except Exception as e:
+            print(f"[SearchCache] Versiyon artırılamadı ({owner_id}): {e}")
+
+    async def abump(self, owner_id: UUID | str | None) -> None:
+        if owner_id is None:
+            return
+        try:
+            await self._get_async_redis().incr(_version_key(owner_id))
+        except Exception as e:
+            print(f"[SearchCache] Versiyon artırılamadı ({owner_id}): {e}")
+
+    async def aclose(self) -> None:
+        if self._async_redis is not None:
+            await self._async_redis.aclose()
+            self._async_redis = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+search_cache = SearchResultCache(
+    ttl_seconds=settings.SEARCH_CACHE_TTL,
+    redis_url=settings.REDIS_URL,
+)
+
+
+async def library_changed(db: AsyncSession, owner_id: UUID) -> None:
+    """
+    Endpoint'lerde değişiklikten sonra çağrılır: önce commit, sonra versiyon artışı.
+    Ters sırada eşzamanlı bir arama eski veriyi yeni versiyonla cache'e yazabilirdi.
+    """
+    await db.commit()
+    await search_cache.abump(owner_id)
@@ -0,0 +1,155 @@
+"""
+Single-flight - aynı anahtarlı eşzamanlı istekleri tek hesaplamada birleştirir.
+Process içi: aynı anahtar için ikinci çağıran, devam eden hesaplamanın sonucunu bekler.
+Process'ler arası (opsiyonel): kısa ömürlü Redis kilidi (SET NX PX); kilidi alamayan worker
+sonucun cache'e düşmesini bekler (probe), süre dolarsa kendisi hesaplar.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, TypeVar
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+LOCK_PREFIX = "sf:"
+
+# Kilidi sadece sahibi siler (süresi dolup başkası aldıysa dokunmaz)
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_redis: aioredis.Redis | None = None
+
+
+def _get_redis() -> aioredis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = aioredis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5)
+    return _redis
+
+
+async def aclose() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    # Bekleyen kalmadıysa "exception was never retrieved" uyarısını önler
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """
+    do(key, fn, probe): key için devam eden hesaplama varsa onu bekler, yoksa fn'i başlatır.
+    Hesaplama ayrı bir task'ta çalışır; çağıranlardan biri iptal edilse (timeout, bağlantı kopması)
+    diğerleri sonucu almaya devam eder. fn, çağıranın DB session'ını kullanmamalıdır.
+    """
+
+    def __init__(self, name: str, lock_ms: int, poll_ms: int):
+        self.name = name
+        self.lock_ms = lock_ms
+        self.poll_ms = poll_ms
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.remote_coalesced = 0
+
+    def _count(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        probe: Callable[[], Awaitable[T | None]] | None = None,
+    ) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            self._count("leaders")
+            task = asyncio.ensure_future(self._run(key, fn, probe))
+            task.add_done_callback(_consume_exception)
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self._inflight[key] = task
+        else:
+            self._count("coalesced")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _run(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        probe: Callable[[], Awaitable[T | None]] | None,
+    ) -> T:
+        if probe is None or self.lock_ms <= 0:
+            return await fn()
+
+        lock_key = f"{LOCK_PREFIX}{self.name}:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await _get_redis().set(lock_key, token, nx=True, px=self.lock_ms)
+        except Exception as e:
+            print(f"[SingleFlight] Redis kilit hatası ({self.name}): {e}")
+            return await fn()
+
+        if acquired:
+            try:
+                return await fn()
+            finally:
+                try:
+                    await _get_redis().eval(_RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    print(f"[SingleFlight] Redis kilit bırakma hatası ({self.name}): {e}")
+
+        # Başka bir process hesaplıyor: sonucu cache'ten bekle
+        deadline = time.monotonic() + self.lock_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_ms / 1000)
+            result = await probe()
+            if result is not None:
+                self._count("remote_coalesced")
+                return result
+            try:
+                if not await _get_redis().exists(lock_key):
+                    break  # sahibi bitirdi ama sonuç yazılamadı (hata) - kendimiz hesaplarız
+            except Exception:
+                break
+        return await fn()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "remote_coalesced": self.remote_coalesced,
+                "in_flight": len(self._inflight),
+            }
+
+
+embedding_flight = SingleFlight(
+    "emb",
+    lock_ms=settings.SINGLEFLIGHT_LOCK_MS,
+    poll_ms=settings.SINGLEFLIGHT_POLL_MS,
+)
+search_flight = SingleFlight(
+    "search",
+    lock_ms=settings.SINGLEFLIGHT_LOCK_MS,
+    poll_ms=settings.SINGLEFLIGHT_POLL_MS,
+)
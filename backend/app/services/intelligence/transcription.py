@@ -1,50 +1,201 @@
 """
 Audio transcription - Whisper API ile video sesini metne çevir.
+Uzun sesler sessizlik sınırlarında parçalanıp paralel transkript edilir.
 """
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from openai import OpenAI
 
 from app.core.config import settings
 
+TRANSCRIPTION_MODEL = "whisper-1"
+# İşleme mantığı değiştiğinde artırın (sonuç cache'i bu versiyonla anahtarlanır)
+# v3: segmentler (zaman damgalı) cache'te saklanır
+TRANSCRIPTION_VERSION = "v3"
 
-def transcribe_audio(audio_path: Path, language: str = "tr") -> str:
+
+WHISPER_MAX_MB = 25  # Whisper API dosya limiti
+
+
+def segments_text(segments: list[dict]) -> str:
+    """Zaman damgalı segmentlerden düz transkript metni (arama / embedding için)."""
+    return " ".join(seg["text"] for seg in segments).strip()
+
+
+def transcribe_audio(audio_path: Path, language: str = "tr") -> list[dict]:
     """
     Ses dosyasını OpenAI Whisper API ile metne çevirir.
+    25MB'tan büyük veya TRANSCRIPTION_CHUNK_SECONDS'tan uzun sesler parçalanıp
+    paralel transkript edilir (transcribe_audio_segments).
+    Başarısız Whisper çağrısı TRANSCRIPTION_CHUNK_RETRIES kez tekrarlanır, sonra hata fırlatılır
+    (transkriptin ortasında sessiz boşluk bırakılmaz).
     
     Args:
         audio_path: Ses dosyasının yolu (mp3, wav, m4a, webm, mp4)
         language: Ses dili (varsayılan: Türkçe)
     
     Returns:
-        Transkript metni
+        Zaman sıralı segmentler [{"start", "end", "text"}] (saniye)
     """
     if not audio_path.exists():
         raise FileNotFoundError(f"Ses dosyası bulunamadı: {audio_path}")
     
-    # Dosya boyutu kontrolü (Whisper max 25MB)
+    if _needs_chunking(audio_path):
+        return transcribe_audio_segments(audio_path, language)
+    
+    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    return _with_retries(lambda: _transcribe_chunk(client, audio_path, 0.0, language), "Ses")
+
+
+def _audio_duration(audio_path: Path) -> float | None:
+    from app.services.ingestion.processor import probe_media
+    
+    info = probe_media(audio_path)
+    return info.get("duration_float") if info else None
+
+
+def _needs_chunking(audio_path: Path) -> bool:
     file_size_mb = audio_path.stat().st_size / (1024 * 1024)
-    if file_size_mb > 25:
-        print(f"[Transcription] Dosya çok büyük ({file_size_mb:.1f}MB), transkript atlanıyor")
-        return ""
+    if file_size_mb > WHISPER_MAX_MB:
+        return True
+    duration = _audio_duration(audio_path)
+    return bool(duration and duration > settings.TRANSCRIPTION_CHUNK_SECONDS * 1.5)
+
+
+def plan_chunks(
+    duration: float,
+    silences: list[tuple[float, float]],
+    chunk_seconds: float,
+    overlap: float,
+) -> list[tuple[float, float]]:
+    """
+    Sesi ~chunk_seconds uzunluğunda parçalara böler.
+    Sınırlar mümkünse hedefin son %25'lik penceresindeki bir sessizliğin ortasına konur;
+    parçalar `overlap` saniye örtüşür (kelime kesilmesine karşı).
+    Returns: [(başlangıç, bitiş), ...]
+    """
+    chunks = []
+    start = 0.0
+    while start < duration:
+        target = start + chunk_seconds
+        if target >= duration:
+            chunks.append((start, duration))
+            break
+        window_start = target - chunk_seconds * 0.25
+        cut = target
+        candidates = [
+            (s + e) / 2 for s, e in silences if window_start <= (s + e) / 2 <= target
+        ]
+        if candidates:
+            cut = max(candidates)
+        chunks.append((start, min(cut + overlap, duration)))
+        start = cut
+    return chunks
+
+
+def _segment_field(seg, name: str):
+    return seg.get(name) if isinstance(seg, dict) else getattr(seg, name, None)
+
+
+def _transcribe_chunk(client: OpenAI, chunk_path: Path, offset: float, language: str) -> list[dict]:
+    """Tek parçayı transkript eder; segment zamanlarını tüm sese göre kaydırır."""
+    with open(chunk_path, "rb") as f:
+        resp = client.audio.transcriptions.create(
+            model=TRANSCRIPTION_MODEL,
+            file=f,
+            language=language,
+            response_format="verbose_json",
+            timestamp_granularities=["segment"],
+        )
+    segments = getattr(resp, "segments", None) or []
+    if not segments:
+        text = (getattr(resp, "text", "") or "").strip()
+        duration = float(getattr(resp, "duration", 0) or 0)
+        return [{"start": offset, "end": offset + duration, "text": text}] if text else []
+    out = []
+    for seg in segments:
+        text = (_segment_field(seg, "text") or "").strip()
+        if not text:
+            continue
+        out.append({
+            "start": round(offset + float(_segment_field(seg, "start") or 0), 2),
+            "end": round(offset + float(_segment_field(seg, "end") or 0), 2),
+            "text": text,
+        })
+    return out
+
+
+def _with_retries(fn, label: str):
+    """fn'i TRANSCRIPTION_CHUNK_RETRIES kez tekrar dener; son hata RuntimeError olarak fırlatılır."""
+    attempts = max(0, settings.TRANSCRIPTION_CHUNK_RETRIES) + 1
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except Exception as e:
+            print(f"[Transcription] {label} hatası (deneme {attempt}/{attempts}): {e}")
+            if attempt == attempts:
+                raise RuntimeError(f"{label} transkript edilemedi: {e}") from e
+            time.sleep(2 ** (attempt - 1))
+
+
+def stitch_segments(results: list[list[dict]]) -> list[dict]:
+    """
+    Parça sonuçlarını (parça sırasıyla) birleştirir: örtüşme bölgesinde önceki
+    parçanın kapsadığı segmentler atılır. Zaman damgaları korunur.
+    """
+    stitched: list[dict] = []
+    for segments in results:
+        covered_until = stitched[-1]["end"] if stitched else 0.0
+        for seg in segments:
+            if stitched and seg["start"] < covered_until - 0.25:
+                continue
+            stitched.append(seg)
+    return stitched
+
+
+def transcribe_audio_segments(audio_path: Path, language: str = "tr") -> list[dict]:
+    """
+    Uzun sesler için parçalı transkript: sessizlik sınırlarında örtüşen parçalar,
+    TRANSCRIPTION_MAX_PARALLEL ile sınırlı paralel Whisper çağrıları.
+    Returns: Zaman sıralı segmentler [{"start", "end", "text"}] (saniye, tüm sese göre).
+    """
+    from app.services.ingestion.processor import cut_audio, detect_silences
+    
+    duration = _audio_duration(audio_path)
+    if not duration:
+        raise RuntimeError("Ses süresi alınamadı, parçalı transkript yapılamıyor")
+    
+    chunks = plan_chunks(
+        duration,
+        detect_silences(audio_path),
+        settings.TRANSCRIPTION_CHUNK_SECONDS,
+        settings.TRANSCRIPTION_CHUNK_OVERLAP,
+    )
+    chunk_dir = audio_path.parent / f"{audio_path.stem}_chunks"
+    chunk_dir.mkdir(exist_ok=True)
+    print(f"[Transcription] {duration:.0f}s ses {len(chunks)} parçaya bölündü")
     
     client = OpenAI(api_key=settings.OPENAI_API_KEY)
     
-    try:
-        with open(audio_path, "rb") as f:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f,
-                language=language,
-                response_format="text"
-            )
-        return transcript.strip() if transcript else ""
-    except Exception as e:
-        print(f"[Transcription] Hata: {e}")
-        return ""
-
-
-def transcribe_video(video_path: Path, temp_dir: Path, language: str = "tr") -> str:
+    def _attempt(index: int, start: float, end: float) -> list[dict]:
+        chunk_path = cut_audio(audio_path, chunk_dir / f"chunk_{index}{audio_path.suffix}", start, end - start)
+        if not chunk_path:
+            raise RuntimeError(f"ses kesilemedi ({start:.1f}s)")
+        return _transcribe_chunk(client, chunk_path, start, language)
+    
+    def _run(index: int, start: float, end: float) -> list[dict]:
+        return _with_retries(lambda: _attempt(index, start, end), f"Parça {index}")
+    
+    # Bir parça tekrar denemelerden sonra da başarısızsa pool.map hatayı yukarı taşır
+    with ThreadPoolExecutor(max_workers=max(1, settings.TRANSCRIPTION_MAX_PARALLEL)) as pool:
+        results = list(pool.map(lambda c: _run(*c), [(i, s, e) for i, (s, e) in enumerate(chunks)]))
+    
+    return stitch_segments(results)
+
+
+def transcribe_video(video_path: Path, temp_dir: Path, language: str = "tr") -> list[dict]:
     """
     Video dosyasından sesi çıkarıp transkript oluşturur.
     
@@ -54,7 +205,8 @@ def transcribe_video(video_path: Path, temp_dir: Path, language: str = "tr") ->
         language: Ses dili
     
     Returns:
-        Transkript metni
+        Zaman sıralı segmentler [{"start", "end", "text"}]; ses çıkarılamazsa boş liste.
+        Whisper hataları (tekrar denemelerden sonra) fırlatılır.
     """
     from app.services.ingestion.processor import extract_audio
     
@@ -64,7 +216,7 @@ def transcribe_video(video_path: Path, temp_dir: Path, language: str = "tr") ->
     extracted = extract_audio(video_path, audio_path)
     if not extracted:
         print("[Transcription] Ses çıkarılamadı")
-        return ""
+        return []
     
     # Transkript oluştur
     return transcribe_audio(audio_path, language)
@@ -3,32 +3,234 @@ Embedding yönetimi - description_ai + title + transcript + etiketler -> vektör
 OpenAI text-embedding-3-small.
 V2: Gelişmiş metin birleştirme ile daha iyi arama doğruluğu.
 """
+import asyncio
 from typing import List
 
-from openai import OpenAI
+import httpx
+import tiktoken
+from openai import AsyncOpenAI, BadRequestError, OpenAI
 
 from app.core.config import settings
+from app.services.intelligence.embedding_cache import embedding_cache, normalize_query
+from app.services.intelligence.singleflight import embedding_flight
+
+
+def _dimension_kwargs() -> dict:
+    """text-embedding-3-* kısaltılmış boyutu destekler (EMBEDDING_DIMENSIONS); eski modeller desteklemez."""
+    if settings.EMBEDDING_MODEL.startswith("text-embedding-3"):
+        return {"dimensions": settings.EMBEDDING_DIMENSIONS}
+    return {}
+
+
+def _cache_model() -> str:
+    """Sorgu cache anahtarındaki model: boyut değişince eski vektörler okunmaz."""
+    return f"{settings.EMBEDDING_MODEL}:{settings.EMBEDDING_DIMENSIONS}"
+
+
+# text-embedding-3-* ve ada-002 aynı tokenizer'ı kullanır
+_encoding: tiktoken.Encoding | None = None
+
+
+def _get_encoding() -> tiktoken.Encoding:
+    global _encoding
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding
+
+
+def _truncate_tokens(text: str) -> tuple[str, int]:
+    """Metni EMBEDDING_MAX_INPUT_TOKENS'a kırpar; (metin, token sayısı) döner."""
+    tokens = _get_encoding().encode(text, disallowed_special=())
+    if len(tokens) <= settings.EMBEDDING_MAX_INPUT_TOKENS:
+        return text, len(tokens)
+    tokens = tokens[:settings.EMBEDDING_MAX_INPUT_TOKENS]
+    return _get_encoding().decode(tokens), len(tokens)
 
 
 def get_embedding(text: str) -> List[float]:
     """
-    Metni OpenAI text-embedding-3-small ile vektöre çevirir.
+    Metni OpenAI text-embedding-3-small ile vektöre çevirir (model token limitine kırpılır).
     """
     if not text.strip():
         raise ValueError("Embedding için boş metin gönderilemez")
     client = OpenAI(api_key=settings.OPENAI_API_KEY)
     resp = client.embeddings.create(
         model=settings.EMBEDDING_MODEL,
-        input=text.strip(),
+        input=_truncate_tokens(text.strip())[0],
+        **_dimension_kwargs(),
     )
     return resp.data[0].embedding
 
 
+def get_query_embedding(text: str) -> List[float]:
+    """
+    Arama sorgusu için embedding; önce LRU, sonra Redis cache'e bakar.
+    Cache'te yoksa OpenAI'den alınıp iki katmana da yazılır.
+    Normalize sorgu sadece cache anahtarıdır; embed edilen, kullanıcının yazdığı metindir (kırpılmış).
+    """
+    normalized = normalize_query(text)
+    if not normalized:
+        raise ValueError("Embedding için boş metin gönderilemez")
+    cached = embedding_cache.get(normalized, _cache_model())
+    if cached is not None:
+        return cached
+    vec = get_embedding(text.strip())
+    embedding_cache.set(normalized, _cache_model(), vec)
+    return vec
+
+
+def _iter_batches(texts: List[str], token_counts: List[int]):
+    """Metinleri item ve token limitlerine uyan gruplara böler; (başlangıç, grup) döner."""
+    batch: List[str] = []
+    batch_tokens = 0
+    start = 0
+    for i, (t, tokens) in enumerate(zip(texts, token_counts)):
+        if batch and (
+            len(batch) >= settings.EMBEDDING_BATCH_MAX_ITEMS
+            or batch_tokens + tokens > settings.EMBEDDING_BATCH_MAX_TOKENS
+        ):
+            yield start, batch
+            batch, batch_tokens, start = [], 0, i
+        batch.append(t)
+        batch_tokens += tokens
+    if batch:
+        yield start, batch
+
+
+def get_embeddings(texts: List[str]) -> List[List[float] | None]:
+    """
+    Birden fazla metni toplu olarak vektöre çevirir (embeddings.create(input=[...])).
+    Metinler cl100k_base ile model token limitine kırpılır; gruplar item/token limitlerine göre.
+    Bir grup reddedilirse (400) metinleri tek tek denenir: tek başına da reddedilen metin
+    için None döner, grubun geri kalanı kaybolmaz. Çıktı sırası girdi sırasıyla aynıdır.
+    """
+    if not texts:
+        return []
+    cleaned = []
+    token_counts = []
+    for t in texts:
+        t = t.strip()
+        if not t:
+            raise ValueError("Embedding için boş metin gönderilemez")
+        t, tokens = _truncate_tokens(t)
+        cleaned.append(t)
+        token_counts.append(tokens)
+
+    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    out: List[List[float] | None] = [None] * len(cleaned)
+    for start, batch in _iter_batches(cleaned, token_counts):
+        try:
+            resp = client.embeddings.create(
+                model=settings.EMBEDDING_MODEL, input=batch, **_dimension_kwargs()
+            )
+        except BadRequestError as e:
+            if len(batch) == 1:
+                print(f"[Embedding] Metin reddedildi (index {start}): {e}")
+                continue
+            print(f"[Embedding] Grup reddedildi ({len(batch)} metin), tek tek deneniyor: {e}")
+            for offset, t in enumerate(batch):
+                try:
+                    item = client.embeddings.create(
+                        model=settings.EMBEDDING_MODEL, input=t, **_dimension_kwargs()
+                    ).data[0]
+                except BadRequestError as item_error:
+                    print(f"[Embedding] Metin reddedildi (index {start + offset}): {item_error}")
+                    continue
+                out[start + offset] = item.embedding
+            continue
+        for item in resp.data:
+            out[start + item.index] = item.embedding
+    return out
+
+
+# Paylaşılan async client: tek httpx havuzu, process başına bir kez oluşturulur
+_async_client: AsyncOpenAI | None = None
+_async_semaphore: asyncio.Semaphore | None = None
+
+
+def _get_async_client() -> AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.EMBEDDING_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.EMBEDDING_MAX_CONNECTIONS,
+            ),
+            timeout=settings.EMBEDDING_TIMEOUT,
+        )
+        _async_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            timeout=settings.EMBEDDING_TIMEOUT,
+            max_retries=settings.EMBEDDING_MAX_RETRIES,
+            http_client=http_client,
+        )
+    return _async_client
+
+
+def _get_async_semaphore() -> asyncio.Semaphore:
+    global _async_semaphore
+    if _async_semaphore is None:
+        _async_semaphore = asyncio.Semaphore(settings.EMBEDDING_MAX_CONCURRENCY)
+    return _async_semaphore
+
+
+async def get_embedding_async(text: str) -> List[float]:
+    """
+    get_embedding'in non-blocking versionu (FastAPI arama yolu için).
+    Paylaşılan AsyncOpenAI client + eşzamanlılık limiti; timeout/retry client'ta.
+    """
+    if not text.strip():
+        raise ValueError("Embedding için boş metin gönderilemez")
+    async with _get_async_semaphore():
+        resp = await _get_async_client().embeddings.create(
+            model=settings.EMBEDDING_MODEL,
+            input=text.strip(),
+            **_dimension_kwargs(),
+        )
+    return resp.data[0].embedding
+
+
+async def get_query_embedding_async(text: str) -> List[float]:
+    """
+    get_query_embedding'in async versiyonu: cache (LRU + Redis) + async client.
+    Cache'te olmayan aynı sorgu eşzamanlı gelirse tek OpenAI çağrısı yapılır (single-flight).
+    Sync versiyondaki gibi normalize sorgu sadece anahtardır, orijinal metin embed edilir.
+    """
+    normalized = normalize_query(text)
+    if not normalized:
+        raise ValueError("Embedding için boş metin gönderilemez")
+    model = _cache_model()
+    cached = await embedding_cache.aget(normalized, model)
+    if cached is not None:
+        return cached
+
+    async def compute() -> List[float]:
+        vec = await get_embedding_async(text.strip())
+        await embedding_cache.aset(normalized, model, vec)
+        return vec
+
+    return await embedding_flight.do(
+        f"{model}\x00{normalized}",
+        compute,
+        probe=lambda: embedding_cache.apeek(normalized, model),
+    )
+
+
+async def close_async_client() -> None:
+    """Uygulama kapanışında bağlantı havuzlarını kapatır."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    await embedding_cache.aclose()
+
+
 def text_for_embedding(
     description_ai: str,
     tags: list[str],
     title: str = "",
-    transcript: str = ""
+    transcript: str = "",
+    description_manual: str = "",
 ) -> str:
     """
     Video için aranabilir metin oluşturur.
@@ -36,9 +238,10 @@ def text_for_embedding(
     
     Öncelik sırası:
     1. Başlık (en önemli - arama terimlerine en yakın)
-    2. AI açıklaması (görsel içerik)
-    3. Transkript (sesli içerik)
-    4. Etiketler (kullanıcı tanımlı kategoriler)
+    2. Kullanıcı notu (manuel açıklama)
+    3. AI açıklaması (görsel içerik)
+    4. Transkript (sesli içerik)
+    5. Etiketler (kullanıcı tanımlı kategoriler)
     """
     parts = []
     
@@ -46,6 +249,10 @@ def text_for_embedding(
     if title and title.strip():
         parts.append(f"Başlık: {title.strip()}")
     
+    # Manuel açıklama - kullanıcının kendi tarifi
+    if description_manual and description_manual.strip():
+        parts.append(f"Not: {description_manual.strip()}")
+    
     # AI açıklaması - görsel içeriğin detaylı tasviri
     if description_ai and description_ai.strip():
         parts.append(f"Açıklama: {description_ai.strip()}")
@@ -1,7 +1,11 @@
 """
 S3 uyumlu object storage adaptörü - BLUEPRINT: AWS S3 veya MinIO.
 ADR-007: Konfigürasyon ile S3/MinIO seçimi.
+Process başına tek (thread-safe) boto3 client; imzalı URL'ler süresi yetene kadar cache'lenir.
 """
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import BinaryIO
 
@@ -11,17 +15,39 @@ from botocore.config import Config
 from app.core.config import settings
 
 
+_client = None
+_client_lock = threading.Lock()
+
+# (bucket, s3_key, expires_in) -> (url, son geçerlilik zamanı)
+_presigned_cache: OrderedDict[tuple[str, str, int], tuple[str, float]] = OrderedDict()
+_presigned_lock = threading.Lock()
+
+
 def get_s3_client():
-    """S3 uyumlu client (MinIO veya AWS)."""
-    kwargs = {
-        "aws_access_key_id": settings.S3_ACCESS_KEY,
-        "aws_secret_access_key": settings.S3_SECRET_KEY,
-        "region_name": settings.S3_REGION,
-        "config": Config(signature_version="s3v4"),
-    }
-    if settings.S3_ENDPOINT_URL:
-        kwargs["endpoint_url"] = settings.S3_ENDPOINT_URL
-    return boto3.client("s3", **kwargs)
+    """
+    S3 uyumlu client (MinIO veya AWS).
+    Process genelinde tek örnek; boto3 client'ları thread-safe'tir ve bağlantı havuzunu paylaşır.
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            kwargs = {
+                "aws_access_key_id": settings.S3_ACCESS_KEY,
+                "aws_secret_access_key": settings.S3_SECRET_KEY,
+                "region_name": settings.S3_REGION,
+                "config": Config(
+                    signature_version="s3v4",
+                    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                    tcp_keepalive=True,
+                ),
+            }
+            if settings.S3_ENDPOINT_URL:
+                kwargs["endpoint_url"] = settings.S3_ENDPOINT_URL
+            _client = boto3.client("s3", **kwargs)
+    return _client
 
 
 def upload_file(
@@ -61,14 +87,50 @@ def upload_fileobj(
 
 
 def get_presigned_url(s3_key: str, bucket: str | None = None, expires_in: int = 3600) -> str:
-    """Video izleme için geçici URL."""
+    """
+    Video izleme için geçici URL.
+    Aynı key için daha önce imzalanmış URL'nin yeterli süresi kaldıysa (PRESIGNED_URL_MIN_REMAINING) o döner.
+    """
     bkt = bucket or settings.S3_BUCKET
-    client = get_s3_client()
-    return client.generate_presigned_url(
+    cache_key = (bkt, s3_key, expires_in)
+    now = time.time()
+    # Süre, TTL'den kısa ise cache'teki URL asla yeterince geçerli sayılmaz; sınırı TTL'in yarısına çek
+    min_remaining = min(settings.PRESIGNED_URL_MIN_REMAINING, expires_in // 2)
+    with _presigned_lock:
+        cached = _presigned_cache.get(cache_key)
+        if cached and cached[1] - now >= min_remaining:
+            _presigned_cache.move_to_end(cache_key)
+            return cached[0]
+
+    url = get_s3_client().generate_presigned_url(
         "get_object",
         Params={"Bucket": bkt, "Key": s3_key},
         ExpiresIn=expires_in,
     )
+    with _presigned_lock:
+        _presigned_cache[cache_key] = (url, now + expires_in)
+        _presigned_cache.move_to_end(cache_key)
+        while len(_presigned_cache) > settings.PRESIGNED_URL_CACHE_SIZE:
+            _presigned_cache.popitem(last=False)
+    return url
+
+
+def get_presigned_urls(
+    s3_keys: list[str],
+    bucket: str | None = None,
+    expires_in: int = 3600,
+) -> dict[str, str]:
+    """
+    Toplu imzalama: liste/arama yanıtı başına bir kez çağrılır.
+    Returns: {s3_key: url}; imzalanamayan key'ler sonuçta yer almaz.
+    """
+    urls = {}
+    for key in dict.fromkeys(k for k in s3_keys if k):
+        try:
+            urls[key] = get_presigned_url(key, bucket=bucket, expires_in=expires_in)
+        except Exception as e:
+            print(f"[Storage] URL imzalanamadı ({key}): {e}")
+    return urls
 
 
 def delete_file(s3_key: str, bucket: str | None = None) -> bool:
@@ -1,7 +1,18 @@
 """
 Celery uygulama örneği - BLUEPRINT workers.
+
+Kuyruklar kaynak sınıfına göre ayrılır; her biri darboğazına göre ayrı worker ile ölçeklenir:
+  download    - yt-dlp indirme (ağ I/O)          örn. -Q download -c 16 --prefetch-multiplier 1
+  media       - hash, ffprobe, ffmpeg             örn. -Q media -c <CPU sayısı> --prefetch-multiplier 1
+  ai          - S3 upload, GPT-4o, Whisper, embedding (upload caption / transkriptle paralel)
+                                                  örn. -Q ai -c 8 --prefetch-multiplier 1
+  maintenance - periyodik temizlik, chord callback'leri (varsayılan kuyruk)
+                                                  örn. -Q maintenance -c 2 --prefetch-multiplier 4
+-Q verilmeyen tek worker (geliştirme, --pool=solo) tüm kuyrukları dinler.
 """
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
+from kombu import Queue
 
 from app.core.config import settings
 
@@ -14,5 +25,77 @@ celery_app.conf.task_serializer = "json"
 celery_app.conf.result_serializer = "json"
 celery_app.conf.accept_content = ["json"]
 
+celery_app.conf.task_queues = (
+    Queue("download"),
+    Queue("media"),
+    Queue("ai"),
+    Queue("maintenance"),
+)
+celery_app.conf.task_default_queue = "maintenance"
+celery_app.conf.task_routes = {
+    "app.workers.tasks.ingest_download_task": {"queue": "download"},
+    "app.workers.tasks.ingest_media_task": {"queue": "media"},
+    "app.workers.tasks.ingest_ai_task": {"queue": "ai"},
+    "app.workers.tasks.embed_videos_task": {"queue": "ai"},
+    "app.workers.tasks.reembed_library_task": {"queue": "ai"},
+    "app.workers.tasks.flush_embedding_refresh_task": {"queue": "ai"},
+    "app.workers.tasks.cleanup_ingest_work_dirs_task": {"queue": "maintenance"},
+}
+# Uzun süren task'lar: worker önceden çok mesaj almasın (boştaki worker'lar iş bulabilsin).
+# Kuyruk bazında farklı değer worker komut satırında --prefetch-multiplier ile verilir.
+celery_app.conf.worker_prefetch_multiplier = 1
+
+celery_app.conf.beat_schedule = {
+    "cleanup-ingest-work-dirs": {
+        "task": "app.workers.tasks.cleanup_ingest_work_dirs_task",
+        "schedule": 3600.0,
+    },
+}
+
 # Task'ları kaydet
 celery_app.autodiscover_tasks(["app.workers"])
+
+
+@worker_init.connect
+def _verify_embedding_profile(**kwargs):
+    """Worker açılışı: config'teki embedding profili şemayla uyuşmuyorsa worker başlamaz."""
+    from sqlalchemy.exc import DBAPIError
+    from app.core.db_sync import sync_engine
+    from app.core.embedding_profile import verify_embedding_profile
+    try:
+        with sync_engine.connect() as conn:
+            verify_embedding_profile(conn)
+    except (OSError, DBAPIError) as e:
+        print(f"[Celery] Embedding profili kontrol edilemedi (DB çalışıyor mu?): {e}")
+    except RuntimeError as e:
+        # Signal handler'ın Exception'ları Celery tarafından sadece loglanır
+        raise SystemExit(f"[Celery] {e}")
+
+
+@worker_init.connect
+def _check_sync_pool_size(sender=None, **kwargs):
+    """
+    SYNC_DB_POOL_SIZE / SYNC_DB_MAX_OVERFLOW process başınadır ve prefork'u varsayar (process başına
+    aynı anda tek task). threads / gevent / eventlet havuzunda tüm task'lar tek process'in havuzunu
+    paylaşır: concurrency'yi karşılamıyorsa task'lar bağlantı beklerken SYNC_DB_POOL_TIMEOUT'a düşer.
+    """
+    if settings.SYNC_DB_NULL_POOL:
+        return
+    pool_cls = getattr(sender, "pool_cls", None)
+    pool_name = pool_cls if isinstance(pool_cls, str) else getattr(pool_cls, "__module__", "")
+    if not any(name in pool_name for name in ("thread", "gevent", "eventlet")):
+        return
+    concurrency = int(getattr(sender, "concurrency", 0) or 0)
+    capacity = settings.SYNC_DB_POOL_SIZE + settings.SYNC_DB_MAX_OVERFLOW
+    if concurrency > capacity:
+        print(
+            f"[Celery] UYARI: {pool_name} havuzu, concurrency={concurrency} ama sync DB havuzu "
+            f"{capacity} bağlantı; SYNC_DB_POOL_SIZE'ı concurrency'ye göre artırın"
+        )
+
+
+@worker_process_init.connect
+def _reset_sync_pool(**kwargs):
+    """Prefork: parent'tan kopyalanan bağlantılar child'da kullanılmaz, her process kendi havuzunu açar."""
+    from app.core.db_sync import sync_engine
+    sync_engine.dispose(close=False)
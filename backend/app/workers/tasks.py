@@ -1,24 +1,40 @@
 """
 Celery task tanımları - V2 workers/tasks.
-Pipeline: Download -> Duplicate Check -> S3 -> Multi-frame Keyframes -> AI Caption -> Transcription -> Embedding -> DB.
+Pipeline (ingest_pipeline zinciri, adım başına kuyruk):
+  download: Probe + Download -> media: Hash / Duplicate Check -> [S3 | Keyframes]
+  -> ai: [AI Caption | Transcription] -> Embedding -> DB.
+Köşeli parantez içindeki aşamalar thread pool'da paralel çalışır (services/ingestion/pipeline.py).
 """
 import shutil
 import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from celery import chain
+from sqlalchemy import func, select, update
 
 from app.core.db_sync import get_sync_session
 from app.models import Tag, Video, VideoStatus, VideoTag
-from app.services.ingestion.downloader import download_video
+from app.services.ingestion.downloader import download_video, probe_source, source_identity
+from app.services.ingestion.pipeline import Stage, run_stages
 from app.services.ingestion.processor import (
     compute_file_hash,
     extract_keyframes,
-    get_duration_seconds,
+    probe_media,
 )
+from app.core.config import settings
 from app.services.intelligence.captioning import caption_from_keyframes
-from app.services.intelligence.transcription import transcribe_video
+from app.services.intelligence.embedding_refresh import release_schedule, schedule_refresh_sync
+from app.services.intelligence.reembedding import (
+    embed_videos,
+    prune_embedding_cache,
+    refresh_dirty_embeddings,
+)
+from app.services.intelligence.result_cache import ALL_STAGES, CachedStage, get_cached, put_cached
+from app.services.intelligence.search_cache import search_cache
+from app.services.intelligence.transcription import segments_text, transcribe_video
 from app.services.intelligence.vectorizer import get_embedding, text_for_embedding
 from app.services.storage import upload_file
 
@@ -70,158 +86,741 @@ def _get_video_title(info: dict) -> str:
     return info.get("title", "") or ""
 
 
-@celery_app.task(bind=True)
-def ingest_video_task(self, video_id: str):
+def _upload_stage(downloaded_path: Path, s3_key: str) -> str:
+    upload_file(downloaded_path, s3_key, content_type="video/mp4")
+    print(f"[Task] S3'e yüklendi: {s3_key}")
+    return s3_key
+
+
+def _keyframes_stage(downloaded_path: Path, keyframes_dir: Path, duration: float | None) -> list[Path]:
+    print("[Task] Keyframe'ler çıkarılıyor...")
+    keyframe_paths = extract_keyframes(downloaded_path, keyframes_dir, duration)
+    print(f"[Task] {len(keyframe_paths)} keyframe çıkarıldı")
+    return keyframe_paths
+
+
+def _caption_stage(keyframe_paths: list[Path]) -> str:
+    description_ai = caption_from_keyframes(keyframe_paths)
+    print(f"[Task] AI caption oluşturuldu ({len(description_ai)} karakter)")
+    return description_ai
+
+
+def _transcript_stage(downloaded_path: Path, temp_dir: Path, media_info: dict) -> list[dict]:
+    """
+    Audio transcription (Whisper) - Config'den kontrol edilir. Returns: zaman damgalı segmentler.
+    Whisper hatası (tekrar denemelerden sonra) fırlatılır: aşama hata verir, video FAILED olur.
+    """
+    if media_info and not media_info.get("has_audio"):
+        print("[Task] Videoda ses yok, transkript atlanıyor")
+        return []
+    if not getattr(settings, 'ENABLE_TRANSCRIPTION', True):
+        print("[Task] Transkripsiyon devre dışı (ENABLE_TRANSCRIPTION=false)")
+        return []
+    print("[Task] Ses transkripti oluşturuluyor...")
+    segments = transcribe_video(downloaded_path, temp_dir)
+    if segments:
+        print(f"[Task] Transkript oluşturuldu ({len(segments)} segment)")
+    else:
+        print("[Task] Transkript boş")
+    return segments
+
+
+def _copy_from_existing(video: Video, existing: Video, fallback_title: str = "") -> None:
+    """Duplicate: Mevcut videodan tüm metadata'yı kopyala (title, transcript, embedding vb.)."""
+    video.file_hash = existing.file_hash
+    video.title = existing.title or fallback_title
+    video.description_ai = existing.description_ai or "Duplicate - zaten mevcut"
+    video.transcript = getattr(existing, "transcript", None)
+    video.transcript_segments = existing.transcript_segments
+    video.duration = existing.duration
+    video.s3_key = existing.s3_key
+    video.embedding = existing.embedding
+    video.status = VideoStatus.COMPLETED
+
+
+# Ingest DB erişimi: her fonksiyon kendi kısa transaction'ı (get_sync_session commit + close).
+# İndirme, ffmpeg, GPT-4o, Whisper ve embedding sırasında bağlantı havuza dönmüş olur.
+
+def _claim_video(video_uuid: UUID) -> dict | None:
+    """Videoyu PROCESSING'e çeker; pipeline'ın ihtiyaç duyduğu alanları döner (yoksa None)."""
+    with get_sync_session() as session:
+        video = session.get(Video, video_uuid)
+        if not video or not video.source_url:
+            return None
+        video.status = VideoStatus.PROCESSING
+        return {"source_url": video.source_url, "owner_id": video.owner_id}
+
+
+def _mark_failed(video_uuid: UUID, message: str) -> None:
+    with get_sync_session() as session:
+        video = session.get(Video, video_uuid)
+        if video:
+            video.status = VideoStatus.FAILED
+            video.description_ai = message
+
+
+def _record_source_identity(video_uuid: UUID, identity: tuple[str, str], fallback_title: str) -> bool:
     """
-    Video ingestion pipeline V2:
+    Kaynak kimliğini kaydeder (duplicate olmasa da); aynı kimlikle tamamlanmış bir video
+    varsa metadata'yı ondan kopyalar. Returns: duplicate bulunduysa True.
+    """
+    with get_sync_session() as session:
+        video = session.get(Video, video_uuid)
+        if not video:
+            return False
+        video.source_extractor, video.source_video_id = identity
+        existing = session.execute(
+            select(Video).where(
+                Video.source_extractor == identity[0],
+                Video.source_video_id == identity[1],
+                Video.id != video_uuid,
+                Video.status == VideoStatus.COMPLETED,
+                Video.s3_key.isnot(None),
+            ).limit(1)
+        ).scalar_one_or_none()
+        if not existing:
+            return False
+        _copy_from_existing(video, existing, fallback_title)
+        return True
+
+
+def _copy_hash_duplicate(video_uuid: UUID, file_hash: str, fallback_title: str) -> bool:
+    """Aynı dosya (hash) daha önce işlendiyse metadata'yı kopyalar. Returns: duplicate ise True."""
+    with get_sync_session() as session:
+        existing = session.execute(
+            select(Video).where(
+                Video.file_hash == file_hash,
+                Video.id != video_uuid,
+            ).limit(1)  # Aynı hash'e sahip birden fazla kopya olabilir
+        ).scalar_one_or_none()
+        if not existing:
+            return False
+        video = session.get(Video, video_uuid)
+        if video:
+            _copy_from_existing(video, existing, fallback_title)
+            video.file_hash = file_hash
+        return True
+
+
+def _load_cached_texts(file_hash: str, reuse: set[str]) -> tuple[str | None, list[dict] | None]:
+    """
+    İçerik adresli cache: (caption, transkript segmentleri); cache'te yoksa veya
+    kullanılmayacaksa None.
+    """
+    with get_sync_session() as session:
+        caption = (
+            get_cached(session, file_hash, CachedStage.CAPTION)
+            if CachedStage.CAPTION.value in reuse else None
+        )
+        transcript = (
+            get_cached(session, file_hash, CachedStage.TRANSCRIPT)
+            if CachedStage.TRANSCRIPT.value in reuse else None
+        )
+        return (
+            (caption.text_result or "") if caption is not None else None,
+            (transcript.segments or []) if transcript is not None else None,
+        )
+
+
+def _put_fresh_results(
+    session,
+    file_hash: str,
+    fresh_texts: dict[CachedStage, str],
+    transcript_segments: list[dict],
+) -> None:
+    """Yeni üretilen caption / transkripti cache'e yazar (transkript segmentleriyle)."""
+    for stage, value in fresh_texts.items():
+        put_cached(
+            session, file_hash, stage, text_result=value,
+            segments=transcript_segments if stage == CachedStage.TRANSCRIPT else None,
+        )
+
+
+def _prepare_embedding(
+    video_uuid: UUID,
+    file_hash: str,
+    fresh_texts: dict[CachedStage, str],
+    transcript_segments: list[dict],
+    video_title: str,
+    description_ai: str,
+    transcript: str,
+    reuse: set[str],
+) -> tuple[str, list[float] | None]:
+    """
+    Yeni üretilen caption / transkripti cache'e yazar, embedding metnini güncel etiketler ve
+    manuel açıklamayla hazırlar, embedding cache'ine bakar.
+    Returns: (embedding metni, cache'teki embedding veya None).
+    """
+    with get_sync_session() as session:
+        _put_fresh_results(session, file_hash, fresh_texts, transcript_segments)
+
+        # 7. Etiketleri al (embedding metni için)
+        tag_names = list(
+            session.execute(
+                select(Tag.name).join(VideoTag, VideoTag.tag_id == Tag.id).where(
+                    VideoTag.video_id == video_uuid
+                )
+            ).scalars()
+        )
+        description_manual = session.execute(
+            select(Video.description_manual).where(Video.id == video_uuid)
+        ).scalar_one_or_none()
+
+        # 8. Embedding (title + caption + transcript + tags)
+        text = text_for_embedding(
+            description_ai=description_ai,
+            tags=tag_names,
+            title=video_title,
+            transcript=transcript,
+            description_manual=description_manual or "",
+        )
+        cached = (
+            get_cached(session, file_hash, CachedStage.EMBEDDING, embedding_text=text)
+            if CachedStage.EMBEDDING.value in reuse and text.strip() else None
+        )
+        return text, (cached.embedding if cached is not None else None)
+
+
+def _write_results(
+    video_uuid: UUID,
+    file_hash: str,
+    fields: dict,
+    fresh_texts: dict[CachedStage, str],
+    transcript_segments: list[dict],
+    embedding: list[float] | None,
+    embedding_text: str,
+    store_embedding: bool,
+) -> bool:
+    """
+    Son transaction: cache'e yazılmamış sonuçlar + video satırı tek commit'te.
+    Returns: video pipeline sırasında silindiyse False.
+    """
+    with get_sync_session() as session:
+        _put_fresh_results(session, file_hash, fresh_texts, transcript_segments)
+        if store_embedding and embedding is not None:
+            put_cached(
+                session, file_hash, CachedStage.EMBEDDING,
+                embedding=embedding, embedding_text=embedding_text,
+            )
+        video = session.get(Video, video_uuid)
+        if not video:
+            return False
+        for name, value in fields.items():
+            setattr(video, name, value)
+        video.status = VideoStatus.COMPLETED
+        if embedding is not None:
+            video.embedding = embedding
+        if store_embedding and embedding is not None:
+            session.flush()  # autoflush kapalı: prune yeni metni (caption / transkript) görmeli
+            prune_embedding_cache(session, {file_hash})
+        pending_refresh = video.embedding_dirty_at is not None
+    if pending_refresh:
+        # İşlenirken gelen etiket / açıklama düzenlemelerini flush atladı (sadece COMPLETED videolar)
+        schedule_refresh_sync()
+    return True
+
+
+def _work_root() -> Path:
+    """
+    Ingest çalışma dizinlerinin kökü. Zincirin adımları farklı worker'larda çalışır:
+    INGEST_WORK_DIR download / media / ai worker'larının ortak gördüğü bir dizin olmalı.
+    """
+    if settings.INGEST_WORK_DIR:
+        return Path(settings.INGEST_WORK_DIR)
+    return Path(tempfile.gettempdir()) / "memevault_ingest"
+
+
+def _work_dir(video_id: str) -> Path:
+    """
+    Çalışma başına ayrı dizin (video id + çalışma id'si): aynı video için yeniden başlatılan
+    bir zincir, hâlâ çalışan önceki zincirin dosyalarına dokunmaz. Yarım kalmış denemelerin
+    dizinleri cleanup_ingest_work_dirs_task ile (heartbeat yaşına göre) silinir.
+    """
+    return _work_root() / f"{video_id}-{uuid4().hex[:12]}"
+
+
+# Dizinin mtime'ı sadece içerik değişince güncellenir; kuyrukta bekleyen zincirin dizini
+# eski görünmesin diye her adımın başında / devrinde bu dosyaya dokunulur.
+HEARTBEAT_FILE = ".heartbeat"
+
+
+def _heartbeat(work_dir: Path) -> None:
+    try:
+        (work_dir / HEARTBEAT_FILE).touch()
+    except FileNotFoundError:
+        pass  # Dizin henüz yok (download başı) veya zincir bitti
+
+
+def _last_heartbeat(work_dir: Path) -> float:
+    """cleanup_ingest_work_dirs_task yaşı: son heartbeat (yoksa dizinin mtime'ı)."""
+    try:
+        return (work_dir / HEARTBEAT_FILE).stat().st_mtime
+    except FileNotFoundError:
+        return work_dir.stat().st_mtime
+
+
+def _finish(job: dict, result: dict) -> dict:
+    """Zincirin bittiği adım (tamamlandı / duplicate / hata): çalışma dizini silinir, arama cache'i geçersiz."""
+    shutil.rmtree(job["work_dir"], ignore_errors=True)
+    search_cache.bump(job.get("owner_id"))
+    return result
+
+
+@contextmanager
+def _ingest_step(job: dict):
+    """
+    Adım başında ve sonunda (sonraki kuyruğa devir) heartbeat yazılır.
+    Beklenmeyen hata yutulur: video FAILED işaretlenir, dizin temizlenir ve job status="error"
+    olur (adım with bloğundan sonra job'ı döner). Task hata vermediği için reprocess-all
+    chord'unun toplu embedding callback'i diğer videolar için yine çalışır.
+    """
+    work_dir = Path(job["work_dir"])
+    _heartbeat(work_dir)
+    try:
+        yield
+    except Exception as e:
+        print(f"[Task] Ingest hatası ({job['video_id']}): {e}")
+        _mark_failed(UUID(job["video_id"]), f"İşleme hatası: {e}")
+        _finish(job, {})
+        job.update(status="error", detail=str(e))
+        return
+    _heartbeat(work_dir)
+
+
+def _reuse(job: dict) -> set[str]:
+    reuse_stages = job.get("reuse_stages")
+    return set(ALL_STAGES if reuse_stages is None else reuse_stages)
+
+
+@celery_app.task
+def ingest_download_task(
+    video_id: str,
+    defer_embedding: bool = False,
+    reuse_stages: list[str] | None = None,
+) -> dict:
+    """
+    Ingest 1/3 (download kuyruğu - ağ):
+    0. Kaynak kimliği probe'u (metadata) - aynı extractor+id işlendiyse indirmeden kopyala
     1. İndir (yt-dlp)
-    2. Duplicate kontrolü (hash)
-    3. S3'e yükle
-    4. Multi-frame keyframe extraction
-    5. AI caption (GPT-4o multi-image)
-    6. Audio transcription (Whisper)
-    7. Embedding üret (title + caption + transcript + tags)
-    8. DB güncelle
+    Returns: sonraki adımın job dict'i (status="running") veya zinciri bitiren sonuç.
     """
     video_uuid = UUID(video_id)
-    temp_dir = tempfile.mkdtemp(prefix="memevault_")
-    keyframes_dir = Path(temp_dir) / "keyframes"
-    keyframes_dir.mkdir(exist_ok=True)
-    
-    try:
-        with get_sync_session() as session:
-            video = session.get(Video, video_uuid)
-            if not video or not video.source_url:
-                return {"status": "error", "detail": "Video veya source_url bulunamadı"}
-            
-            video.status = VideoStatus.PROCESSING
-            session.commit()
-
-            # 1. İndir
-            print(f"[Task] Video indiriliyor: {video.source_url}")
-            try:
-                info = download_video(video.source_url, Path(temp_dir))
-            except Exception as e:
-                video.status = VideoStatus.FAILED
-                video.description_ai = f"İndirme hatası: {e}"
-                session.commit()
-                return {"status": "error", "detail": str(e)}
-            
-            downloaded_path = _get_downloaded_path(info, Path(temp_dir))
-            if not downloaded_path or not downloaded_path.exists():
-                video.status = VideoStatus.FAILED
-                video.description_ai = "İndirilen dosya bulunamadı"
-                session.commit()
-                return {"status": "error", "detail": "İndirilen dosya bulunamadı"}
-            
-            # Video başlığını al
-            video_title = _get_video_title(info)
-            print(f"[Task] Video başlığı: {video_title}")
-
-            # 2. Hash ve duplicate kontrolü
-            file_hash = compute_file_hash(downloaded_path)
-            existing_result = session.execute(
-                select(Video).where(
-                    Video.file_hash == file_hash,
-                    Video.id != video_uuid,
+    work_dir = _work_dir(video_id)
+    job = {
+        "status": "running",
+        "video_id": video_id,
+        "owner_id": None,
+        "defer_embedding": defer_embedding,
+        "reuse_stages": reuse_stages,
+        "work_dir": str(work_dir),
+    }
+    with _ingest_step(job):
+        claimed = _claim_video(video_uuid)
+        if claimed is None:
+            return _finish(job, {"status": "error", "detail": "Video veya source_url bulunamadı"})
+        job["owner_id"] = str(claimed["owner_id"]) if claimed["owner_id"] else None
+        source_url = claimed["source_url"]
+        work_dir.mkdir(parents=True, exist_ok=True)
+        _heartbeat(work_dir)
+
+        # 0. Kaynak kimliği (sadece metadata) - aynı link daha önce işlendiyse indirme yapma
+        probed_info = None
+        try:
+            probed_info = probe_source(source_url)
+        except Exception as e:
+            print(f"[Task] Metadata probe hatası (indirme denenecek): {e}")
+        identity = source_identity(probed_info) if probed_info else None
+        if identity and _record_source_identity(video_uuid, identity, _get_video_title(probed_info)):
+            print(f"[Task] Kaynak duplicate ({identity[0]}:{identity[1]}), indirme atlandı")
+            return _finish(job, {"status": "duplicate", "video_id": video_id, "matched_by": "source"})
+
+        # 1. İndir
+        print(f"[Task] Video indiriliyor: {source_url}")
+        try:
+            info = download_video(source_url, work_dir, info=probed_info)
+        except Exception as e:
+            _mark_failed(video_uuid, f"İndirme hatası: {e}")
+            return _finish(job, {"status": "error", "detail": str(e)})
+
+        downloaded_path = _get_downloaded_path(info, work_dir)
+        if not downloaded_path or not downloaded_path.exists():
+            _mark_failed(video_uuid, "İndirilen dosya bulunamadı")
+            return _finish(job, {"status": "error", "detail": "İndirilen dosya bulunamadı"})
+
+        # Video başlığını al
+        video_title = _get_video_title(info)
+        print(f"[Task] Video başlığı: {video_title}")
+        job.update(path=str(downloaded_path), title=video_title)
+        return job
+    return job
+
+
+@celery_app.task
+def ingest_media_task(job: dict) -> dict:
+    """
+    Ingest 2/3 (media kuyruğu - CPU / disk):
+    2. Hash ve duplicate kontrolü
+    3. Süre ve stream bilgisi (ffprobe)
+    4. Keyframe extraction (ffmpeg; caption cache'te yoksa)
+    """
+    if job.get("status") != "running":
+        return job
+    with _ingest_step(job):
+        video_id = job["video_id"]
+        video_uuid = UUID(video_id)
+        work_dir = Path(job["work_dir"])
+        downloaded_path = Path(job["path"])
+        if not downloaded_path.exists():
+            _mark_failed(video_uuid, "İndirilen dosya bulunamadı (çalışma dizini temizlenmiş)")
+            return _finish(job, {"status": "error", "detail": "İndirilen dosya bulunamadı"})
+
+        # 2. Hash ve duplicate kontrolü
+        file_hash = compute_file_hash(downloaded_path)
+        if _copy_hash_duplicate(video_uuid, file_hash, job["title"]):
+            return _finish(job, {"status": "duplicate", "video_id": video_id, "matched_by": "hash"})
+
+        # 3. Süre ve stream bilgisi (tek ffprobe)
+        media_info = probe_media(downloaded_path) or {}
+        duration = media_info.get("duration")
+        print(f"[Task] Video süresi: {duration} saniye")
+
+        # Caption cache'teyse keyframe'lere gerek yok
+        cached_caption, _ = _load_cached_texts(file_hash, _reuse(job))
+
+        # 4. Keyframe'ler (S3 upload ai adımında caption / transkriptle paralel çalışır)
+        keyframes_dir = work_dir / "keyframes"
+        keyframes_dir.mkdir(exist_ok=True)
+        keyframe_duration = media_info.get("duration_float") or duration
+        stages = []
+        if cached_caption is None:
+            stages.append(
+                Stage(
+                    "keyframes",
+                    lambda _: _keyframes_stage(downloaded_path, keyframes_dir, keyframe_duration),
                 )
             )
-            existing = existing_result.scalar_one_or_none()
-            if existing:
-                # Duplicate: Mevcut videodan tüm metadata'yı kopyala (title, transcript, embedding vb.)
-                video.file_hash = file_hash
-                video.title = existing.title or video_title
-                video.description_ai = existing.description_ai or "Duplicate - zaten mevcut"
-                video.transcript = getattr(existing, "transcript", None)
-                video.duration = existing.duration
-                video.s3_key = existing.s3_key
-                video.embedding = existing.embedding
-                video.status = VideoStatus.COMPLETED
-                session.commit()
-                return {"status": "duplicate", "video_id": video_id}
-
-            # 3. Süre
-            duration = get_duration_seconds(downloaded_path)
-            print(f"[Task] Video süresi: {duration} saniye")
-
-            # 4. S3'e yükle
-            ext = downloaded_path.suffix or ".mp4"
-            s3_key = f"videos/{video_id}{ext}"
-            try:
-                upload_file(downloaded_path, s3_key, content_type="video/mp4")
-                print(f"[Task] S3'e yüklendi: {s3_key}")
-            except Exception as e:
-                video.status = VideoStatus.FAILED
-                video.description_ai = f"S3 yükleme hatası: {e}"
-                session.commit()
-                return {"status": "error", "detail": f"S3 upload: {e}"}
-
-            # 5. Multi-frame keyframe extraction ve AI caption
-            print("[Task] Keyframe'ler çıkarılıyor...")
-            keyframe_paths = extract_keyframes(downloaded_path, keyframes_dir, duration)
-            print(f"[Task] {len(keyframe_paths)} keyframe çıkarıldı")
-            
-            try:
-                description_ai = caption_from_keyframes(keyframe_paths)
-                print(f"[Task] AI caption oluşturuldu ({len(description_ai)} karakter)")
-            except Exception as e:
+        else:
+            print("[Task] Caption cache'ten alınacak, keyframe atlandı")
+        stage_run = run_stages(stages, max_workers=settings.INGEST_STAGE_WORKERS)
+        timings = stage_run.timings
+
+        keyframes_error = stage_run.errors.get("keyframes")
+        job.update(
+            file_hash=file_hash,
+            duration=duration,
+            media_info=media_info,
+            keyframes=[str(p) for p in stage_run.results.get("keyframes") or []],
+            keyframes_error=str(keyframes_error) if keyframes_error else None,
+            timings=timings,
+        )
+        return job
+    return job
+
+
+@celery_app.task
+def ingest_ai_task(job: dict) -> dict:
+    """
+    Ingest 3/3 (ai kuyruğu - OpenAI rate limit):
+    5-6. Paralel: S3'e yükle | AI caption (GPT-4o multi-image) | transcription (Whisper)
+    7. Embedding üret (title + caption + transcript + tags) - defer_embedding ise atlanır
+    8. DB güncelle
+    """
+    if job.get("status") != "running":
+        return job
+    with _ingest_step(job):
+        video_id = job["video_id"]
+        video_uuid = UUID(video_id)
+        work_dir = Path(job["work_dir"])
+        downloaded_path = Path(job["path"])
+        file_hash = job["file_hash"]
+        media_info = job["media_info"]
+        keyframe_paths = [Path(p) for p in job["keyframes"]]
+        reuse = _reuse(job)
+
+        # İçerik adresli cache: aynı dosya için önceden üretilmiş caption/transkript
+        cached_caption, cached_segments = _load_cached_texts(file_hash, reuse)
+
+        # Kuyrukta beklerken çalışma dizini silindiyse boş caption / transkript yazmak yerine hata
+        needed = [downloaded_path]  # S3 upload her zaman gerekir
+        if cached_caption is None:
+            needed.extend(keyframe_paths)
+        missing = [p for p in needed if not p.exists()]
+        if missing:
+            _mark_failed(video_uuid, f"Çalışma dosyaları bulunamadı ({len(missing)} dosya), yeniden işleyin")
+            return _finish(job, {"status": "error", "detail": f"Eksik çalışma dosyası: {missing[0].name}"})
+
+        # 5-6. Bağımsız aşamalar paralel: S3 upload | caption | transkript
+        ext = downloaded_path.suffix or ".mp4"
+        s3_key = f"videos/{video_id}{ext}"
+        stages = [Stage("upload", lambda _: _upload_stage(downloaded_path, s3_key))]
+        if cached_caption is None and keyframe_paths:
+            stages.append(Stage("caption", lambda _: _caption_stage(keyframe_paths)))
+        elif cached_caption is not None:
+            print("[Task] Caption cache'ten alındı")
+        if cached_segments is None:
+            stages.append(
+                Stage("transcript", lambda _: _transcript_stage(downloaded_path, work_dir, media_info))
+            )
+        else:
+            print("[Task] Transkript cache'ten alındı")
+        stage_run = run_stages(stages, max_workers=settings.INGEST_STAGE_WORKERS)
+        timings = {**job["timings"], **stage_run.timings}
+        print(f"[Task] Aşama süreleri: {timings}")
+
+        if "upload" in stage_run.errors:
+            e = stage_run.errors["upload"]
+            _mark_failed(video_uuid, f"S3 yükleme hatası: {e}")
+            return _finish(job, {"status": "error", "detail": f"S3 upload: {e}", "timings": timings})
+
+        # Yeni üretilen (cache'ten gelmeyen) sonuçlar cache'e yazılacak
+        fresh_texts: dict[CachedStage, str] = {}
+        if cached_caption is not None:
+            description_ai = cached_caption
+        else:
+            description_ai = stage_run.results.get("caption")
+            if description_ai is None:
+                e = stage_run.errors.get("caption") or job["keyframes_error"] or "keyframe çıkarılamadı"
                 description_ai = f"(Caption hatası: {e})"
                 print(f"[Task] Caption hatası: {e}")
+            elif description_ai:
+                fresh_texts[CachedStage.CAPTION] = description_ai
+
+        # Transkript hatası: parçalardan biri eksik kalırsa video COMPLETED işaretlenmez
+        if "transcript" in stage_run.errors:
+            e = stage_run.errors["transcript"]
+            _mark_failed(video_uuid, f"Transkript hatası: {e}")
+            return _finish(job, {"status": "error", "detail": f"Transkript: {e}", "timings": timings})
+        if cached_segments is not None:
+            transcript_segments = cached_segments
+        else:
+            transcript_segments = stage_run.results.get("transcript") or []
+        transcript = segments_text(transcript_segments)
+        if cached_segments is None and transcript:
+            fresh_texts[CachedStage.TRANSCRIPT] = transcript
 
-            # 6. Audio transcription (Whisper) - Config'den kontrol edilir
-            from app.core.config import settings
-            transcript = ""
-            if getattr(settings, 'ENABLE_TRANSCRIPTION', True):
-                print("[Task] Ses transkripti oluşturuluyor...")
+        embedding = None
+        text = ""
+        store_embedding = False
+        if job["defer_embedding"]:
+            print("[Task] Embedding toplu işleme bırakıldı (defer_embedding)")
+        else:
+            text, embedding = _prepare_embedding(
+                video_uuid, file_hash, fresh_texts, transcript_segments,
+                job["title"], description_ai, transcript, reuse,
+            )
+            fresh_texts = {}  # _prepare_embedding cache'e yazdı
+            print(f"[Task] Embedding metni hazırlandı ({len(text)} karakter)")
+            if embedding is not None:
+                print("[Task] Embedding cache'ten alındı")
+            else:
+                # API çağrısı transaction dışında
                 try:
-                    transcript = transcribe_video(downloaded_path, Path(temp_dir))
-                    if transcript:
-                        print(f"[Task] Transkript oluşturuldu ({len(transcript)} karakter)")
-                    else:
-                        print("[Task] Transkript boş veya oluşturulamadı")
+                    embedding = get_embedding(text) if text.strip() else None
+                    print("[Task] Embedding oluşturuldu")
                 except Exception as e:
-                    transcript = ""
-                    print(f"[Task] Transkript hatası: {e}")
-            else:
-                print("[Task] Transkripsiyon devre dışı (ENABLE_TRANSCRIPTION=false)")
+                    embedding = None
+                    print(f"[Task] Embedding hatası: {e}")
+                store_embedding = embedding is not None
 
-            # 7. Etiketleri al (embedding metni için)
-            tag_rows = session.execute(
-                select(Tag.name).join(VideoTag, VideoTag.tag_id == Tag.id).where(
-                    VideoTag.video_id == video_uuid
+        # 8. DB güncelle
+        written = _write_results(
+            video_uuid,
+            file_hash,
+            fields={
+                "s3_key": s3_key,
+                "file_hash": file_hash,
+                "duration": job["duration"],
+                "title": job["title"],
+                "description_ai": description_ai,
+                "transcript": transcript,
+                "transcript_segments": transcript_segments,
+            },
+            fresh_texts=fresh_texts,
+            transcript_segments=transcript_segments,
+            embedding=embedding,
+            embedding_text=text,
+            store_embedding=store_embedding,
+        )
+        if not written:
+            return _finish(job, {"status": "error", "detail": "Video işleme sırasında silindi"})
+
+        print(f"[Task] Video işleme tamamlandı: {video_id}")
+        return _finish(job, {"status": "ok", "video_id": video_id, "timings": timings})
+    return job
+
+
+def ingest_pipeline(
+    video_id: str,
+    defer_embedding: bool = False,
+    reuse_stages: list[str] | None = None,
+):
+    """
+    Video ingestion zinciri: download -> media -> ai; her adım kendi kuyruğunda
+    (bkz. celery_app task_routes). Adımlar job dict'ini bir sonrakine geçirir;
+    duplicate / hata sonucu (beklenmeyen hatalar dahil, bkz. _ingest_step) zincirin kalanından
+    olduğu gibi geçer; zincir exception ile bitmez.
+    
+    defer_embedding=True: embedding atlanır; toplu olarak embed_videos_task ile üretilir.
+    reuse_stages: file_hash cache'inden kullanılabilecek aşamalar ("caption", "transcript", "embedding");
+    None = hepsi, [] = hiçbiri (her şey yeniden üretilir).
+    Kullanım: ingest_pipeline(id).delay() - AsyncResult son adımın (ai) sonucudur.
+    """
+    return chain(
+        ingest_download_task.si(video_id, defer_embedding=defer_embedding, reuse_stages=reuse_stages),
+        ingest_media_task.s(),
+        ingest_ai_task.s(),
+    )
+
+
+@celery_app.task
+def cleanup_ingest_work_dirs_task(max_age_hours: int | None = None):
+    """
+    Zinciri yarıda kalan (worker düştü, broker kaybı) ingest çalışma dizinlerini siler.
+    Yaş son heartbeat'ten hesaplanır (bkz. _ingest_step); maintenance kuyruğu, celery beat ile periyodik.
+    """
+    base = _work_root()
+    if not base.exists():
+        return {"status": "ok", "removed": 0}
+    max_age = (max_age_hours or settings.INGEST_WORK_DIR_MAX_AGE_HOURS) * 3600
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in base.iterdir():
+        if entry.is_dir() and _last_heartbeat(entry) < cutoff:
+            shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+    if removed:
+        print(f"[Task] {removed} eski ingest çalışma dizini silindi")
+    return {"status": "ok", "removed": removed}
+
+
+def _defer_to_refresh(video_ids: list[UUID]) -> None:
+    """
+    Toplu embedding'i başarısız olan videolar kirli işaretlenir: flush task'ı (kendi retry'ı ile)
+    onları yeniden dener, hata sessizce kaybolmaz.
+    """
+    try:
+        with get_sync_session() as session:
+            session.execute(
+                update(Video)
+                .where(Video.id.in_(video_ids))
+                .values(embedding_dirty_at=func.now())
+            )
+        schedule_refresh_sync()
+    except Exception as e:
+        print(f"[Task] Başarısız videolar kirli işaretlenemedi ({len(video_ids)} video): {e}")
+
+
+@celery_app.task
+def embed_videos_task(video_ids: list[str], use_cache: bool = True):
+    """
+    Toplu embedding: Videoların metinlerini gruplayıp az sayıda embeddings isteği ile vektör üretir.
+    reprocess-all gibi toplu işlemlerde ingest_pipeline(defer_embedding=True) sonrasında çalışır.
+    Başarısız grubun videoları kirli işaretlenir; flush_embedding_refresh_task onları retry ile yeniden dener.
+    """
+    ids = [UUID(v) for v in video_ids]
+    chunk_size = settings.EMBEDDING_BATCH_MAX_ITEMS
+    updated = 0
+    failed = 0
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        try:
+            updated += embed_videos(chunk, use_cache=use_cache)
+            with get_sync_session() as session:
+                owner_ids = set(
+                    session.execute(
+                        select(Video.owner_id).where(Video.id.in_(chunk)).distinct()
+                    ).scalars()
                 )
-            ).fetchall()
-            tag_names = [r[0] for r in tag_rows]
-
-            # 8. Embedding (title + caption + transcript + tags)
-            text = text_for_embedding(
-                description_ai=description_ai,
-                tags=tag_names,
-                title=video_title,
-                transcript=transcript
+            for owner_id in owner_ids:
+                search_cache.bump(owner_id)
+        except Exception as e:
+            print(f"[Task] Toplu embedding hatası ({len(chunk)} video, flush'a bırakıldı): {e}")
+            _defer_to_refresh(chunk)
+            failed += len(chunk)
+    print(f"[Task] Toplu embedding tamamlandı: {updated}/{len(ids)} video")
+    return {
+        "status": "partial" if failed else "ok",
+        "updated": updated,
+        "failed": failed,
+        "total": len(ids),
+    }
+
+
+@celery_app.task(bind=True)
+def reembed_library_task(self, user_id: str, batch_size: int | None = None):
+    """
+    Sadece embedding'i yeniden üretir: medya indirilmez, caption/transkript tekrar çağrılmaz.
+    DB'deki metinden text_for_embedding + toplu embedding; id üzerinden sayfalanır.
+    İlerleme: state=PROGRESS, meta={"done", "updated", "total"}.
+    """
+    user_uuid = UUID(user_id)
+    page_size = batch_size or settings.EMBEDDING_BATCH_MAX_ITEMS
+    base_filter = (
+        Video.status == VideoStatus.COMPLETED,
+        Video.owner_id == user_uuid,
+    )
+
+    with get_sync_session() as session:
+        total = session.execute(
+            select(func.count()).select_from(Video).where(*base_filter)
+        ).scalar_one()
+
+    done = 0
+    updated = 0
+    last_id = None
+    self.update_state(state="PROGRESS", meta={"done": 0, "updated": 0, "total": total})
+    while True:
+        with get_sync_session() as session:
+            q = select(Video.id).where(*base_filter)
+            if last_id is not None:
+                q = q.where(Video.id > last_id)
+            page = session.execute(q.order_by(Video.id).limit(page_size)).scalars().all()
+        if not page:
+            break
+        try:
+            updated += embed_videos(list(page))
+        except Exception as e:
+            print(f"[Task] Yeniden embedding hatası ({len(page)} video, flush'a bırakıldı): {e}")
+            _defer_to_refresh(list(page))
+        search_cache.bump(user_uuid)
+        last_id = page[-1]
+        done += len(page)
+        self.update_state(state="PROGRESS", meta={"done": done, "updated": updated, "total": total})
+
+    print(f"[Task] Yeniden embedding tamamlandı: {updated}/{total} video")
+    return {"status": "ok", "done": done, "updated": updated, "total": total}
+
+
+@celery_app.task(bind=True, max_retries=settings.EMBEDDING_REFRESH_MAX_RETRIES)
+def flush_embedding_refresh_task(self):
+    """
+    Debounce penceresi sonunda çalışır (bkz. embedding_refresh.schedule_refresh):
+    kirli videoları EMBEDDING_BATCH_MAX_ITEMS'lık sayfalarla toplu embed eder.
+    Metni değişmeyen videolar file_hash cache'inden gelir (API çağrısı yok).
+    Sayfa hatasında kalan videolar kirli kalır; task EMBEDDING_REFRESH_RETRY_SECONDS sonra
+    yeniden denenir (debounce anahtarı bırakıldığı için başka bir flush onları almayabilir).
+    """
+    release_schedule()
+    done = 0
+    updated = 0
+    cursor = None
+    while True:
+        try:
+            rows, page_updated = refresh_dirty_embeddings(
+                settings.EMBEDDING_BATCH_MAX_ITEMS, after=cursor
             )
-            print(f"[Task] Embedding metni hazırlandı ({len(text)} karakter)")
-            
-            try:
-                embedding = get_embedding(text) if text.strip() else None
-                print("[Task] Embedding oluşturuldu")
-            except Exception as e:
-                embedding = None
-                print(f"[Task] Embedding hatası: {e}")
-
-            # 9. DB güncelle
-            video.s3_key = s3_key
-            video.file_hash = file_hash
-            video.duration = duration
-            video.title = video_title
-            video.description_ai = description_ai
-            video.transcript = transcript
-            video.status = VideoStatus.COMPLETED
-            if embedding is not None:
-                video.embedding = embedding
-            session.commit()
-            
-            print(f"[Task] Video işleme tamamlandı: {video_id}")
-            return {"status": "ok", "video_id": video_id}
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        except Exception as e:
+            print(f"[Task] Embedding yenileme hatası (yeniden denenecek): {e}")
+            raise self.retry(exc=e, countdown=settings.EMBEDDING_REFRESH_RETRY_SECONDS)
+        if not rows:
+            break
+        for owner_id in {owner_id for _, owner_id, _ in rows}:
+            search_cache.bump(owner_id)
+        done += len(rows)
+        updated += page_updated
+        last_id, _, last_stamp = rows[-1]
+        cursor = (last_stamp, last_id)
+
+    if done:
+        print(f"[Task] Embedding yenileme tamamlandı: {updated}/{done} video")
+    return {"status": "ok", "done": done, "updated": updated}
@@ -0,0 +1,87 @@
+"""
+Ortak test yardımcıları - saf fonksiyon testleri; PostgreSQL / Redis / OpenAI gerekmez.
+Redis kullanan modüller bellek içi FakeRedis ile test edilir (sync ve async aynı veriyi paylaşır).
+"""
+import pytest
+
+
+class FakeRedis:
+    """Testlerde kullanılan komutların (get/set/incr/delete/exists/eval) bellek içi karşılığı."""
+
+    def __init__(self, data: dict | None = None):
+        self.data: dict[str, bytes] = {} if data is None else data
+        self.fail = False  # True: her komut ConnectionError (Redis erişilemez)
+
+    def _check(self) -> None:
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None, px=None):
+        self._check()
+        if nx and key in self.data:
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def incr(self, key):
+        self._check()
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def delete(self, key):
+        self._check()
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def exists(self, key):
+        self._check()
+        return int(key in self.data)
+
+    def eval(self, script, numkeys, key, token):
+        # Sadece singleflight'ın "sahibiyse sil" script'i
+        self._check()
+        if self.data.get(key) == str(token).encode():
+            return self.delete(key)
+        return 0
+
+
+class FakeAsyncRedis:
+    """FakeRedis'in async arayüzü; aynı veri sözlüğünü kullanır."""
+
+    def __init__(self, sync: FakeRedis):
+        self.sync = sync
+
+    async def get(self, key):
+        return self.sync.get(key)
+
+    async def set(self, key, value, nx=False, ex=None, px=None):
+        return self.sync.set(key, value, nx=nx, ex=ex, px=px)
+
+    async def incr(self, key):
+        return self.sync.incr(key)
+
+    async def delete(self, key):
+        return self.sync.delete(key)
+
+    async def exists(self, key):
+        return self.sync.exists(key)
+
+    async def eval(self, script, numkeys, key, token):
+        return self.sync.eval(script, numkeys, key, token)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
+
+
+@pytest.fixture
+def fake_async_redis(fake_redis) -> FakeAsyncRedis:
+    return FakeAsyncRedis(fake_redis)
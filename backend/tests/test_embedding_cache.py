@@ -0,0 +1,72 @@
+import asyncio
+
+from app.services.intelligence import vectorizer
+from app.services.intelligence.embedding_cache import EmbeddingCache, normalize_query
+from app.services.intelligence.singleflight import SingleFlight
+
+
+def _cache(fake_redis, fake_async_redis, max_size=8) -> EmbeddingCache:
+    cache = EmbeddingCache(max_size=max_size, ttl_seconds=60, redis_url="redis://unused")
+    cache._redis = fake_redis
+    cache._async_redis = fake_async_redis
+    return cache
+
+
+def test_normalize_query_collapses_whitespace_and_case():
+    assert normalize_query("  Kedi   DANS \n ediyor ") == "kedi dans ediyor"
+    assert normalize_query("   ") == ""
+
+
+def test_lru_evicts_oldest_and_redis_tier_survives(fake_redis, fake_async_redis):
+    cache = _cache(fake_redis, fake_async_redis, max_size=2)
+    cache.set("a", "m", [0.5, 0.25])
+    cache.set("b", "m", [1.0, 0.0])
+    cache.set("c", "m", [0.0, 1.0])
+    assert len(cache._lru) == 2
+
+    # "a" LRU'dan düştü ama Redis'ten (float32 paketli) geri okunur
+    assert cache.get("a", "m") == [0.5, 0.25]
+    assert cache.redis_hits == 1
+    assert cache.get("a", "m") == [0.5, 0.25]
+    assert cache.memory_hits == 1
+
+
+def test_model_is_part_of_the_key(fake_redis, fake_async_redis):
+    cache = _cache(fake_redis, fake_async_redis)
+    cache.set("q", "model-a:1536", [0.5])
+    assert cache.get("q", "model-b:512") is None
+
+
+def test_query_embedding_embeds_original_text_and_caches_by_normalized(
+    monkeypatch, fake_redis, fake_async_redis
+):
+    calls = []
+    monkeypatch.setattr(vectorizer, "embedding_cache", _cache(fake_redis, fake_async_redis))
+    monkeypatch.setattr(vectorizer, "get_embedding", lambda text: calls.append(text) or [0.5])
+
+    assert vectorizer.get_query_embedding("  NASA roket  ") == [0.5]
+    assert calls == ["NASA roket"]
+
+    # Büyük / küçük harf ve boşluk farkı aynı cache anahtarı: API çağrılmaz
+    assert vectorizer.get_query_embedding("nasa   ROKET") == [0.5]
+    assert calls == ["NASA roket"]
+
+
+def test_async_query_embedding_embeds_original_text(monkeypatch, fake_redis, fake_async_redis):
+    calls = []
+
+    async def fake_embedding(text):
+        calls.append(text)
+        return [0.25]
+
+    monkeypatch.setattr(vectorizer, "embedding_cache", _cache(fake_redis, fake_async_redis))
+    monkeypatch.setattr(vectorizer, "get_embedding_async", fake_embedding)
+    monkeypatch.setattr(vectorizer, "embedding_flight", SingleFlight("test", lock_ms=0, poll_ms=10))
+
+    async def scenario():
+        first = await vectorizer.get_query_embedding_async(" Ankara  Kedileri ")
+        second = await vectorizer.get_query_embedding_async("ankara kedileri")
+        return first, second
+
+    assert asyncio.run(scenario()) == ([0.25], [0.25])
+    assert calls == ["Ankara  Kedileri"]
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.intelligence import embedding_refresh
+from app.services.intelligence.embedding_refresh import (
+    FLUSH_TASK,
+    SCHEDULE_KEY,
+    release_schedule,
+    schedule_refresh,
+    schedule_refresh_sync,
+)
+
+
+@pytest.fixture
+def sent(monkeypatch, fake_redis, fake_async_redis):
+    """Kuyruğa konan flush task'ları; Redis bellek içi."""
+    calls = []
+    monkeypatch.setattr(settings, "EMBEDDING_REFRESH_DEBOUNCE_SECONDS", 5)
+    monkeypatch.setattr(embedding_refresh, "_get_redis", lambda: fake_redis)
+    monkeypatch.setattr(embedding_refresh, "_get_async_redis", lambda: fake_async_redis)
+    monkeypatch.setattr(
+        embedding_refresh.celery_app,
+        "send_task",
+        lambda name, countdown=None: calls.append((name, countdown)),
+    )
+    return calls
+
+
+def test_edits_in_one_window_schedule_a_single_flush(sent, fake_redis):
+    async def edits():
+        for _ in range(3):
+            await schedule_refresh()
+
+    asyncio.run(edits())
+    assert sent == [(FLUSH_TASK, 5)]
+    assert SCHEDULE_KEY in fake_redis.data
+
+
+def test_flush_start_reopens_the_window(sent):
+    asyncio.run(schedule_refresh())
+    release_schedule()
+    asyncio.run(schedule_refresh())
+    assert len(sent) == 2
+
+
+def test_sync_schedule_shares_the_debounce_key(sent):
+    asyncio.run(schedule_refresh())
+    schedule_refresh_sync()
+    assert len(sent) == 1
+    release_schedule()
+    schedule_refresh_sync()
+    assert len(sent) == 2
+
+
+def test_redis_down_schedules_without_debounce(sent, fake_redis):
+    fake_redis.fail = True
+    asyncio.run(schedule_refresh())
+    asyncio.run(schedule_refresh())
+    release_schedule()  # hata yutulur
+    assert sent == [(FLUSH_TASK, 5), (FLUSH_TASK, 5)]
+
+
+def test_zero_debounce_flushes_immediately(sent, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_REFRESH_DEBOUNCE_SECONDS", 0)
+    asyncio.run(schedule_refresh())
+    assert sent == [(FLUSH_TASK, 0)]
@@ -0,0 +1,72 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.services.intelligence.search_cache import SearchResultCache
+
+REQUEST = {"q": "Kedi  Dans", "folder_id": None, "limit": 10, "search_mode": "hybrid"}
+
+
+@pytest.fixture
+def cache(fake_redis, fake_async_redis) -> SearchResultCache:
+    cache = SearchResultCache(ttl_seconds=600, redis_url="redis://unused")
+    cache._redis = fake_redis
+    cache._async_redis = fake_async_redis
+    return cache
+
+
+def test_hit_after_set_for_equivalent_query(cache):
+    owner = uuid4()
+
+    async def scenario():
+        cached, key = await cache.aget(owner, REQUEST)
+        assert cached is None
+        await cache.aset(key, {"results": [1]})
+        # Sorgu normalize edilir: boşluk / büyük harf farkı aynı anahtar
+        return await cache.aget(owner, dict(REQUEST, q="kedi dans"))
+
+    cached, _ = asyncio.run(scenario())
+    assert cached == {"results": [1]}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_bump_invalidates_only_that_owner(cache):
+    owner, other = uuid4(), uuid4()
+
+    async def fill():
+        for user in (owner, other):
+            _, key = await cache.aget(user, REQUEST)
+            await cache.aset(key, {"user": str(user)})
+
+    asyncio.run(fill())
+    cache.bump(owner)  # worker (sync) tarafı
+
+    assert asyncio.run(cache.aget(owner, REQUEST))[0] is None
+    assert asyncio.run(cache.aget(other, REQUEST))[0] == {"user": str(other)}
+
+
+def test_async_bump_and_new_version_key(cache):
+    owner = uuid4()
+    _, before = asyncio.run(cache.aget(owner, REQUEST))
+    asyncio.run(cache.abump(owner))
+    _, after = asyncio.run(cache.aget(owner, REQUEST))
+    assert before != after
+
+
+def test_bump_without_owner_is_noop(cache, fake_redis):
+    cache.bump(None)
+    assert fake_redis.data == {}
+
+
+def test_redis_down_disables_cache_without_errors(cache, fake_redis):
+    fake_redis.fail = True
+    owner = uuid4()
+    assert asyncio.run(cache.aget(owner, REQUEST)) == (None, None)
+    cache.bump(owner)  # hata yutulur
+
+
+def test_disabled_cache_returns_no_key(fake_redis, fake_async_redis):
+    cache = SearchResultCache(ttl_seconds=0, redis_url="redis://unused")
+    cache._async_redis = fake_async_redis
+    assert asyncio.run(cache.aget(uuid4(), REQUEST)) == (None, None)
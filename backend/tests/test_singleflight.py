@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from app.services.intelligence import singleflight
+from app.services.intelligence.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight("test", lock_ms=0, poll_ms=10)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "vec"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", compute) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["vec"] * 5
+    assert calls == 1
+    assert flight.stats() == {"leaders": 1, "coalesced": 4, "remote_coalesced": 0, "in_flight": 0}
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight("test", lock_ms=0, poll_ms=10)
+
+    async def scenario():
+        return await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0, result="a")),
+            flight.do("b", lambda: asyncio.sleep(0, result="b")),
+        )
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert flight.leaders == 2
+
+
+def test_error_reaches_every_waiter_and_key_is_released():
+    flight = SingleFlight("test", lock_ms=0, poll_ms=10)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("api down")
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        # Sonraki çağrı yeni bir hesaplama başlatır
+        return await flight.do("k", lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(scenario()) == "ok"
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight("test", lock_ms=0, poll_ms=10)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def _lock_key(key: str) -> str:
+    return f"sf:test:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+@pytest.fixture
+def redis_lock(monkeypatch, fake_async_redis):
+    monkeypatch.setattr(singleflight, "_get_redis", lambda: fake_async_redis)
+    return fake_async_redis
+
+
+def test_leader_takes_and_releases_redis_lock(redis_lock, fake_redis):
+    flight = SingleFlight("test", lock_ms=1000, poll_ms=10)
+
+    async def compute():
+        assert _lock_key("k") in fake_redis.data
+        return "vec"
+
+    async def probe():
+        return None
+
+    assert asyncio.run(flight.do("k", compute, probe=probe)) == "vec"
+    assert fake_redis.data == {}
+
+
+def test_waits_for_other_process_result_via_probe(redis_lock, fake_redis):
+    flight = SingleFlight("test", lock_ms=1000, poll_ms=5)
+    fake_redis.data[_lock_key("k")] = b"other"  # Başka bir process kilidi tutuyor
+    polls = 0
+
+    async def probe():
+        nonlocal polls
+        polls += 1
+        return "remote-vec" if polls >= 2 else None
+
+    async def compute():
+        raise AssertionError("sonuç cache'ten gelmeliydi")
+
+    assert asyncio.run(flight.do("k", compute, probe=probe)) == "remote-vec"
+    assert flight.remote_coalesced == 1
+
+
+def test_computes_itself_when_lock_holder_vanishes(redis_lock, fake_redis):
+    flight = SingleFlight("test", lock_ms=1000, poll_ms=5)
+    lock_key = _lock_key("k")
+    fake_redis.data[lock_key] = b"other"
+
+    async def probe():
+        fake_redis.data.pop(lock_key, None)  # sahibi sonuç yazamadan bitirdi
+        return None
+
+    assert asyncio.run(flight.do("k", lambda: asyncio.sleep(0, result="own"), probe=probe)) == "own"
+
+
+def test_redis_error_falls_back_to_local_computation(redis_lock, fake_redis):
+    fake_redis.fail = True
+    flight = SingleFlight("test", lock_ms=1000, poll_ms=5)
+
+    async def probe():
+        return None
+
+    assert asyncio.run(flight.do("k", lambda: asyncio.sleep(0, result="local"), probe=probe)) == "local"
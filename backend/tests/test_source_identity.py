@@ -0,0 +1,27 @@
+from app.services.ingestion.downloader import source_identity
+
+
+def test_same_video_from_different_urls_has_same_identity():
+    short = {"extractor_key": "Youtube", "id": "dQw4w9WgXcQ", "webpage_url": "https://youtu.be/dQw4w9WgXcQ"}
+    shorts = {
+        "extractor_key": "Youtube",
+        "id": "dQw4w9WgXcQ",
+        "webpage_url": "https://www.youtube.com/shorts/dQw4w9WgXcQ?si=abc",
+    }
+    assert source_identity(short) == source_identity(shorts) == ("Youtube", "dQw4w9WgXcQ")
+
+
+def test_falls_back_to_extractor_name():
+    assert source_identity({"extractor": "twitter", "id": 123}) == ("twitter", "123")
+
+
+def test_playlists_and_incomplete_info_have_no_identity():
+    assert source_identity({"_type": "playlist", "extractor_key": "Youtube", "id": "PL1"}) is None
+    assert source_identity({"extractor_key": "Youtube"}) is None
+    assert source_identity({"id": "abc"}) is None
+
+
+def test_identity_is_clipped_to_column_sizes():
+    extractor, vid = source_identity({"extractor_key": "x" * 100, "id": "y" * 300})
+    assert len(extractor) == 64
+    assert len(vid) == 255
@@ -0,0 +1,107 @@
+import pytest
+
+from app.core.config import settings
+from app.services.ingestion import processor
+from app.services.intelligence import transcription
+from app.services.intelligence.transcription import plan_chunks, segments_text, stitch_segments
+
+
+def test_short_audio_is_a_single_chunk():
+    assert plan_chunks(300, [], chunk_seconds=600, overlap=1.5) == [(0.0, 300)]
+
+
+def test_chunks_cut_at_fixed_length_without_silences():
+    assert plan_chunks(1500, [], chunk_seconds=600, overlap=1.5) == [
+        (0.0, 601.5),
+        (600, 1201.5),
+        (1200, 1500),
+    ]
+
+
+def test_cut_moves_to_latest_silence_in_last_quarter():
+    # Pencere: [450, 600]; 200s'deki sessizlik pencere dışında, 520 ve 560 içinde
+    silences = [(199, 201), (519, 521), (558, 562)]
+    chunks = plan_chunks(1000, silences, chunk_seconds=600, overlap=1.5)
+    assert chunks[0] == (0.0, 561.5)
+    assert chunks[1][0] == 560
+
+
+def test_chunks_cover_whole_audio_with_overlap():
+    chunks = plan_chunks(3601, [(1000, 1002), (2300, 2301)], chunk_seconds=600, overlap=2)
+    assert chunks[0][0] == 0.0
+    assert chunks[-1][1] == 3601
+    for (_, prev_end), (start, _) in zip(chunks, chunks[1:]):
+        assert prev_end >= start  # boşluk yok
+
+
+def test_stitch_drops_segments_repeated_in_overlap():
+    first = [
+        {"start": 0.0, "end": 4.0, "text": "merhaba"},
+        {"start": 4.0, "end": 600.5, "text": "dünya"},
+    ]
+    # İkinci parça 600'de başlıyor; ilk segment önceki parçanın kapsadığı bölgede
+    second = [
+        {"start": 600.0, "end": 600.5, "text": "dünya"},
+        {"start": 600.4, "end": 603.0, "text": "nasılsın"},
+        {"start": 603.0, "end": 606.0, "text": "iyiyim"},
+    ]
+    stitched = stitch_segments([first, second])
+    assert [s["text"] for s in stitched] == ["merhaba", "dünya", "nasılsın", "iyiyim"]
+    # Zaman damgaları korunur
+    assert stitched[2] == {"start": 600.4, "end": 603.0, "text": "nasılsın"}
+    assert segments_text(stitched) == "merhaba dünya nasılsın iyiyim"
+
+
+def test_stitch_keeps_empty_chunks_harmless():
+    seg = {"start": 0.0, "end": 1.0, "text": "a"}
+    assert stitch_segments([[], [seg], []]) == [seg]
+    assert segments_text([]) == ""
+
+
+@pytest.fixture
+def chunked_audio(monkeypatch, tmp_path):
+    """1500s'lik ses: 3 parça; cut_audio / Whisper sahte, tekrar beklemesi yok."""
+    monkeypatch.setattr(settings, "TRANSCRIPTION_CHUNK_SECONDS", 600)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_CHUNK_OVERLAP", 1.5)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_CHUNK_RETRIES", 2)
+    monkeypatch.setattr(transcription, "_audio_duration", lambda path: 1500.0)
+    monkeypatch.setattr(transcription, "OpenAI", lambda api_key=None: object())
+    monkeypatch.setattr(transcription.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(processor, "detect_silences", lambda path: [])
+    monkeypatch.setattr(processor, "cut_audio", lambda src, dst, start, length: dst)
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"")
+    return audio
+
+
+def test_chunked_transcription_retries_a_failed_chunk(monkeypatch, chunked_audio):
+    attempts = {}
+
+    def fake_chunk(client, chunk_path, offset, language):
+        attempts[offset] = attempts.get(offset, 0) + 1
+        if offset == 600 and attempts[offset] == 1:
+            raise ConnectionError("timeout")
+        return [{"start": offset + 1, "end": offset + 2, "text": f"t{int(offset)}"}]
+
+    monkeypatch.setattr(transcription, "_transcribe_chunk", fake_chunk)
+    segments = transcription.transcribe_audio_segments(chunked_audio)
+    assert [s["text"] for s in segments] == ["t0", "t600", "t1200"]
+    assert attempts == {0.0: 1, 600: 2, 1200: 1}
+
+
+def test_chunked_transcription_fails_when_retries_run_out(monkeypatch, chunked_audio):
+    def fake_chunk(client, chunk_path, offset, language):
+        if offset == 1200:
+            raise ConnectionError("timeout")
+        return [{"start": offset, "end": offset + 1, "text": "ok"}]
+
+    monkeypatch.setattr(transcription, "_transcribe_chunk", fake_chunk)
+    with pytest.raises(RuntimeError, match="Parça 2"):
+        transcription.transcribe_audio_segments(chunked_audio)
+
+
+def test_failed_audio_cut_is_retried_then_raised(monkeypatch, chunked_audio):
+    monkeypatch.setattr(processor, "cut_audio", lambda src, dst, start, length: None)
+    monkeypatch.setattr(transcription, "_transcribe_chunk", lambda *args: [])
+    with pytest.raises(RuntimeError, match="ses kesilemedi"):
+        transcription.transcribe_audio_segments(chunked_audio)
@@ -0,0 +1,101 @@
+import pytest
+
+from app.core.config import settings
+from app.core.embedding_profile import (
+    BINARY_HNSW_INDEX,
+    HNSW_INDEX,
+    EmbeddingProfile,
+    conversion_statements,
+    profile_mismatches,
+)
+from app.services.intelligence import search
+
+SCOPE = "owner_id = :owner_id"
+
+
+@pytest.fixture
+def profile(monkeypatch):
+    def apply(dimensions=1536, half_precision=False, binary_index=False):
+        monkeypatch.setattr(settings, "EMBEDDING_DIMENSIONS", dimensions)
+        monkeypatch.setattr(settings, "EMBEDDING_HALF_PRECISION", half_precision)
+        monkeypatch.setattr(settings, "EMBEDDING_BINARY_INDEX", binary_index)
+    return apply
+
+
+def _squash(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def test_default_profile_uses_hnsw_order_by(profile):
+    profile()
+    sql = _squash(search._vector_candidates_sql(SCOPE))
+    assert "ORDER BY embedding <=> CAST(:qvec AS vector) LIMIT :pool" in sql
+    assert "binary_quantize" not in sql
+    assert "OFFSET 0" not in sql
+    assert search._vector_params(100) == {"pool": 100}
+
+
+def test_half_precision_casts_query_to_halfvec(profile):
+    profile(dimensions=512, half_precision=True)
+    assert "CAST(:qvec AS halfvec)" in search._vector_candidates_sql(SCOPE)
+
+
+def test_binary_profile_first_pass_then_rerank(profile, monkeypatch):
+    profile(dimensions=512, binary_index=True)
+    monkeypatch.setattr(settings, "SEARCH_RERANK_FACTOR", 4)
+    sql = _squash(search._vector_candidates_sql(SCOPE))
+    assert "ORDER BY binary_quantize(embedding)::bit(512) <~> binary_quantize(CAST(:qvec AS vector))" in sql
+    assert sql.index("LIMIT :first_pass") < sql.index("ORDER BY embedding <=>") < sql.index("LIMIT :pool")
+    assert search._vector_params(100) == {"pool": 100, "first_pass": 400}
+    # ef_search üst sınırını aşmaz
+    assert search._vector_params(400)["first_pass"] == search.HNSW_EF_SEARCH_MAX
+
+
+def test_binary_expression_matches_index_definition(profile):
+    # Sorgu ifadesi index ifadesiyle birebir aynı değilse planlayıcı index'i kullanamaz
+    profile(dimensions=512, binary_index=True)
+    target = EmbeddingProfile(dimensions=512, binary_index=True)
+    create = conversion_statements("vector(512)", {HNSW_INDEX}, target, 16, 64)[-1]
+    assert "(binary_quantize(embedding)::bit(512))" in create
+    assert "binary_quantize(embedding)::bit(512) <~>" in search._vector_candidates_sql(SCOPE)
+
+
+def test_exact_path_skips_index_for_selective_filters(profile):
+    profile(binary_index=True)
+    sql = _squash(search._vector_candidates_sql(SCOPE, exact=True))
+    assert "OFFSET 0" in sql
+    assert "binary_quantize" not in sql
+    assert sql.endswith("ORDER BY distance LIMIT :pool")
+    assert search._vector_params(100, exact=True) == {"pool": 100}
+
+
+def test_scope_filter_is_embedded_verbatim(profile):
+    profile()
+    assert f"AND {SCOPE}" in search._vector_candidates_sql(SCOPE)
+
+
+def test_profile_mismatches_reports_type_and_indexes():
+    expected = EmbeddingProfile(dimensions=512, half_precision=True)
+    assert profile_mismatches(expected, "halfvec(512)", {HNSW_INDEX}) == []
+    problems = profile_mismatches(expected, "vector(1536)", {BINARY_HNSW_INDEX})
+    assert len(problems) == 3
+
+
+def test_conversion_shrinks_by_truncating_and_renormalizing():
+    target = EmbeddingProfile(dimensions=512, half_precision=True)
+    statements = conversion_statements("vector(1536)", {HNSW_INDEX}, target, 16, 64)
+    assert statements[0] == f"DROP INDEX IF EXISTS {HNSW_INDEX}"
+    assert (
+        "ALTER TABLE videos ALTER COLUMN embedding TYPE halfvec(512) "
+        "USING l2_normalize(subvector(embedding, 1, 512))::halfvec(512)"
+    ) in statements
+    assert statements[-1].endswith("(embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64)")
+
+
+def test_conversion_to_larger_dimensions_nulls_vectors():
+    statements = conversion_statements("vector(512)", {HNSW_INDEX}, EmbeddingProfile(), 16, 64)
+    assert any(s.endswith("TYPE vector(1536) USING NULL") for s in statements)
+
+
+def test_conversion_is_empty_when_schema_matches():
+    assert conversion_statements("vector(1536)", {HNSW_INDEX}, EmbeddingProfile(), 16, 64) == []
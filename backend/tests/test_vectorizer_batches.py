@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import BadRequestError
+
+from app.core.config import settings
+from app.services.intelligence import vectorizer
+
+
+class CharEncoding:
+    """tiktoken yerine: her karakter bir token (ağ / model dosyası gerekmez)."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+def _bad_request(message: str) -> BadRequestError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    return BadRequestError(message, response=httpx.Response(400, request=request), body=None)
+
+
+class FakeOpenAI:
+    """embeddings.create: "bad" içeren her istek 400; diğerleri metin uzunluğunu vektör yapar."""
+
+    calls: list = []
+
+    def __init__(self, api_key=None):
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    def _create(self, model, input, **kwargs):
+        FakeOpenAI.calls.append(input)
+        items = input if isinstance(input, list) else [input]
+        if any("bad" in t for t in items):
+            raise _bad_request("invalid input")
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(items)]
+        )
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    FakeOpenAI.calls = []
+    monkeypatch.setattr(vectorizer, "OpenAI", FakeOpenAI)
+    monkeypatch.setattr(vectorizer, "_get_encoding", lambda: CharEncoding())
+    return FakeOpenAI
+
+
+def test_iter_batches_respects_item_limit(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_ITEMS", 2)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_TOKENS", 1000)
+    texts = ["a", "b", "c", "d", "e"]
+    batches = list(vectorizer._iter_batches(texts, [1] * 5))
+    assert batches == [(0, ["a", "b"]), (2, ["c", "d"]), (4, ["e"])]
+
+
+def test_iter_batches_respects_token_limit(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_ITEMS", 100)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_TOKENS", 10)
+    batches = list(vectorizer._iter_batches(["a", "b", "c", "d"], [6, 4, 7, 10]))
+    # Limiti tek başına dolduran metin kendi grubunda kalır
+    assert batches == [(0, ["a", "b"]), (2, ["c"]), (3, ["d"])]
+
+
+def test_truncate_tokens(monkeypatch):
+    monkeypatch.setattr(vectorizer, "_get_encoding", lambda: CharEncoding())
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_INPUT_TOKENS", 4)
+    assert vectorizer._truncate_tokens("abc") == ("abc", 3)
+    assert vectorizer._truncate_tokens("abcdefgh") == ("abcd", 4)
+
+
+def test_get_embeddings_truncates_and_keeps_order(monkeypatch, fake_api):
+    monkeypatch.setattr(settings, "EMBEDDING_MAX_INPUT_TOKENS", 5)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_ITEMS", 2)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_TOKENS", 1000)
+    out = vectorizer.get_embeddings([" ab ", "abcdefghij", "abc"])
+    assert out == [[2.0], [5.0], [3.0]]
+    assert fake_api.calls == [["ab", "abcde"], ["abc"]]
+
+
+def test_get_embeddings_retries_rejected_batch_item_by_item(monkeypatch, fake_api):
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_ITEMS", 10)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_TOKENS", 1000)
+    out = vectorizer.get_embeddings(["aa", "bad", "cccc"])
+    # Reddedilen metin None; grubun geri kalanı kaybolmaz
+    assert out == [[2.0], None, [4.0]]
+    assert fake_api.calls == [["aa", "bad", "cccc"], "aa", "bad", "cccc"]
+
+
+def test_get_embeddings_single_rejected_item_is_not_retried(monkeypatch, fake_api):
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_ITEMS", 1)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_TOKENS", 1000)
+    assert vectorizer.get_embeddings(["bad", "ok"]) == [None, [2.0]]
+    assert fake_api.calls == [["bad"], ["ok"]]
+
+
+def test_get_embeddings_rejects_blank_text(fake_api):
+    with pytest.raises(ValueError):
+        vectorizer.get_embeddings(["ok", "   "])
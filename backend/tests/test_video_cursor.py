@@ -0,0 +1,35 @@
+import base64
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.videos import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip_keeps_timezone_and_microseconds():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    video_id = uuid4()
+    cursor = _encode_cursor(created_at, video_id)
+    assert _decode_cursor(cursor) == (created_at, video_id)
+
+
+def test_cursor_is_url_safe():
+    cursor = _encode_cursor(datetime(2026, 3, 1, tzinfo=timezone.utc), uuid4())
+    assert all(c.isalnum() or c in "-_=" for c in cursor)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        base64.urlsafe_b64encode(b"2026-03-01T00:00:00").decode(),  # id yok
+        base64.urlsafe_b64encode(b"dun|" + str(uuid4()).encode()).decode(),  # tarih bozuk
+        base64.urlsafe_b64encode(b"2026-03-01T00:00:00|abc").decode(),  # uuid bozuk
+    ],
+)
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor(cursor)
+    assert exc.value.status_code == 400
@@ -67,7 +67,7 @@ export default function MoveVideoModal({ video, folders, onClose, onSubmit }) {
               <Video size={20} className="text-blue-600 dark:text-blue-400 mt-0.5" />
               <div>
                 <p className="text-sm font-medium text-blue-900 dark:text-blue-200 line-clamp-2">
-                  {video.description_ai?.substring(0, 80) || 'Video'}{video.description_ai?.length > 80 ? '...' : ''}
+                  {video.title || video.description_ai?.substring(0, 80) || 'Video'}{!video.title && video.description_ai?.length > 80 ? '...' : ''}
                 </p>
                 <p className="text-xs text-blue-700 dark:text-blue-300 mt-1">
                   Bu video başka bir klasöre taşınacak
@@ -46,7 +46,7 @@ export default function VideoCard({ video, onClick, onContextMenu, onRetry }) {
 
   // Markdown ve gereksiz karakterleri temizle
   const cleanDescription = (text) => {
-    if (!text) return 'Video işleniyor...';
+    if (!text) return video.status === 'COMPLETED' ? '' : 'Video işleniyor...';
     return text
       .replace(/#{1,6}\s?/g, '') // Markdown başlıkları
       .replace(/\*\*/g, '') // Bold
@@ -161,7 +161,7 @@ export default function VideoCard({ video, onClick, onContextMenu, onRetry }) {
         {/* Badges container */}
         <div className="absolute bottom-2 right-2 flex flex-col items-end gap-1.5">
           {/* Transcript badge */}
-          {video.transcript && (
+          {(video.transcript || video.has_transcript) && (
             <div className="bg-blue-600/90 text-white text-xs font-medium px-2 py-0.5 rounded-md backdrop-blur-sm flex items-center gap-1">
               <span>🎙️</span>
             </div>
@@ -202,7 +202,7 @@ export default function VideoCard({ video, onClick, onContextMenu, onRetry }) {
         
         {/* Kısa Özet */}
         <p className="text-sm text-gray-600 dark:text-gray-400 line-clamp-2 min-h-[2.5rem] leading-relaxed">
-          {getShortSummary(video.description_ai)}
+          {getShortSummary(video.description_ai || video.description_manual)}
         </p>
         
         {/* Meta Bilgiler */}
@@ -1,7 +1,16 @@
 import { X, Download, ExternalLink } from 'lucide-react';
 import { useEffect } from 'react';
+import { useQuery } from '@tanstack/react-query';
+import { videosAPI } from '../../services/api';
+
+export default function VideoPlayer({ video: listVideo, onClose }) {
+  // Liste satırında description_ai / transcript yok; oynatıcı açılınca detaydan tamamlanır
+  const { data: detail } = useQuery({
+    queryKey: ['video', listVideo.id],
+    queryFn: () => videosAPI.get(listVideo.id).then(res => res.data),
+  });
+  const video = { ...listVideo, ...detail };
 
-export default function VideoPlayer({ video, onClose }) {
   useEffect(() => {
     const handleEscape = (e) => {
       if (e.key === 'Escape') onClose();
@@ -1,5 +1,5 @@
 import { useState } from 'react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { videosAPI, foldersAPI } from '../services/api';
 import Header from '../components/Layout/Header';
 import Sidebar from '../components/Layout/Sidebar';
@@ -18,12 +18,26 @@ export default function DashboardPage() {
 
   const queryClient = useQueryClient();
 
-  const { data: videos, refetch: refetchVideos } = useQuery({
-    queryKey: ['videos'],
-    queryFn: () => videosAPI.list().then(res => res.data),
+  // Sayfalar istek üzerine yüklenir ("Daha fazla yükle"); klasör filtresi backend'de uygulanır
+  const {
+    data: videoPages,
+    refetch: refetchVideos,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
+    queryKey: ['videos', selectedFolder?.id ?? null],
+    queryFn: ({ pageParam }) => videosAPI.list({
+      cursor: pageParam,
+      ...(selectedFolder ? { folder_id: selectedFolder.id } : {}),
+    }),
+    initialPageParam: null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
     refetchInterval: 5000, // Her 5 saniyede bir yenile (status güncellemeleri için)
   });
 
+  const videos = videoPages?.pages.flatMap(page => page.data);
+
   const { data: folders, refetch: refetchFolders } = useQuery({
     queryKey: ['folders'],
     queryFn: () => foldersAPI.list().then(res => res.data),
@@ -63,10 +77,7 @@ export default function DashboardPage() {
     });
   };
 
-  const filteredVideos = videos?.filter(video => {
-    if (!selectedFolder) return true;
-    return video.folder_id === selectedFolder.id;
-  }) || [];
+  const filteredVideos = videos || [];
 
   return (
     <div className="flex h-screen bg-gradient-to-br from-gray-50 to-gray-100 dark:from-gray-900 dark:to-gray-800 transition-colors">
@@ -93,7 +104,7 @@ export default function DashboardPage() {
                 <p className="text-sm text-gray-500 dark:text-gray-400 mt-2 flex items-center gap-2">
                   <span className="inline-flex items-center gap-1.5">
                     <span className="w-2 h-2 bg-primary rounded-full animate-pulse"></span>
-                    {filteredVideos.length} video
+                    {filteredVideos.length}{hasNextPage ? '+' : ''} video
                   </span>
                   {videos && (
                     <span className="text-gray-400 dark:text-gray-500">
@@ -110,6 +121,18 @@ export default function DashboardPage() {
               onVideoContextMenu={handleVideoContextMenu}
               onRetry={() => refetchVideos()}
             />
+
+            {hasNextPage && (
+              <div className="flex justify-center mt-8">
+                <button
+                  onClick={() => fetchNextPage()}
+                  disabled={isFetchingNextPage}
+                  className="px-6 py-2 bg-white dark:bg-gray-800 text-gray-700 dark:text-gray-200 rounded-lg shadow-sm hover:shadow-md transition-all disabled:opacity-50"
+                >
+                  {isFetchingNextPage ? 'Yükleniyor...' : 'Daha fazla yükle'}
+                </button>
+              </div>
+            )}
           </div>
         </div>
       </div>
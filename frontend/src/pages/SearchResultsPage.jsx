@@ -1,6 +1,6 @@
 import { useSearchParams, useNavigate } from 'react-router-dom';
 import { useQuery } from '@tanstack/react-query';
-import { searchAPI, videosAPI } from '../services/api';
+import { searchAPI } from '../services/api';
 import Header from '../components/Layout/Header';
 import VideoGrid from '../components/Video/VideoGrid';
 import { ArrowLeft, Sparkles } from 'lucide-react';
@@ -16,25 +16,12 @@ export default function SearchResultsPage() {
     enabled: !!query,
   });
 
-  // Arama sonuçlarından video ID'leri al ve tam video detaylarını çek
-  const videoIds = data?.results?.map(r => r.video_id) || [];
-  
-  const { data: allVideos } = useQuery({
-    queryKey: ['videos'],
-    queryFn: () => videosAPI.list().then(res => res.data),
-    enabled: videoIds.length > 0,
-  });
-
-  // Arama sonuçlarını tam video objelerine dönüştür
-  const videos = data?.results?.map(result => {
-    const fullVideo = allVideos?.find(v => v.id === result.video_id);
-    return {
-      ...fullVideo,
-      id: result.video_id,
-      score: result.score,
-      search_score: result.score,
-    };
-  }).filter(v => v && v.status === 'COMPLETED') || [];
+  // Kart alanları arama yanıtında gelir (video başına ayrı detay isteği yok)
+  const videos = data?.results?.map(result => ({
+    ...result,
+    id: result.video_id,
+    search_score: result.score,
+  })).filter(v => v.status === 'COMPLETED') || [];
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-gray-50 to-gray-100 dark:from-gray-900 dark:to-gray-800 transition-colors">
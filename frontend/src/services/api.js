@@ -33,7 +33,14 @@ export const foldersAPI = {
 
 // Videos
 export const videosAPI = {
-  list: () => api.get('/videos/'),
+  // Keyset sayfalama: tek sayfa döner; nextCursor (X-Next-Cursor) null ise son sayfa.
+  // Liste görünümü metin alanlarını (description_ai, transcript) çekmez; detay için get() kullanın.
+  list: async ({ cursor = null, limit = 50, ...params } = {}) => {
+    const res = await api.get('/videos/', {
+      params: { limit, ...params, ...(cursor ? { cursor } : {}) },
+    });
+    return { data: res.data, nextCursor: res.headers['x-next-cursor'] || null };
+  },
   get: (id) => api.get(`/videos/${id}`),
   create: (source_url, folder_id) => api.post('/videos/', { source_url, folder_id }),
   createBulk: (source_urls, folder_id) => api.post('/videos/bulk', { source_urls, folder_id }),